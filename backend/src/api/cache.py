@@ -0,0 +1,113 @@
+from dataclasses import dataclass, field
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Response
+
+from .serialization import MEDIA_TYPES, dumps
+
+@dataclass
+class CachedResponse:
+    data: object
+    expires: float
+    max_age: float
+    bodies: Dict[str, Tuple[bytes, str]] = field(default_factory=dict)  # format -> body, ETag
+
+    def encoded(self, fmt: str = 'json') -> Tuple[bytes, str]:
+        """Body and ETag in a wire format, encoded on first use"""
+        encoded = self.bodies.get(fmt)
+        if encoded is None:
+            body = dumps(self.data, fmt)
+            # Content hash: an unchanged body keeps its ETag across refreshes
+            etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+            encoded = self.bodies[fmt] = (body, etag)
+        return encoded
+
+class ResponseCache:
+    """Short-lived cache of serialized GET responses.
+
+    Entries are keyed by (endpoint, *args) and keep the encoded body and
+    its ETag per wire format, so a hit costs no serialization. Concurrent misses on one
+    key share a single load (single flight) that runs in its own task, so
+    a caller that disconnects does not cancel it for the others; a client
+    that already has the current body gets a 304.
+    """
+    def __init__(self, max_entries: int = 4096):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries
+        self.entries: Dict[Hashable, CachedResponse] = {}
+        self.loading: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def get(
+        self,
+        key: Hashable,
+        load: Callable[[], Awaitable],
+        ttl: float = 1.0
+    ) -> CachedResponse:
+        """Cached entry for key, calling load() at most once per expiry"""
+        entry = self.entries.get(key)
+        if entry and entry.expires > time.monotonic():
+            self.hits += 1
+            return entry
+
+        task = self.loading.get(key)
+        if task:
+            self.hits += 1
+        else:
+            self.misses += 1
+            task = self.loading[key] = asyncio.ensure_future(self._load(key, load, ttl))
+            task.add_done_callback(lambda done: self._loaded(key, done))
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable], ttl: float) -> CachedResponse:
+        return self.put(key, await load(), ttl)
+
+    def _loaded(self, key: Hashable, task: asyncio.Task):
+        if self.loading.get(key) is task:
+            del self.loading[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here when every caller has gone
+
+    def put(self, key: Hashable, data, ttl: float = 1.0) -> CachedResponse:
+        self.entries.pop(key, None)
+        if len(self.entries) >= self.max_entries:
+            # Entries are kept in insertion order, so this is the oldest
+            del self.entries[next(iter(self.entries))]
+        entry = self.entries[key] = CachedResponse(data, time.monotonic() + ttl, ttl)
+        entry.encoded()  # JSON is what almost every client asks for
+        return entry
+
+    def respond(
+        self,
+        entry: CachedResponse,
+        if_none_match: Optional[str] = None,
+        fmt: str = 'json'
+    ) -> Response:
+        """Full response, or 304 when the client's ETag is current"""
+        body, etag = entry.encoded(fmt)
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f"max-age={max(int(entry.max_age), 0)}",
+            'Vary': 'Accept'
+        }
+        if if_none_match and etag in [t.strip() for t in if_none_match.split(',')]:
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+    def invalidate(self, key: Hashable):
+        self.entries.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified
+        }
@@ -0,0 +1,198 @@
+from collections import deque
+from dataclasses import dataclass, field
+import asyncio
+import logging
+import time
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from fastapi import WebSocket
+
+from .serialization import EncodedMessage
+
+OVERFLOW_POLICIES = ('drop_oldest', 'coalesce', 'disconnect')
+
+@dataclass
+class _Client:
+    websocket: WebSocket
+    format: str = 'json'
+    queue: Deque[List] = field(default_factory=deque)  # [key, payload, enqueued_at]
+    pending: Dict[Any, List] = field(default_factory=dict)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    writer: Optional[asyncio.Task] = None
+    sent: int = 0
+    dropped: int = 0
+    max_depth: int = 0
+
+class ConnectionManager:
+    """Fans messages out to WebSocket clients without waiting on any of them.
+
+    Every client has a bounded send queue drained by its own writer task,
+    so a slow browser only falls behind itself. When a queue is full the
+    overflow policy decides what happens: drop_oldest discards the oldest
+    queued message, coalesce replaces the queued message for the same
+    topic and symbol with the new one, and disconnect closes the client.
+    Each client receives either JSON text frames or MessagePack binary
+    frames; a message is encoded once per format in use.
+    """
+    def __init__(self, queue_size: int = 256, overflow_policy: str = 'drop_oldest'):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.logger = logging.getLogger(__name__)
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.clients: Dict[WebSocket, _Client] = {}
+
+        self.broadcasts = 0
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.slow_disconnects = 0
+        self.send_errors = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.clients)
+
+    async def connect(self, websocket: WebSocket, fmt: str = 'json'):
+        await websocket.accept()
+        client = _Client(websocket, fmt)
+        client.writer = asyncio.create_task(self._write(client))
+        self.clients[websocket] = client
+
+    def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(websocket, None)
+        if client and client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+
+    @staticmethod
+    def _key(message: Dict) -> Optional[tuple]:
+        """Messages for the same topic and symbol supersede each other"""
+        topic = message.get('topic') or message.get('type')
+        return (topic, message.get('symbol')) if topic else None
+
+    @staticmethod
+    def encode(message: Dict) -> EncodedMessage:
+        return EncodedMessage(message)
+
+    async def broadcast(self, message: Dict[str, Any]):
+        """Queue a message for every client; it is serialized once for all of them"""
+        self.publish(list(self.clients), self.encode(message), self._key(message))
+
+    def publish(self, websockets: Iterable[WebSocket], payload: EncodedMessage, key=None):
+        """Queue one shared encoded message for the given clients.
+
+        Messages with a key may be coalesced on overflow; pass None for
+        ones that must not be skipped silently.
+        """
+        self.broadcasts += 1
+        for websocket in websockets:
+            client = self.clients.get(websocket)
+            if client:
+                self._enqueue(client, key, payload)
+
+    async def send(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Queue a message for one client behind whatever it already has queued"""
+        client = self.clients.get(websocket)
+        if client:
+            self._enqueue(client, self._key(message), self.encode(message))
+
+    def _enqueue(self, client: _Client, key, payload: EncodedMessage):
+        now = time.perf_counter()
+        if len(client.queue) >= self.queue_size:
+            if self.overflow_policy == 'disconnect':
+                self._drop_slow_client(client)
+                return
+            if self.overflow_policy == 'coalesce' and key in client.pending:
+                entry = client.pending[key]
+                entry[1], entry[2] = payload, now
+                self._count_drop(client)
+                return
+            oldest = client.queue.popleft()
+            if client.pending.get(oldest[0]) is oldest:
+                del client.pending[oldest[0]]
+            self._count_drop(client)
+
+        entry = [key, payload, now]
+        client.queue.append(entry)
+        if key is not None:
+            client.pending[key] = entry
+        client.max_depth = max(client.max_depth, len(client.queue))
+        client.ready.set()
+
+    def _count_drop(self, client: _Client):
+        client.dropped += 1
+        self.messages_dropped += 1
+
+    def _drop_slow_client(self, client: _Client):
+        self.slow_disconnects += 1
+        self.messages_dropped += len(client.queue) + 1
+        self.logger.warning(
+            f"Disconnecting slow WebSocket client: {len(client.queue)} messages queued"
+        )
+        self.disconnect(client.websocket)
+        asyncio.create_task(self._close(client.websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # try again later
+        except Exception as e:
+            self.logger.debug(f"Error closing WebSocket: {e}")
+
+    async def _write(self, client: _Client):
+        """Writer task: drain one client's queue in order"""
+        try:
+            while True:
+                await client.ready.wait()
+                client.ready.clear()
+                while client.queue:
+                    key, payload, enqueued_at = entry = client.queue.popleft()
+                    if client.pending.get(key) is entry:
+                        del client.pending[key]
+                    if client.format == 'json':
+                        await client.websocket.send_text(payload.text())
+                    else:
+                        await client.websocket.send_bytes(payload.get(client.format))
+                    self._record_latency(time.perf_counter() - enqueued_at)
+                    client.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.send_errors += 1
+            self.logger.error(f"WebSocket send failed: {e}")
+            self.disconnect(client.websocket)
+
+    def _record_latency(self, latency: float):
+        self.messages_sent += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._total_latency += latency
+
+    def get_metrics(self) -> Dict:
+        return {
+            'connections': len(self.clients),
+            'broadcasts': self.broadcasts,
+            'messages_sent': self.messages_sent,
+            'messages_dropped': self.messages_dropped,
+            'slow_disconnects': self.slow_disconnects,
+            'send_errors': self.send_errors,
+            'avg_latency': self._total_latency / (self.messages_sent or 1),
+            'last_latency': self.last_latency,
+            'max_latency': self.max_latency,
+            'queued': sum(len(c.queue) for c in self.clients.values()),
+            'clients': [
+                {
+                    'queued': len(c.queue),
+                    'max_depth': c.max_depth,
+                    'sent': c.sent,
+                    'dropped': c.dropped
+                }
+                for c in self.clients.values()
+            ]
+        }
+
+    async def close(self):
+        """Cancel every writer task"""
+        for websocket in list(self.clients):
+            self.disconnect(websocket)
@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from datetime import datetime
+import json
+from typing import List, Optional
 from .schemas import (
     OrderCreate, OrderResponse, 
     StrategyCreate, StrategyResponse,
     UserCreate, UserResponse
 )
 from .dependencies import get_current_user
+from .cache import ResponseCache
+from .serialization import MEDIA_TYPES, SnapshotCache, negotiate
 from core.trading_system import TradingSystem
+from database.queries import get_strategy, list_orders, list_trades
+from database.rollups import read_rollups
+from database.session import async_session
+from strategies import build_strategy
+from config import settings
 
 router = APIRouter()
+market_cache = ResponseCache()
+snapshots = SnapshotCache()
 
 @router.post("/users", response_model=UserResponse)
 async def create_user(user: UserCreate):
@@ -16,14 +27,60 @@ async def create_user(user: UserCreate):
     return await UserService.create_user(user)
 
 @router.get("/market/ticker/{symbol}")
-async def get_ticker(symbol: str):
+async def get_ticker(symbol: str, request: Request):
     """Get current ticker data"""
-    return await TradingSystem.get_ticker(symbol)
+    trading_system = request.app.state.trading_system
+    try:
+        entry = await market_cache.get(
+            ('ticker', symbol),
+            lambda: trading_system.get_ticker(symbol, max_age=settings.MARKET_LIVE_MAX_AGE),
+            ttl=settings.MARKET_TICKER_TTL
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Exchange error: {e}")
+    return market_cache.respond(
+        entry, request.headers.get('if-none-match'), negotiate(request.headers.get('accept'))
+    )
 
 @router.get("/market/orderbook/{symbol}")
-async def get_orderbook(symbol: str, limit: int = 100):
+async def get_orderbook(symbol: str, request: Request, limit: int = 100):
     """Get orderbook data"""
-    return await TradingSystem.get_orderbook(symbol, limit)
+    trading_system = request.app.state.trading_system
+    try:
+        entry = await market_cache.get(
+            ('orderbook', symbol, limit),
+            lambda: trading_system.get_orderbook(
+                symbol, limit, max_age=settings.MARKET_LIVE_MAX_AGE
+            ),
+            ttl=settings.MARKET_ORDERBOOK_TTL
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Exchange error: {e}")
+    return market_cache.respond(
+        entry, request.headers.get('if-none-match'), negotiate(request.headers.get('accept'))
+    )
+
+@router.get("/portfolio")
+async def get_portfolio(
+    request: Request,
+    current_user = Depends(get_current_user)
+):
+    """Get positions, portfolio metrics and the latest risk metrics"""
+    trading_system = request.app.state.trading_system
+    portfolio = trading_system.portfolio
+    risk_manager = trading_system.risk_manager
+    # Re-encoded only after a trade, a price move or a new risk calculation
+    snapshot = snapshots.get(
+        'portfolio',
+        (portfolio.version, len(risk_manager.metrics_history)),
+        lambda: {
+            'positions': portfolio.get_position_summary(),
+            'metrics': portfolio.get_metrics(),
+            'risk': risk_manager.get_latest_metrics()
+        }
+    )
+    fmt = negotiate(request.headers.get('accept'))
+    return Response(content=snapshot.get(fmt), media_type=MEDIA_TYPES[fmt])
 
 @router.post("/orders", response_model=OrderResponse)
 async def create_order(
@@ -35,10 +92,65 @@ async def create_order(
 
 @router.get("/orders", response_model=List[OrderResponse])
 async def get_orders(
+    response: Response,
+    status: Optional[str] = None,
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    current_user = Depends(get_current_user)
+):
+    """Get user's orders, newest first; pass X-Next-Cursor back as cursor for the next page"""
+    try:
+        async with async_session() as session:
+            page = await list_orders(
+                session, current_user.id, status, symbol, since, until, cursor, limit
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+    return page.items
+
+@router.get("/trades")
+async def get_trades(
+    response: Response,
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    current_user = Depends(get_current_user)
+):
+    """Get user's trades, newest first; pass X-Next-Cursor back as cursor for the next page"""
+    try:
+        async with async_session() as session:
+            page = await list_trades(
+                session, current_user.id, symbol, since, until, cursor, limit
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+    return page.items
+
+@router.get("/pnl")
+async def get_pnl(
+    period: str = '1d',
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
     current_user = Depends(get_current_user)
 ):
-    """Get user's orders"""
-    return await TradingSystem.get_orders(current_user)
+    """Hourly ('1h') or daily ('1d') trade volume, fees and realized P&L, oldest first"""
+    try:
+        async with async_session() as session:
+            return await read_rollups(
+                session, current_user.id, period, symbol, since, until
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/strategies", response_model=StrategyResponse)
 async def create_strategy(
@@ -58,15 +170,41 @@ async def get_strategies(
 @router.post("/strategies/{strategy_id}/start")
 async def start_strategy(
     strategy_id: int,
+    request: Request,
     current_user = Depends(get_current_user)
 ):
-    """Start trading strategy"""
-    return await TradingSystem.start_strategy(strategy_id, current_user)
+    """Start trading strategy on the shared strategy runtime"""
+    trading_system = request.app.state.trading_system
+    async with async_session() as session:
+        row = await get_strategy(session, current_user.id, strategy_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Strategy not found")
+        try:
+            strategy = None
+            if str(strategy_id) not in trading_system.strategy_runtime.strategies:
+                strategy = build_strategy(row.type, trading_system, json.loads(row.config))
+            await trading_system.start_strategy(strategy_id, strategy)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        row.is_active = True
+        await session.commit()
+    return {'strategy_id': strategy_id, 'status': 'running'}
 
 @router.post("/strategies/{strategy_id}/stop")
 async def stop_strategy(
     strategy_id: int,
+    request: Request,
     current_user = Depends(get_current_user)
 ):
     """Stop trading strategy"""
-    return await TradingSystem.stop_strategy(strategy_id, current_user)
\ No newline at end of file
+    trading_system = request.app.state.trading_system
+    async with async_session() as session:
+        row = await get_strategy(session, current_user.id, strategy_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Strategy not found")
+        # A strategy never started since the last restart is already stopped
+        if str(strategy_id) in trading_system.strategy_runtime.strategies:
+            await trading_system.stop_strategy(strategy_id)
+        row.is_active = False
+        await session.commit()
+    return {'strategy_id': strategy_id, 'status': 'stopped'}
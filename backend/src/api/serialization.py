@@ -0,0 +1,130 @@
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+import json
+import numpy as np
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MEDIA_TYPES = {
+    'json': 'application/json',
+    'msgpack': 'application/msgpack'
+}
+
+# Exact type -> converter, looked up before any isinstance checks.
+# Decimals go out as strings so prices and amounts keep every digit.
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    Decimal: str,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    time: time.isoformat,
+    set: list,
+    frozenset: list,
+    np.float64: float,
+    np.float32: float,
+    np.int64: int,
+    np.int32: int,
+    np.bool_: bool,
+    np.ndarray: np.ndarray.tolist
+}
+
+def default(obj):
+    """Convert the values the standard encoders do not know"""
+    convert = _CONVERTERS.get(type(obj))
+    if convert is not None:
+        return convert(obj)
+    # Subclasses and the less common types
+    if isinstance(obj, Enum):
+        return obj.value
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+if orjson is not None:
+    _JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def _dump_json(data) -> bytes:
+        return orjson.dumps(data, default=default, option=_JSON_OPTIONS)
+else:
+    _encoder = json.JSONEncoder(default=default, separators=(',', ':'))
+
+    def _dump_json(data) -> bytes:
+        return _encoder.encode(data).encode('utf-8')
+
+def available_formats() -> Tuple[str, ...]:
+    return ('json', 'msgpack') if msgpack is not None else ('json',)
+
+def dumps(data, fmt: str = 'json') -> bytes:
+    """Encode data as JSON or MessagePack"""
+    if fmt == 'msgpack':
+        return msgpack.packb(data, default=default, use_bin_type=True)
+    return _dump_json(data)
+
+def negotiate(requested: Optional[str]) -> str:
+    """Pick the wire format from an Accept header or ?format= value"""
+    if requested and 'msgpack' in requested and msgpack is not None:
+        return 'msgpack'
+    return 'json'
+
+class EncodedMessage:
+    """A message that is encoded at most once per wire format.
+
+    The same instance is queued for every subscriber and reused for
+    every response, so each format costs one encode however many
+    clients receive it.
+    """
+    __slots__ = ('message', '_encoded', '_text')
+
+    def __init__(self, message: Dict):
+        self.message = message
+        self._encoded: Dict[str, bytes] = {}
+        self._text: Optional[str] = None
+
+    def get(self, fmt: str = 'json') -> bytes:
+        encoded = self._encoded.get(fmt)
+        if encoded is None:
+            encoded = self._encoded[fmt] = dumps(self.message, fmt)
+        return encoded
+
+    def text(self) -> str:
+        """JSON as str, for WebSocket text frames"""
+        if self._text is None:
+            self._text = self.get('json').decode('utf-8')
+        return self._text
+
+class SnapshotCache:
+    """Encoded snapshots reused until their source's version changes.
+
+    get() only calls build() and the encoder when the version passed in
+    differs from the one the cached snapshot was made at.
+    """
+    def __init__(self):
+        self.snapshots: Dict[Hashable, Tuple[Hashable, EncodedMessage]] = {}
+        self.builds = 0
+        self.reuses = 0
+
+    def get(self, key: Hashable, version: Hashable, build: Callable[[], Dict]) -> EncodedMessage:
+        cached = self.snapshots.get(key)
+        if cached is not None and cached[0] == version:
+            self.reuses += 1
+            return cached[1]
+        self.builds += 1
+        snapshot = EncodedMessage(build())
+        self.snapshots[key] = (version, snapshot)
+        return snapshot
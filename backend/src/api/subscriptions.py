@@ -0,0 +1,187 @@
+from dataclasses import dataclass, field
+import logging
+from typing import Dict, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from .connections import ConnectionManager
+from .serialization import EncodedMessage
+
+TOPICS = ('ticker', 'book', 'orders', 'portfolio', 'risk')
+FEED_TOPICS = ('ticker', 'book')  # topics that need market data polled
+TICKER_FIELDS = ('bid', 'ask', 'last', 'bidVolume', 'askVolume', 'baseVolume', 'timestamp')
+
+@dataclass
+class _BookStream:
+    """Last published book of a symbol and its sequence number"""
+    bids: Dict[float, float] = field(default_factory=dict)
+    asks: Dict[float, float] = field(default_factory=dict)
+    seq: int = 0
+    snapshot: Optional[Tuple[int, EncodedMessage]] = None  # (seq, encoded snapshot)
+
+    def apply(self, orderbook: Dict) -> Tuple[Dict[float, float], Dict[float, float]]:
+        """Replace the book and return the bid and ask levels that changed"""
+        bids = {float(p): float(a) for p, a, *_ in orderbook.get('bids', [])}
+        asks = {float(p): float(a) for p, a, *_ in orderbook.get('asks', [])}
+        changes = self._diff(self.bids, bids), self._diff(self.asks, asks)
+        self.bids, self.asks = bids, asks
+        return changes
+
+    @staticmethod
+    def _diff(old: Dict[float, float], new: Dict[float, float]) -> Dict[float, float]:
+        """Changed levels; a zero amount removes a level"""
+        changes = {p: a for p, a in new.items() if old.get(p) != a}
+        changes.update({p: 0.0 for p in old if p not in new})
+        return changes
+
+class SubscriptionManager:
+    """Topic subscriptions for WebSocket clients.
+
+    Clients send {"action": "subscribe", "topic": ..., "symbol": ...} for
+    one of the ticker, book, orders, portfolio and risk topics. Every
+    update is serialized once and the same payload is queued for all
+    subscribers of its topic and symbol. Books go out as a snapshot
+    followed by deltas; each carries a seq, and a delta applies only to
+    the book at seq - 1. A client that sees a gap sends
+    {"action": "resync", "topic": "book", "symbol": ...} for a fresh snapshot.
+    With a market data feed attached, the first ticker or book subscriber
+    of a symbol starts its feed and the last one to leave stops it.
+    """
+    def __init__(self, connections: ConnectionManager, feed=None):
+        self.logger = logging.getLogger(__name__)
+        self.connections = connections
+        self.feed = feed
+        self.subscribers: Dict[Tuple[str, str], Set[WebSocket]] = {}
+        self.client_topics: Dict[WebSocket, Set[Tuple[str, str]]] = {}
+        self.books: Dict[str, _BookStream] = {}
+        self.latest: Dict[Tuple[str, str], EncodedMessage] = {}  # last update per topic
+        self.published = 0
+
+    async def handle(self, websocket: WebSocket, message: Dict) -> Optional[Dict]:
+        """Process a client request; returns the reply, if any"""
+        action = message.get('action')
+        topic = message.get('topic')
+        symbol = message.get('symbol')
+        if action not in ('subscribe', 'unsubscribe', 'resync'):
+            return {'type': 'error', 'error': f"Unknown action: {action}"}
+        if topic not in TOPICS or not symbol:
+            return {'type': 'error', 'error': f"Invalid subscription: {topic} {symbol}"}
+
+        if action == 'unsubscribe':
+            self.unsubscribe(websocket, topic, symbol)
+            return {'type': 'unsubscribed', 'topic': topic, 'symbol': symbol}
+
+        if action == 'subscribe':
+            self.subscribe(websocket, topic, symbol)
+            reply = {'type': 'subscribed', 'topic': topic, 'symbol': symbol}
+            await self.connections.send(websocket, reply)
+        self._send_current(websocket, topic, symbol)
+        return None
+
+    def subscribe(self, websocket: WebSocket, topic: str, symbol: str):
+        key = (topic, symbol)
+        if key not in self.subscribers and self.feed and topic in FEED_TOPICS:
+            self.feed.watch(topic, symbol)
+        self.subscribers.setdefault(key, set()).add(websocket)
+        self.client_topics.setdefault(websocket, set()).add(key)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str, symbol: str):
+        key = (topic, symbol)
+        subscribers = self.subscribers.get(key)
+        if subscribers:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.subscribers[key]
+                if self.feed and topic in FEED_TOPICS:
+                    self.feed.unwatch(topic, symbol)
+        self.client_topics.get(websocket, set()).discard(key)
+
+    def drop(self, websocket: WebSocket):
+        """Forget every subscription of a disconnected client"""
+        for topic, symbol in self.client_topics.pop(websocket, set()):
+            self.unsubscribe(websocket, topic, symbol)
+
+    def _send_current(self, websocket: WebSocket, topic: str, symbol: str):
+        """Bring one client up to date: a book snapshot or the last update"""
+        if topic == 'book':
+            payload = self._snapshot(symbol)
+        else:
+            payload = self.latest.get((topic, symbol))
+        if payload:
+            self.connections.publish((websocket,), payload)
+
+    def _snapshot(self, symbol: str) -> Optional[EncodedMessage]:
+        """Encoded snapshot of the current book, shared until the next delta"""
+        book = self.books.get(symbol)
+        if book is None:
+            return None
+        if book.snapshot is None or book.snapshot[0] != book.seq:
+            book.snapshot = (book.seq, self.connections.encode({
+                'topic': 'book',
+                'symbol': symbol,
+                'type': 'snapshot',
+                'seq': book.seq,
+                'bids': [[p, book.bids[p]] for p in sorted(book.bids, reverse=True)],
+                'asks': [[p, book.asks[p]] for p in sorted(book.asks)]
+            }))
+        return book.snapshot[1]
+
+    def on_event(self, topic: str, symbol: str, data: Dict):
+        """TradingSystem listener: serialize an update once for all its subscribers"""
+        if topic == 'book':
+            self._on_book(symbol, data)
+            return
+        if topic == 'ticker':
+            data = {name: data.get(name) for name in TICKER_FIELDS}
+
+        key = (topic, symbol)
+        subscribers = self.subscribers.get(key)
+        if not subscribers:
+            self.latest.pop(key, None)
+            return
+        previous = self.latest.get(key)
+        if topic != 'orders' and previous is not None and previous.message['data'] == data:
+            return  # unchanged state; subscribers already have it
+
+        payload = self.connections.encode({
+            'topic': topic, 'symbol': symbol, 'type': 'update', 'data': data
+        })
+        if topic == 'orders':
+            # Order updates are events: every one must arrive and none is replayed
+            self.connections.publish(subscribers, payload)
+        else:
+            self.latest[key] = payload
+            self.connections.publish(subscribers, payload, key)
+        self.published += 1
+
+    def _on_book(self, symbol: str, orderbook: Dict):
+        subscribers = self.subscribers.get(('book', symbol))
+        if not subscribers:
+            # Nobody is listening; the next subscriber starts from a snapshot
+            self.books.pop(symbol, None)
+            return
+
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = _BookStream()
+            book.apply(orderbook)
+            book.seq = 1
+            self.connections.publish(subscribers, self._snapshot(symbol))
+            self.published += 1
+            return
+
+        bids, asks = book.apply(orderbook)
+        if not bids and not asks:
+            return
+        book.seq += 1
+        payload = self.connections.encode({
+            'topic': 'book',
+            'symbol': symbol,
+            'type': 'delta',
+            'seq': book.seq,
+            'bids': [[p, a] for p, a in bids.items()],
+            'asks': [[p, a] for p, a in asks.items()]
+        })
+        # Deltas are never coalesced; a client that misses one resyncs
+        self.connections.publish(subscribers, payload)
+        self.published += 1
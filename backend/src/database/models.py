@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
@@ -47,6 +47,15 @@ class Order(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # One index per GET /orders filter; each ends in the (created_at, id)
+    # keyset so pages are range scans in sort order
+    __table_args__ = (
+        Index('ix_orders_user_created', 'user_id', 'created_at', 'id'),
+        Index('ix_orders_user_status_created', 'user_id', 'status', 'created_at', 'id'),
+        Index('ix_orders_user_symbol_created', 'user_id', 'symbol', 'created_at', 'id'),
+        Index('ix_orders_exchange_order_id', 'exchange_order_id'),
+    )
+
 class Trade(Base):
     __tablename__ = "trades"
 
@@ -58,7 +67,39 @@ class Trade(Base):
     quantity = Column(Float, nullable=False)
     price = Column(Float, nullable=False)
     commission = Column(Float, nullable=False)
-    executed_at = Column(DateTime, default=datetime.utcnow)
+    realized_pnl = Column(Float, nullable=False, default=0.0)
+    # Partition key on Postgres, see database/partitioning.py
+    executed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_trades_user_executed', 'user_id', 'executed_at', 'id'),
+        Index('ix_trades_user_symbol_executed', 'user_id', 'symbol', 'executed_at', 'id'),
+        Index('ix_trades_order_id', 'order_id'),
+    )
+
+class TradeRollup(Base):
+    """Trade totals per user, symbol and hour or day bucket.
+
+    Maintained by the persistence writer in the same transaction as the
+    trades it sums, so dashboards never aggregate raw trades. user_id is
+    0 for trades recorded without a user.
+    """
+    __tablename__ = "trade_rollups"
+
+    user_id = Column(Integer, primary_key=True)
+    symbol = Column(String, primary_key=True)
+    period = Column(String, primary_key=True)  # '1h' or '1d'
+    bucket = Column(DateTime, primary_key=True)  # start of the hour or day
+    trades = Column(Integer, nullable=False, default=0)
+    volume = Column(Float, nullable=False, default=0.0)
+    notional = Column(Float, nullable=False, default=0.0)
+    fees = Column(Float, nullable=False, default=0.0)
+    realized_pnl = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        # All symbols of a user; per-symbol reads use the primary key
+        Index('ix_trade_rollups_user_period_bucket', 'user_id', 'period', 'bucket'),
+    )
 
 class Strategy(Base):
     __tablename__ = "strategies"
@@ -0,0 +1,105 @@
+from datetime import date, datetime
+import asyncio
+import logging
+from typing import List, Union
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateTable
+
+from .models import Trade
+
+logger = logging.getLogger(__name__)
+
+# trades is range partitioned by month on executed_at when the database
+# is Postgres. Other databases get a plain table; there detaching a month
+# falls back to deleting its rows.
+
+def _month(value: Union[date, datetime]) -> date:
+    return date(value.year, value.month, 1)
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def partition_name(month: Union[date, datetime]) -> str:
+    month = _month(month)
+    return f"{Trade.__tablename__}_{month.year:04d}_{month.month:02d}"
+
+def _is_postgres(conn: AsyncConnection) -> bool:
+    return conn.dialect.name == 'postgresql'
+
+async def create_trades_table(conn: AsyncConnection):
+    """Create trades as a partitioned table on Postgres, before create_all.
+
+    The DDL is the model's own, with the partition key added to the
+    primary key as Postgres requires. create_all skips the indexes of a
+    table that already exists, so they are created here.
+    """
+    if not _is_postgres(conn):
+        return
+    exists = (await conn.execute(text("SELECT to_regclass(:name)"), {'name': Trade.__tablename__})).scalar()
+    if exists is None:
+        ddl = str(CreateTable(Trade.__table__).compile(dialect=conn.dialect)).strip()
+        ddl = ddl.replace('PRIMARY KEY (id)', 'PRIMARY KEY (id, executed_at)')
+        await conn.execute(text(f"{ddl} PARTITION BY RANGE (executed_at)"))
+        await conn.execute(text(
+            f"CREATE TABLE {Trade.__tablename__}_default PARTITION OF {Trade.__tablename__} DEFAULT"
+        ))
+    for index in Trade.__table__.indexes:
+        await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    start: Union[date, datetime, None] = None,
+    months_ahead: int = 2
+) -> List[str]:
+    """Create monthly partitions from start's month through months_ahead"""
+    if not _is_postgres(conn):
+        return []
+    month = _month(start or datetime.utcnow())
+    created = []
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {Trade.__tablename__} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        ))
+        created.append(name)
+        month = _next_month(month)
+    return created
+
+async def detach_partition(engine: AsyncEngine, month: Union[date, datetime], drop: bool = False):
+    """Take a month of trades out of the trades table.
+
+    On Postgres this is DETACH PARTITION CONCURRENTLY, a catalog change
+    that neither scans nor blocks writers; the month stays queryable as
+    its own table unless drop is set. Rollups are left untouched.
+    """
+    month = _month(month)
+    name = partition_name(month)
+    async with engine.connect() as conn:
+        if not _is_postgres(conn):
+            await conn.execute(delete(Trade).where(
+                Trade.executed_at >= datetime.combine(month, datetime.min.time()),
+                Trade.executed_at < datetime.combine(_next_month(month), datetime.min.time())
+            ))
+            await conn.commit()
+            return
+        # CONCURRENTLY cannot run inside a transaction block
+        conn = await conn.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.execute(text(
+            f"ALTER TABLE {Trade.__tablename__} DETACH PARTITION {name} CONCURRENTLY"
+        ))
+        if drop:
+            await conn.execute(text(f"DROP TABLE {name}"))
+    logger.info(f"Detached trade partition {name}{' and dropped it' if drop else ''}")
+
+async def maintain_partitions(engine: AsyncEngine, interval: float = 86400.0, months_ahead: int = 2):
+    """Keep future monthly partitions in place while the service runs"""
+    while True:
+        try:
+            async with engine.begin() as conn:
+                await ensure_partitions(conn, months_ahead=months_ahead)
+        except Exception as e:
+            logger.error(f"Error creating trade partitions: {e}")
+        await asyncio.sleep(interval)
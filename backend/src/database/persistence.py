@@ -0,0 +1,350 @@
+from collections import OrderedDict, deque
+from datetime import datetime
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from . import rollups
+from .models import Order, OrderStatus, Trade
+
+ORDER_STATUS = {
+    'open': OrderStatus.PENDING,
+    'closed': OrderStatus.FILLED,
+    'canceled': OrderStatus.CANCELLED,
+    'cancelled': OrderStatus.CANCELLED,
+    'expired': OrderStatus.CANCELLED,
+    'rejected': OrderStatus.REJECTED
+}
+
+ORDER_COLUMNS = (
+    'user_id', 'exchange', 'symbol', 'order_type', 'side', 'quantity',
+    'price', 'status', 'exchange_order_id', 'created_at', 'updated_at'
+)
+TRADE_COLUMNS = (
+    'order_id', 'user_id', 'symbol', 'side', 'quantity', 'price',
+    'commission', 'realized_pnl', 'executed_at'
+)
+
+# The database could not be reached; retrying later may succeed
+TRANSIENT_ERRORS = (
+    OperationalError, InterfaceError, DisconnectionError, OSError, asyncio.TimeoutError
+)
+
+def _float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+class PersistenceWriter:
+    """Write-behind persistence of order and fill events.
+
+    record_order() and record_trade() only queue the event, so the
+    trading path never waits on the database. A background task writes
+    the queue every flush_interval, or as soon as batch_size events are
+    waiting: one transaction per flush, orders as a multi-row INSERT plus
+    one executemany UPDATE, trades as a multi-row INSERT (COPY on
+    asyncpg) with their hourly and daily rollups updated in the same
+    transaction. Several updates to an order before a flush collapse into
+    one row. A failed batch is put back in front of newer events and
+    retried. After max_retries failures in a row the queue is written one
+    event at a time, and events that fail for any reason other than the
+    database being unreachable go to dead_letters instead of blocking the
+    rest. stop() drains everything queued.
+    """
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        exchange: str,
+        user_id: Optional[int] = None,
+        batch_size: int = 1000,
+        flush_interval: float = 0.25,
+        retry_delay: float = 1.0,
+        max_retries: int = 5,
+        max_dead_letters: int = 1000
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine
+        self.exchange = exchange
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+
+        self._orders: Dict[str, Dict] = OrderedDict()  # latest state by exchange order id
+        self._trades: List[Dict] = []
+        self._oldest: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+        self.dead_letters: deque = deque(maxlen=max_dead_letters)
+
+        self.orders_written = 0
+        self.trades_written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self.max_lag = 0.0
+
+    # Producers (trading path)
+
+    def on_event(self, topic: str, symbol: str, data: Dict):
+        """TradingSystem listener"""
+        if topic == 'orders':
+            self.record_order(data, data.get('user_id'))
+        elif topic == 'fills':
+            self.record_trade(data, data.get('user_id'))
+
+    def record_order(self, order: Dict, user_id: Optional[int] = None):
+        """Queue an order placement or status change"""
+        now = datetime.utcnow()
+        row = {'exchange_order_id': str(order['id']), 'updated_at': now}
+        if order.get('symbol'):
+            row['symbol'] = order['symbol']
+        if order.get('side'):
+            row['side'] = order['side']
+        if order.get('type'):
+            row['order_type'] = order['type']
+        if order.get('amount') is not None:
+            row['quantity'] = _float(order['amount'])
+        if order.get('price') is not None:
+            row['price'] = _float(order['price'])
+        if order.get('status') in ORDER_STATUS:
+            row['status'] = ORDER_STATUS[order['status']]
+
+        pending = self._orders.get(row['exchange_order_id'])
+        if pending is None:
+            row['created_at'] = now
+            row['user_id'] = user_id if user_id is not None else self.user_id
+            self._orders[row['exchange_order_id']] = row
+        else:
+            pending.update(row)
+        self._queued()
+
+    def record_trade(self, trade: Dict, user_id: Optional[int] = None):
+        """Queue a fill"""
+        self._trades.append({
+            'exchange_order_id': str(trade['order_id']),
+            'user_id': user_id if user_id is not None else self.user_id,
+            'symbol': trade['symbol'],
+            'side': trade['side'],
+            'quantity': _float(trade['amount']),
+            'price': _float(trade['price']),
+            'commission': _float(trade.get('fee') or 0),
+            'realized_pnl': _float(trade.get('realized_pnl') or 0),
+            'executed_at': trade.get('timestamp') or datetime.utcnow()
+        })
+        self._queued()
+
+    def _queued(self):
+        if self._oldest is None:
+            self._oldest = time.perf_counter()
+        if len(self._orders) + len(self._trades) >= self.batch_size:
+            self._wakeup.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._orders) + len(self._trades)
+
+    # Writer
+
+    async def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer after everything queued is written"""
+        if not self.running:
+            return
+        self.running = False
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        if self.pending:
+            self.logger.error(f"Persistence stopped with {self.pending} events unwritten")
+
+    async def _run(self):
+        failures = 0
+        while self.running or (self.pending and failures < self.max_retries):
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if await self.flush():
+                failures = 0
+                continue
+            failures += 1
+            if failures >= self.max_retries and await self._isolate():
+                failures = 0
+                continue
+            await asyncio.sleep(self.retry_delay)
+
+    async def flush(self) -> bool:
+        """Write everything queued so far; False if the batch failed"""
+        async with self._lock:
+            if not self.pending:
+                return True
+            orders, self._orders = self._orders, OrderedDict()
+            trades, self._trades = self._trades, []
+            oldest, self._oldest = self._oldest, None
+            try:
+                await self._write(orders, trades)
+            except Exception as e:
+                self.failures += 1
+                self.logger.error(f"Error persisting {len(orders)} orders and {len(trades)} trades: {e}")
+                self._requeue(orders, trades, oldest)
+                return False
+
+            self.batches += 1
+            self.orders_written += len(orders)
+            self.trades_written += len(trades)
+            if oldest is not None:
+                self.max_lag = max(self.max_lag, time.perf_counter() - oldest)
+            return True
+
+    async def _isolate(self) -> bool:
+        """Write the queue one event at a time, dead-lettering those that fail.
+
+        Stops at the first error that means the database is unreachable and
+        requeues what is left; False if nothing could be written at all.
+        """
+        async with self._lock:
+            orders, self._orders = self._orders, OrderedDict()
+            trades, self._trades = self._trades, []
+            oldest, self._oldest = self._oldest, None
+            progressed = False
+            while orders or trades:
+                if orders:
+                    order_id, row = next(iter(orders.items()))
+                    batch, kind = ({order_id: row}, []), 'order'
+                else:
+                    row = trades[0]
+                    batch, kind = ({}, [row]), 'trade'
+                try:
+                    await self._write(*batch)
+                except TRANSIENT_ERRORS as e:
+                    self.failures += 1
+                    self.logger.error(f"Database unavailable while isolating failed events: {e}")
+                    self._requeue(orders, trades, oldest)
+                    return progressed
+                except Exception as e:
+                    self.dead_lettered += 1
+                    self.dead_letters.append({
+                        'kind': kind, 'row': row, 'error': str(e), 'at': datetime.utcnow()
+                    })
+                    self.logger.error(f"Dead-lettered {kind} {row['exchange_order_id']}: {e}")
+                else:
+                    self.orders_written += len(batch[0])
+                    self.trades_written += len(batch[1])
+                if kind == 'order':
+                    del orders[order_id]
+                else:
+                    trades.pop(0)
+                progressed = True
+
+            self.batches += 1
+            if oldest is not None:
+                self.max_lag = max(self.max_lag, time.perf_counter() - oldest)
+            return True
+
+    def _requeue(self, orders: Dict[str, Dict], trades: List[Dict], oldest: Optional[float]):
+        """Put a failed batch back in front of the events queued since"""
+        for order_id, row in self._orders.items():
+            if order_id in orders:
+                row.pop('created_at', None)
+                orders[order_id].update(row)
+            else:
+                orders[order_id] = row
+        self._orders = orders
+        self._trades = trades + self._trades
+        self._oldest = oldest
+
+    async def _write(self, orders: Dict[str, Dict], trades: List[Dict]):
+        """One transaction per flush"""
+        async with self.engine.begin() as conn:
+            ids = await self._order_ids(conn, set(orders) | {t['exchange_order_id'] for t in trades})
+
+            new = []
+            changes = []
+            for order_id, row in orders.items():
+                if order_id in ids:
+                    changes.append(row)
+                elif all(row.get(c) is not None for c in ('symbol', 'side', 'order_type', 'quantity')):
+                    new.append({
+                        **{column: row.get(column) for column in ORDER_COLUMNS},
+                        'exchange': self.exchange,
+                        'status': row.get('status', OrderStatus.PENDING)
+                    })
+                else:
+                    # Placed before persistence started; nothing to attach the update to
+                    self.logger.warning(f"Dropping update for unknown order {order_id}")
+
+            if new:
+                await conn.execute(insert(Order), new)
+                if trades:
+                    ids.update(await self._order_ids(conn, {row['exchange_order_id'] for row in new}))
+
+            if changes:
+                await conn.execute(
+                    update(Order)
+                    .where(Order.exchange_order_id == bindparam('b_order_id'))
+                    .values(status=bindparam('b_status'), updated_at=bindparam('b_updated_at')),
+                    [
+                        {
+                            'b_order_id': row['exchange_order_id'],
+                            'b_status': row.get('status', OrderStatus.PENDING),
+                            'b_updated_at': row['updated_at']
+                        }
+                        for row in changes
+                    ]
+                )
+
+            if trades:
+                rows = [
+                    {**{c: t.get(c) for c in TRADE_COLUMNS}, 'order_id': ids.get(t['exchange_order_id'])}
+                    for t in trades
+                ]
+                await self._insert_trades(conn, rows)
+                await rollups.apply(conn, rows)
+
+    async def _order_ids(self, conn: AsyncConnection, order_ids: Iterable[str]) -> Dict[str, int]:
+        """Database ids of the orders already written"""
+        order_ids = list(order_ids)
+        found = {}
+        for start in range(0, len(order_ids), 500):
+            result = await conn.execute(
+                select(Order.exchange_order_id, Order.id)
+                .where(Order.exchange_order_id.in_(order_ids[start:start + 500]))
+            )
+            found.update(dict(result.all()))
+        return found
+
+    async def _insert_trades(self, conn: AsyncConnection, rows: List[Dict]):
+        if conn.dialect.driver == 'asyncpg':
+            # COPY is the cheapest bulk path on Postgres
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                Trade.__tablename__,
+                records=[tuple(row[c] for c in TRADE_COLUMNS) for row in rows],
+                columns=list(TRADE_COLUMNS)
+            )
+        else:
+            await conn.execute(insert(Trade), rows)
+
+    def get_stats(self) -> Dict:
+        return {
+            'pending': self.pending,
+            'orders_written': self.orders_written,
+            'trades_written': self.trades_written,
+            'batches': self.batches,
+            'failures': self.failures,
+            'dead_lettered': self.dead_lettered,
+            'max_lag': self.max_lag
+        }
@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from datetime import datetime
+import base64
+import json
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+
+from .models import Order, OrderStatus, Strategy, Trade
+
+MAX_PAGE_SIZE = 500
+
+@dataclass
+class Page:
+    items: List[Dict]
+    next_cursor: Optional[str]
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; ValueError for anything else"""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+async def _page(session, model, time_column, filters, cursor, limit) -> Page:
+    """Newest-first keyset page: rows strictly after the cursor's (time, id)"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = select(model).where(*filters)
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(time_column, model.id) < tuple_(timestamp, row_id))
+    query = query.order_by(time_column.desc(), model.id.desc()).limit(limit + 1)
+
+    rows = (await session.execute(query)).scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, time_column.key), last.id)
+    return Page([_as_dict(row) for row in rows], next_cursor)
+
+def _as_dict(row) -> Dict:
+    data = {column.key: getattr(row, column.key) for column in row.__table__.columns}
+    if isinstance(data.get('status'), OrderStatus):
+        data['status'] = data['status'].value
+    return data
+
+async def list_orders(
+    session,
+    user_id: int,
+    status: Optional[str] = None,
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Page:
+    """A user's orders, newest first, optionally by status, symbol and time range"""
+    filters = [Order.user_id == user_id]
+    if status:
+        filters.append(Order.status == OrderStatus(status.upper()))
+    if symbol:
+        filters.append(Order.symbol == symbol)
+    if since:
+        filters.append(Order.created_at >= since)
+    if until:
+        filters.append(Order.created_at < until)
+    return await _page(session, Order, Order.created_at, filters, cursor, limit)
+
+async def list_trades(
+    session,
+    user_id: int,
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Page:
+    """A user's trades, newest first, optionally by symbol and time range"""
+    filters = [Trade.user_id == user_id]
+    if symbol:
+        filters.append(Trade.symbol == symbol)
+    if since:
+        filters.append(Trade.executed_at >= since)
+    if until:
+        filters.append(Trade.executed_at < until)
+    return await _page(session, Trade, Trade.executed_at, filters, cursor, limit)
+
+async def get_strategy(session, user_id: int, strategy_id: int) -> Optional[Strategy]:
+    """A user's strategy row, or None if it does not exist or belongs to someone else"""
+    result = await session.execute(
+        select(Strategy).where(Strategy.id == strategy_id, Strategy.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
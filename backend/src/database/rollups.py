@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .models import TradeRollup
+
+PERIODS = {
+    '1h': lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    '1d': lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0)
+}
+MEASURES = ('trades', 'volume', 'notional', 'fees', 'realized_pnl')
+KEY_COLUMNS = ('user_id', 'symbol', 'period', 'bucket')
+UPSERT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+def aggregate(trades: Iterable[Dict]) -> List[Dict]:
+    """Sum trade rows into one rollup row per (user, symbol, period, bucket)"""
+    totals: Dict[Tuple, Dict] = {}
+    for trade in trades:
+        user_id = trade.get('user_id') or 0
+        for period, bucket_of in PERIODS.items():
+            key = (user_id, trade['symbol'], period, bucket_of(trade['executed_at']))
+            row = totals.get(key)
+            if row is None:
+                row = totals[key] = {
+                    'user_id': key[0], 'symbol': key[1], 'period': period, 'bucket': key[3],
+                    'trades': 0, 'volume': 0.0, 'notional': 0.0, 'fees': 0.0, 'realized_pnl': 0.0
+                }
+            row['trades'] += 1
+            row['volume'] += trade['quantity']
+            row['notional'] += trade['quantity'] * trade['price']
+            row['fees'] += trade['commission']
+            row['realized_pnl'] += trade.get('realized_pnl') or 0.0
+    return list(totals.values())
+
+async def apply(conn: AsyncConnection, trades: List[Dict]):
+    """Add a batch of trades to the rollups, inside the caller's transaction"""
+    rows = aggregate(trades)
+    if not rows:
+        return
+    upsert = UPSERT_INSERTS.get(conn.dialect.name)
+    if upsert is None:
+        await _select_then_update(conn, rows)
+        return
+    statement = upsert(TradeRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(KEY_COLUMNS),
+        set_={
+            measure: getattr(TradeRollup, measure) + getattr(statement.excluded, measure)
+            for measure in MEASURES
+        }
+    )
+    await conn.execute(statement, rows)
+
+async def _select_then_update(conn: AsyncConnection, rows: List[Dict]):
+    """Upsert for dialects without ON CONFLICT; safe with the single writer"""
+    keys = [tuple(row[c] for c in KEY_COLUMNS) for row in rows]
+    existing = set()
+    for start in range(0, len(keys), 200):
+        result = await conn.execute(
+            select(*[getattr(TradeRollup, c) for c in KEY_COLUMNS]).where(or_(*[
+                and_(*[getattr(TradeRollup, c) == value for c, value in zip(KEY_COLUMNS, key)])
+                for key in keys[start:start + 200]
+            ]))
+        )
+        existing.update(tuple(row) for row in result.all())
+
+    changes = [row for key, row in zip(keys, rows) if key in existing]
+    new = [row for key, row in zip(keys, rows) if key not in existing]
+    if changes:
+        await conn.execute(
+            update(TradeRollup)
+            .where(*[getattr(TradeRollup, c) == bindparam(f"k_{c}") for c in KEY_COLUMNS])
+            .values({
+                measure: getattr(TradeRollup, measure) + bindparam(f"m_{measure}")
+                for measure in MEASURES
+            }),
+            [
+                {
+                    **{f"k_{c}": row[c] for c in KEY_COLUMNS},
+                    **{f"m_{measure}": row[measure] for measure in MEASURES}
+                }
+                for row in changes
+            ]
+        )
+    if new:
+        await conn.execute(insert(TradeRollup), new)
+
+async def read_rollups(
+    session,
+    user_id: Optional[int],
+    period: str = '1d',
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> List[Dict]:
+    """Rollup rows, oldest bucket first; without a symbol, summed across symbols"""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    filters = [TradeRollup.user_id == (user_id or 0), TradeRollup.period == period]
+    if symbol:
+        filters.append(TradeRollup.symbol == symbol)
+    if since:
+        filters.append(TradeRollup.bucket >= since)
+    if until:
+        filters.append(TradeRollup.bucket < until)
+
+    query = (
+        select(
+            TradeRollup.bucket,
+            *[func.sum(getattr(TradeRollup, measure)).label(measure) for measure in MEASURES]
+        )
+        .where(*filters)
+        .group_by(TradeRollup.bucket)
+        .order_by(TradeRollup.bucket)
+    )
+    rows = (await session.execute(query)).mappings().all()
+    return [{'symbol': symbol, 'period': period, **row} for row in rows]
+
+async def daily_returns(
+    session,
+    user_id: Optional[int],
+    capital: Decimal,
+    days: int = 30,
+    now: Optional[datetime] = None
+) -> List[Decimal]:
+    """Daily realized P&L over capital for the last days, 0 for days without trades"""
+    today = PERIODS['1d'](now or datetime.utcnow())
+    start = today - timedelta(days=days)
+    pnl = {
+        row['bucket']: row['realized_pnl']
+        for row in await read_rollups(session, user_id, '1d', since=start, until=today)
+    }
+    if not pnl or not capital:
+        return []
+    return [
+        Decimal(str(pnl.get(start + timedelta(days=i), 0.0))) / capital
+        for i in range(days)
+    ]
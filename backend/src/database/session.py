@@ -0,0 +1,26 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config import settings
+from .models import Base
+from .partitioning import create_trades_table, ensure_partitions
+
+def async_url(url: str) -> str:
+    """Use the asyncio driver for the configured database"""
+    if url.startswith('postgresql://'):
+        return 'postgresql+asyncpg://' + url[len('postgresql://'):]
+    if url.startswith('sqlite://'):
+        return 'sqlite+aiosqlite://' + url[len('sqlite://'):]
+    return url
+
+engine = create_async_engine(
+    async_url(settings.DATABASE_URL),
+    pool_size=settings.DATABASE_POOL_SIZE,
+    pool_pre_ping=True
+)
+async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+async def init_db():
+    async with engine.begin() as conn:
+        await create_trades_table(conn)
+        await conn.run_sync(Base.metadata.create_all)
+        await ensure_partitions(conn)
@@ -1,6 +1,7 @@
-from fastapi import FastAPI, WebSocket, Depends
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import logging
 from typing import List, Dict, Any
@@ -8,7 +9,13 @@ import json
 
 from core.trading_system import TradingSystem
 from api.routes import router as api_router
-from database.session import init_db
+from api.connections import ConnectionManager
+from api.subscriptions import SubscriptionManager
+from api.serialization import negotiate
+from database.session import async_session, engine, init_db
+from database.persistence import PersistenceWriter
+from database.partitioning import maintain_partitions
+from database.rollups import daily_returns
 from config import settings
 
 # Configure logging
@@ -41,13 +48,44 @@ async def get_trading_system() -> TradingSystem:
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    partitions = asyncio.create_task(maintain_partitions(engine))
     # Pre-initialize the trading system
     trading_system = await get_trading_system()
+    app.state.trading_system = trading_system
+    if settings.TRADING_USER_ID is None:
+        logger.warning("TRADING_USER_ID is not set; live orders and trades are stored without a user")
+    persistence = PersistenceWriter(
+        engine,
+        settings.EXCHANGE_NAME,
+        user_id=settings.TRADING_USER_ID,
+        batch_size=settings.PERSISTENCE_BATCH_SIZE,
+        flush_interval=settings.PERSISTENCE_FLUSH_INTERVAL
+    )
+    trading_system.add_listener(subscriptions.on_event)
+    # Ticker and book subscriptions start the market data feed
+    subscriptions.feed = trading_system.market_data
+    # Orders and fills are written behind the trading path
+    trading_system.add_listener(persistence.on_event)
+    await persistence.start()
+    # Daily rollups instead of a scan of the trade history
+    try:
+        async with async_session() as session:
+            returns = await daily_returns(
+                session, settings.TRADING_USER_ID,
+                trading_system.portfolio.get_total_value()
+            )
+        trading_system.warm_up_risk(returns)
+    except Exception as e:
+        logger.error(f"Error loading daily returns: {e}")
     logger.info("Trading system initialized successfully")
     yield
     # Shutdown
     logger.info("Shutting down trading system")
+    await manager.close()
     await trading_system.shutdown()
+    await persistence.stop()
+    partitions.cancel()
+    await engine.dispose()
 
 app = FastAPI(
     title="Crypto Trading Tool API",
@@ -69,36 +107,34 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api")
 
 # WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: Dict[str, Any]):
-        for connection in self.active_connections:
-            await connection.send_json(message)
+manager = ConnectionManager(
+    queue_size=settings.WS_SEND_QUEUE_SIZE,
+    overflow_policy=settings.WS_OVERFLOW_POLICY
+)
+subscriptions = SubscriptionManager(manager)
 
-manager = ConnectionManager()
+@app.get("/ws/metrics")
+async def websocket_metrics():
+    """Fan-out latency and dropped message counts"""
+    return manager.get_metrics()
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, trading_system: TradingSystem = Depends(get_trading_system)):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket):
+    # ?format=msgpack switches this client to MessagePack binary frames
+    await manager.connect(websocket, negotiate(websocket.query_params.get('format')))
     try:
         while True:
             data = await websocket.receive_json()
-            # Process received data
-            response = await trading_system.process_ws_message(data)
+            # Subscribe, unsubscribe or resync a topic
+            response = await subscriptions.handle(websocket, data)
             if response:
-                await websocket.send_json(response)
+                await manager.send(websocket, response)
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
+        subscriptions.drop(websocket)
         manager.disconnect(websocket)
 
 if __name__ == "__main__":
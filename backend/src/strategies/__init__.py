@@ -0,0 +1,19 @@
+from typing import Dict
+
+from .base_strategy import BaseStrategy
+from .grid_trading import GridTradingStrategy
+
+# Strategy.type values and the classes they run as
+STRATEGY_TYPES = {
+    'grid_trading': GridTradingStrategy,
+}
+
+def build_strategy(strategy_type: str, trading_system, config: Dict) -> BaseStrategy:
+    """Instantiate a stored strategy for the trading system"""
+    try:
+        strategy_class = STRATEGY_TYPES[strategy_type]
+    except KeyError:
+        raise ValueError(f"Unknown strategy type: {strategy_type}")
+    return strategy_class(trading_system, config)
+
+__all__ = ['BaseStrategy', 'GridTradingStrategy', 'STRATEGY_TYPES', 'build_strategy']
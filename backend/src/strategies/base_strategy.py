@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
 from decimal import Decimal
 import logging
 from datetime import datetime
@@ -22,6 +22,20 @@ class BaseStrategy(ABC):
         """Execute trading signals"""
         pass
 
+    def precompute(self, bars: Dict) -> Optional[Dict]:
+        """Vectorized pass over a backtest's full OHLCV history.
+
+        Return {'evaluate': mask of bars analyze() must see, **feature
+        arrays for market_data}, or None to have every bar analyzed.
+        """
+        return None
+
+    def indicator(self, name: str, timeframe: str = '1m', **params):
+        """Streaming indicator shared with other strategies on this symbol"""
+        return self.trading_system.indicators.get(
+            self.config['symbol'], timeframe, name, **params
+        )
+
     async def start(self) -> None:
         """Start the strategy"""
         self.active = True
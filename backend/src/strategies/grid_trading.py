@@ -1,48 +1,92 @@
+from bisect import bisect_left
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict, List
+import numpy as np
+from typing import Dict, List, Optional, Set
 from .base_strategy import BaseStrategy
 
+@dataclass
+class GridLevel:
+    price: Decimal
+    side: Optional[str] = None   # side of the order working this level
+    status: str = 'idle'         # idle, pending, open
+    order: Optional[Dict] = None
+
 class GridTradingStrategy(BaseStrategy):
     def __init__(self, trading_system, config: Dict):
         super().__init__(trading_system, config)
         self.grid_levels = self._calculate_grid_levels()
+        self.levels = [GridLevel(price) for price in self.grid_levels]
         self.active_orders = {}
+        # Levels below the last price are on the sell side, the rest on the buy side
+        self.last_band: Optional[int] = None
+        self.retry: Set[int] = set()
 
     def _calculate_grid_levels(self) -> List[Decimal]:
         """Calculate price levels for the grid"""
         upper_price = Decimal(str(self.config['upper_price']))
         lower_price = Decimal(str(self.config['lower_price']))
         num_grids = self.config['num_grids']
-        
+
         price_step = (upper_price - lower_price) / (num_grids - 1)
         return [lower_price + (price_step * i) for i in range(num_grids)]
 
+    def precompute(self, bars: Dict) -> Optional[Dict]:
+        """Signals only change when the close moves to another grid band"""
+        levels = np.array([float(level) for level in self.grid_levels])
+        band = np.searchsorted(levels, bars['close'])
+        evaluate = np.ones(len(band), dtype=bool)
+        evaluate[1:] = band[1:] != band[:-1]
+        return {'evaluate': evaluate}
+
     async def analyze(self, market_data: Dict) -> Dict:
         if not self.active:
             return {}
 
         current_price = Decimal(str(market_data['price']))
+        band = bisect_left(self.grid_levels, current_price)
+
+        # Only levels crossed since the last tick (every level on the
+        # first one) and earlier failures can need a new order
+        if self.last_band is None:
+            candidates = range(len(self.levels))
+        else:
+            candidates = range(min(band, self.last_band), max(band, self.last_band))
+        self.last_band = band
+
         signals = []
+        for index in sorted(self.retry.union(candidates)):
+            level = self.levels[index]
+            side = 'SELL' if index < band else 'BUY'
+            if level.side == side and level.status != 'idle':
+                continue
 
-        for level in self.grid_levels:
-            if level not in self.active_orders:
-                if current_price > level:
-                    signals.append({
-                        'type': 'SELL',
-                        'price': level,
-                        'quantity': self.config['order_quantity']
-                    })
-                else:
-                    signals.append({
-                        'type': 'BUY',
-                        'price': level,
-                        'quantity': self.config['order_quantity']
-                    })
+            level.side = side
+            level.status = 'pending'
+            signals.append({
+                'type': side,
+                'price': level.price,
+                'quantity': self.config['order_quantity'],
+                'level': index
+            })
+        self.retry.clear()
 
         return {'signals': signals}
 
     async def execute(self, signal: Dict) -> Dict:
+        index = signal.get('level')
+        if index is None:
+            index = bisect_left(self.grid_levels, signal['price'])
+        level = self.levels[index]
+
         try:
+            # The level changed sides, so its previous order is stale
+            previous = level.order
+            if previous and previous.get('status') == 'open':
+                await self.trading_system.cancel_order(
+                    previous['id'], self.config['symbol']
+                )
+
             order = await self.trading_system.place_order(
                 symbol=self.config['symbol'],
                 side=signal['type'],
@@ -50,9 +94,16 @@ class GridTradingStrategy(BaseStrategy):
                 quantity=signal['quantity'],
                 price=signal['price']
             )
-            
+            if not order:
+                raise ValueError("Order rejected")
+
+            level.order = order
+            level.status = 'open'
             self.active_orders[signal['price']] = order
             return order
         except Exception as e:
             self.logger.error(f"Error executing grid order: {e}")
-            return {}
\ No newline at end of file
+            level.side = None
+            level.status = 'idle'
+            self.retry.add(index)
+            return {}
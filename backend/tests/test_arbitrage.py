@@ -0,0 +1,194 @@
+import asyncio
+import pytest
+from decimal import Decimal
+from src.core.advanced_features.arbitrage import Arbitrage
+from src.core.exchange import ExchangeConfig
+
+BOOKS = {
+    'binance': {'asks': [[100, 1], [100.5, 2]], 'bids': [[99, 1]]},
+    'kraken': {'asks': [[103, 1]], 'bids': [[101.5, 0.5], [101, 3], [100, 5]]},
+    'kucoin': {'asks': [[104, 1]], 'bids': [[98, 1]]}
+}
+
+@pytest.fixture
+def arbitrage():
+    arbitrage = Arbitrage(
+        [
+            ExchangeConfig(name, 'test_key', 'test_secret', testnet=False)
+            for name in BOOKS
+        ],
+        fee_rates={
+            'binance': Decimal('0.001'),
+            'kraken': Decimal('0.002'),
+            'kucoin': Decimal('0.001')
+        }
+    )
+    for exchange in arbitrage.exchanges:
+        async def get_orderbook(symbol, limit=20, name=exchange.config.name):
+            return BOOKS[name]
+        exchange.get_orderbook = get_orderbook
+    return arbitrage
+
+@pytest.mark.asyncio
+async def test_depth_aware_sizing(arbitrage):
+    opportunities = await arbitrage.find_arbitrage_opportunities('BTC/USDT')
+
+    assert len(opportunities) == 1
+    opportunity = opportunities[0]
+    assert opportunity['buy_exchange'] == 'binance'
+    assert opportunity['sell_exchange'] == 'kraken'
+    # Fee-adjusted crossing levels: 0.5 + 0.5 at the top, 2 more at 100.5
+    assert opportunity['max_quantity'] == Decimal('3')
+    assert opportunity['expected_profit'] == Decimal('1.3425')
+
+@pytest.mark.asyncio
+async def test_scan_many_symbols(arbitrage):
+    opportunities = await arbitrage.scan_opportunities(['BTC/USDT', 'ETH/USDT'])
+    assert [o['symbol'] for o in opportunities] == ['BTC/USDT', 'ETH/USDT']
+
+@pytest.mark.asyncio
+async def test_fees_remove_opportunity(arbitrage):
+    arbitrage.fee_rates = {name: Decimal('0.02') for name in BOOKS}
+    assert await arbitrage.find_arbitrage_opportunities('BTC/USDT') == []
+
+@pytest.mark.asyncio
+async def test_failed_leg_is_hedged(arbitrage):
+    sent = []
+
+    async def create_order(name, symbol, order_type, side, amount, price=None, params={}):
+        if name == 'kraken' and side == 'sell':
+            raise Exception("Insufficient balance")
+        sent.append((name, side))
+        return {'id': str(len(sent)), 'status': 'closed', 'filled': float(amount)}
+
+    for exchange in arbitrage.exchanges:
+        exchange.create_order = (
+            lambda *args, name=exchange.config.name: create_order(name, *args)
+        )
+
+    opportunity = (await arbitrage.find_arbitrage_opportunities('BTC/USDT'))[0]
+    opportunity['detected_at'] = 0.0
+    assert not await arbitrage.execute_arbitrage(opportunity, Decimal('1'))
+
+    assert sent == [('binance', 'buy'), ('binance', 'sell')]
+    report = arbitrage.execution_reports[-1]
+    assert report['hedged']
+    assert report['detection_to_fill_ms'] > 0
+
+def slow_leg(arbitrage, slow_venue, venue_orders, lookup):
+    """Make slow_venue's order time out after reaching the venue"""
+    sent = []
+
+    async def create_order(name, symbol, order_type, side, amount, price=None, params={}):
+        sent.append((name, side))
+        order = {'id': str(len(sent)), 'clientOrderId': params.get('clientOrderId'),
+                 'filled': float(amount)}
+        venue_orders[params.get('clientOrderId')] = order
+        if name == slow_venue and params.get('clientOrderId'):
+            await asyncio.sleep(1)
+        return order
+
+    for exchange in arbitrage.exchanges:
+        name = exchange.config.name
+        exchange.create_order = lambda *args, name=name: create_order(name, *args)
+        exchange.fetch_order_by_client_id = lookup
+    return sent
+
+@pytest.mark.asyncio
+async def test_timed_out_leg_that_executed_is_not_hedged(arbitrage):
+    venue_orders = {}
+
+    async def lookup(client_order_id, symbol):
+        return venue_orders.get(client_order_id)
+
+    sent = slow_leg(arbitrage, 'kraken', venue_orders, lookup)
+    opportunity = (await arbitrage.find_arbitrage_opportunities('BTC/USDT'))[0]
+    assert await arbitrage.execute_arbitrage(opportunity, Decimal('1'), leg_timeout=0.05)
+
+    report = arbitrage.execution_reports[-1]
+    assert report['reconciled'] and not report['hedged']
+    assert report['sell_order']['clientOrderId'].startswith('arb')
+    assert sent == [('binance', 'buy'), ('kraken', 'sell')]
+
+@pytest.mark.asyncio
+async def test_timed_out_leg_the_venue_never_saw_is_hedged(arbitrage):
+    async def lookup(client_order_id, symbol):
+        return None
+
+    sent = slow_leg(arbitrage, 'kraken', {}, lookup)
+    opportunity = (await arbitrage.find_arbitrage_opportunities('BTC/USDT'))[0]
+    assert not await arbitrage.execute_arbitrage(opportunity, Decimal('1'), leg_timeout=0.05)
+    assert arbitrage.execution_reports[-1]['hedged']
+    assert sent[-1] == ('binance', 'sell')
+
+@pytest.mark.asyncio
+async def test_unreconciled_leg_is_never_hedged_blind(arbitrage):
+    async def lookup(client_order_id, symbol):
+        raise Exception("venue unreachable")
+
+    sent = slow_leg(arbitrage, 'kraken', {}, lookup)
+    opportunity = (await arbitrage.find_arbitrage_opportunities('BTC/USDT'))[0]
+    assert not await arbitrage.execute_arbitrage(opportunity, Decimal('1'), leg_timeout=0.05)
+
+    report = arbitrage.execution_reports[-1]
+    assert not report['reconciled'] and not report['hedged']
+    assert sent == [('binance', 'buy'), ('kraken', 'sell')]
+
+@pytest.mark.asyncio
+async def test_legs_without_a_final_fill_are_unconfirmed(arbitrage):
+    sent = []
+    replies = {'binance': {'status': 'closed', 'filled': 0.0}, 'kraken': {'status': 'closed'}}
+
+    async def create_order(name, symbol, order_type, side, amount, price=None, params={}):
+        sent.append((name, side))
+        return {'id': str(len(sent)), **replies[name]}
+
+    for exchange in arbitrage.exchanges:
+        exchange.create_order = (
+            lambda *args, name=exchange.config.name: create_order(name, *args)
+        )
+
+    opportunity = (await arbitrage.find_arbitrage_opportunities('BTC/USDT'))[0]
+    await arbitrage.execute_arbitrage(opportunity, Decimal('1'))
+    # Zero is a real fill, a missing one is unknown and never read as the full size
+    report = arbitrage.execution_reports[-1]
+    assert not report['reconciled'] and not report['hedged']
+    assert sent == [('binance', 'buy'), ('kraken', 'sell')]
+
+    buy = await arbitrage._execute_leg(arbitrage.exchanges[0], 'BTC/USDT', 'buy', Decimal('1'), 1)
+    assert buy['filled'] == Decimal('0') and buy['confirmed']
+
+    # A reconciled order that is still open may fill later
+    replies['binance'] = {'status': 'open', 'filled': 0.0}
+    buy = await arbitrage._execute_leg(arbitrage.exchanges[0], 'BTC/USDT', 'buy', Decimal('1'), 1)
+    assert buy['filled'] == Decimal('0') and not buy['confirmed']
+
+@pytest.mark.asyncio
+async def test_continuous_size_is_capped_by_the_chosen_venues(arbitrage):
+    opportunity = {
+        'symbol': 'BTC/USDT', 'buy_exchange': 'binance', 'sell_exchange': 'kraken',
+        'max_quantity': Decimal('3'),
+        'buy_legs': {'binance': Decimal('1'), 'kucoin': Decimal('2')},
+        'sell_legs': {'kraken': Decimal('3')}
+    }
+    sizes = []
+
+    async def stream_opportunities(symbols, interval):
+        yield opportunity
+        yield {**opportunity, 'symbol': 'ETH/USDT', 'buy_legs': {'kucoin': Decimal('3')}}
+
+    async def execute_arbitrage(opportunity, size, leg_timeout):
+        sizes.append((opportunity['symbol'], size))
+        return True
+
+    arbitrage.stream_opportunities = stream_opportunities
+    arbitrage.execute_arbitrage = execute_arbitrage
+    await arbitrage.run_continuous(['BTC/USDT', 'ETH/USDT'], Decimal('10'))
+    await asyncio.sleep(0)
+    assert sizes == [('BTC/USDT', Decimal('1'))]
+
+def test_execution_reports_are_bounded():
+    arbitrage = Arbitrage([], max_reports=3)
+    for i in range(10):
+        arbitrage.execution_reports.append({'i': i})
+    assert [r['i'] for r in arbitrage.execution_reports] == [7, 8, 9]
@@ -0,0 +1,134 @@
+import json
+import numpy as np
+import pytest
+from decimal import Decimal
+from src.core.backtest import BacktestEngine
+from src.core.sweep import ParameterSweep
+from backend.src.strategies.base_strategy import BaseStrategy
+from backend.src.strategies.grid_trading import GridTradingStrategy
+
+GRID_CONFIG = {
+    'symbol': 'BTC/USDT',
+    'upper_price': 110,
+    'lower_price': 90,
+    'num_grids': 11,
+    'order_quantity': Decimal('1')
+}
+
+class EveryBarGrid(GridTradingStrategy):
+    def precompute(self, bars):
+        return None
+
+class Bracket(BaseStrategy):
+    """Buy one unit at 98 and sell it at 102"""
+    async def analyze(self, market_data):
+        if self.positions:
+            return {}
+        self.positions['placed'] = True
+        return {'signals': [('buy', 98), ('sell', 102)]}
+
+    async def execute(self, signal):
+        side, price = signal
+        return await self.trading_system.place_order(
+            self.config['symbol'], side, 'limit', Decimal('1'), Decimal(price)
+        )
+
+def random_walk_bars(n: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate(([100.0], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.001, n)) * close
+    timestamps = 1.7e12 + np.arange(n) * 60_000
+    return np.column_stack([
+        timestamps, open_,
+        np.maximum(open_, close) + wick,
+        np.minimum(open_, close) - wick,
+        close, np.ones(n)
+    ])
+
+@pytest.mark.asyncio
+async def test_precomputed_run_matches_every_bar_replay():
+    bars = random_walk_bars(20_000)
+
+    fast = await BacktestEngine(GridTradingStrategy, GRID_CONFIG).run(bars)
+    slow = await BacktestEngine(EveryBarGrid, GRID_CONFIG).run(bars)
+
+    assert fast.analyze_calls < slow.analyze_calls / 10
+    assert len(fast.trades) == len(slow.trades) > 0
+    assert fast.pnl == slow.pnl
+    np.testing.assert_allclose(fast.equity_curve, slow.equity_curve)
+
+@pytest.mark.asyncio
+async def test_limit_orders_fill_at_limit_and_mark_to_market():
+    bars = [
+        # ts, open, high, low, close, volume
+        [0, 100, 100, 100, 100, 1],
+        [60_000, 100, 100, 97, 97, 1],    # buy limit at 98 fills
+        [120_000, 97, 99, 96, 99, 1],
+        [180_000, 99, 104, 99, 103, 1],   # sell limit at 102 fills
+    ]
+
+    result = await BacktestEngine(
+        Bracket, {'symbol': 'BTC/USDT'},
+        initial_capital=Decimal('1000'), fee_rate=Decimal('0')
+    ).run(bars)
+
+    assert [(t['side'], t['price'], t['timestamp'].minute) for t in result.trades] == [
+        ('buy', Decimal('98.0'), 1), ('sell', Decimal('102.0'), 3)
+    ]
+    np.testing.assert_allclose(result.equity_curve, [1000, 999, 1001, 1004])
+    assert result.pnl == Decimal('4.0')
+    assert result.max_drawdown == Decimal('0.001')
+
+@pytest.mark.asyncio
+async def test_sweep_ranks_configs_and_resumes(tmp_path):
+    bars = random_walk_bars(5_000)
+    results_path = str(tmp_path / 'sweep.jsonl')
+    configs = ParameterSweep.grid({'num_grids': [3, 6, 11], 'upper_price': [105, 110]})
+
+    first = ParameterSweep(
+        GridTradingStrategy, GRID_CONFIG, bars, results_path, workers=2
+    )
+    await first.run(configs[:2])
+    assert first.evaluated == 2
+    # Interrupted while writing a third row
+    with open(results_path, 'a') as f:
+        f.write('{"params": {"num_grids": 3, "upp')
+
+    resumed = ParameterSweep(
+        GridTradingStrategy, GRID_CONFIG, bars, results_path, workers=2
+    )
+    table = await resumed.run(configs)
+
+    assert resumed.evaluated == len(configs) - 2
+    # The partial row was dropped, not glued to the first new one
+    with open(results_path) as f:
+        saved = [json.loads(line)['params'] for line in f]
+    assert sorted(saved, key=configs.index) == configs
+    assert [row['rank'] for row in table] == list(range(1, len(configs) + 1))
+    returns = [row['total_return'] for row in table]
+    assert returns == sorted(returns, reverse=True)
+
+    # Same numbers as a backtest in this process
+    best = table[0]
+    direct = await BacktestEngine(
+        GridTradingStrategy, {**GRID_CONFIG, **best['params']}
+    ).run(bars)
+    assert best['pnl'] == pytest.approx(float(direct.pnl))
+
+def test_ranking_follows_the_direction_of_the_metric():
+    rows = [
+        {'params': {'n': 1}, 'total_return': 0.2, 'max_drawdown': 0.3},
+        {'params': {'n': 2}, 'error': 'ValueError: bad grid'},
+        {'params': {'n': 3}, 'total_return': 0.1, 'max_drawdown': 0.05},
+        {'params': {'n': 4}, 'total_return': -0.1, 'max_drawdown': 0.2},
+    ]
+    bars = random_walk_bars(10)
+
+    def order(**kwargs):
+        sweep = ParameterSweep(GridTradingStrategy, GRID_CONFIG, bars, **kwargs)
+        return [row['params']['n'] for row in sweep.ranked(rows)]
+
+    assert order() == [1, 3, 4, 2]
+    assert order(rank_by='max_drawdown') == [3, 4, 1, 2]
+    assert order(rank_by='total_return', ascending=True) == [4, 3, 1, 2]
@@ -0,0 +1,97 @@
+import time
+import pytest
+from decimal import Decimal
+from src.core.capture import CaptureReplay, CaptureWriter
+from src.core.exchange import ExchangeConfig
+from src.core.trading import TradingSystem
+
+def books():
+    book = {'bids': [[99.0, 1.0], [98.0, 2.0]], 'asks': [[101.0, 1.0], [102.0, 3.0]]}
+    yield book
+    yield {'bids': [[99.5, 0.5], [99.0, 1.0]], 'asks': [[101.0, 1.0], [102.0, 3.0]]}
+    yield {'bids': [[99.5, 0.5], [99.0, 1.0]], 'asks': [[100.5, 2.0], [101.0, 0.2]]}
+
+def record(path):
+    writer = CaptureWriter(str(path))
+    for book in books():
+        writer.record_book('BTC/USDT', book)
+        writer.record_ticker('BTC/USDT', {
+            'bid': book['bids'][0][0], 'ask': book['asks'][0][0], 'last': None
+        })
+        time.sleep(0.02)
+    writer.record_fill('abc-1', 'BTC/USDT', 'buy', Decimal('100.5'), Decimal('0.25'))
+    writer.close()
+
+@pytest.mark.asyncio
+async def test_replay_rebuilds_books_from_diffs(tmp_path):
+    path = tmp_path / 'session.tcap'
+    record(path)
+    seen = []
+
+    async def on_book(symbol, orderbook):
+        seen.append(('book', orderbook['bids'], orderbook['asks']))
+
+    stats = await CaptureReplay(str(path)).replay(
+        on_ticker=lambda symbol, ticker: seen.append(('ticker', ticker['bid'], ticker['last'])),
+        on_book=on_book,
+        on_fill=lambda symbol, fill: seen.append(('fill', fill['order_id'], fill['side'], fill['amount'])),
+        speed=None
+    )
+
+    expected = []
+    for book in books():
+        expected.append(('book', book['bids'], book['asks']))
+        expected.append(('ticker', book['bids'][0][0], None))
+    expected.append(('fill', 'abc-1', 'buy', Decimal('0.25')))
+    assert seen == expected
+    assert stats['events'] == 7
+    assert stats['elapsed'] < stats['recorded_span']
+
+@pytest.mark.asyncio
+async def test_paced_replay_and_truncated_capture(tmp_path):
+    path = tmp_path / 'session.tcap'
+    record(path)
+
+    stats = await CaptureReplay(str(path)).replay(speed=1.0)
+    assert stats['elapsed'] >= stats['recorded_span'] * 0.95
+
+    fast = await CaptureReplay(str(path)).replay(speed=4.0)
+    assert fast['elapsed'] < stats['elapsed'] / 2
+
+    # A capture cut off mid-record replays up to the last whole event
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])
+    assert (await CaptureReplay(str(path)).replay(speed=None))['events'] == 6
+
+@pytest.mark.asyncio
+async def test_captured_fills_replay_into_the_portfolio_like_live_fills(tmp_path):
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('1000000')
+    )
+
+    async def create_order(symbol, order_type, side, amount, price=None, params={}):
+        return {'id': 'm-1', 'symbol': symbol, 'status': 'closed',
+                'average': 100.5, 'filled': float(amount)}
+
+    system.exchange.create_order = create_order
+    system.exchange.last_prices['BTC/USDT'] = Decimal('100.5')
+    path = tmp_path / 'session.tcap'
+    system.start_capture(str(path))
+    await system.place_order('BTC/USDT', 'buy', 'market', Decimal('0.25'))
+    system.stop_capture()
+
+    replayed = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('1000000')
+    )
+    fills = []
+    replayed.add_listener(lambda topic, symbol, data: topic == 'fills' and fills.append(data))
+    await CaptureReplay(str(path)).replay_into(replayed, speed=None)
+
+    assert [(f['order_id'], f['amount'], f['price']) for f in fills] == [
+        ('m-1', Decimal('0.25'), Decimal('100.5'))
+    ]
+    assert replayed.portfolio.positions['BTC/USDT'].amount == Decimal('0.25')
+    await system.exchange.exchange.close()
+    await replayed.exchange.exchange.close()
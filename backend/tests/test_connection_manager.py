@@ -0,0 +1,83 @@
+import asyncio
+import json
+import pytest
+from backend.src.api.connections import ConnectionManager
+
+class FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.received = []
+        self.closed = None
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.gate.wait()
+        self.received.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed = code
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_stall_others():
+    manager = ConnectionManager(queue_size=4)
+    fast, slow = FakeWebSocket(), FakeWebSocket(blocked=True)
+    await manager.connect(fast)
+    await manager.connect(slow)
+
+    await manager.broadcast({'type': 'tick', 'seq': 0})
+    await settle()  # the slow client's writer blocks on this one
+    for i in range(1, 10):
+        await manager.broadcast({'type': 'tick', 'seq': i})
+        await settle()
+
+    assert [m['seq'] for m in fast.received] == list(range(10))
+    slow.gate.set()
+    await settle()
+    assert [m['seq'] for m in slow.received] == [0, 6, 7, 8, 9]
+    metrics = manager.get_metrics()
+    assert metrics['messages_dropped'] == 5
+    assert metrics['messages_sent'] == 15
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_coalesce_keeps_latest_per_topic_and_symbol():
+    manager = ConnectionManager(queue_size=2, overflow_policy='coalesce')
+    slow = FakeWebSocket(blocked=True)
+    await manager.connect(slow)
+
+    await manager.broadcast({'topic': 'fill', 'symbol': 'BTC/USDT', 'seq': 0})
+    await settle()  # the writer picks this one up and blocks on it
+    await manager.broadcast({'topic': 'ticker', 'symbol': 'BTC/USDT', 'seq': 1})
+    await manager.broadcast({'topic': 'ticker', 'symbol': 'ETH/USDT', 'seq': 2})
+    for seq in range(3, 6):
+        await manager.broadcast({'topic': 'ticker', 'symbol': 'BTC/USDT', 'seq': seq})
+
+    slow.gate.set()
+    await settle()
+    assert [m['seq'] for m in slow.received] == [0, 5, 2]
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_slow_client():
+    manager = ConnectionManager(queue_size=2, overflow_policy='disconnect')
+    fast, slow = FakeWebSocket(), FakeWebSocket(blocked=True)
+    await manager.connect(fast)
+    await manager.connect(slow)
+
+    for i in range(5):
+        await manager.broadcast({'type': 'tick', 'seq': i})
+        await settle()
+
+    assert slow.closed == 1013
+    assert manager.active_connections == [fast]
+    assert len(fast.received) == 5
+    assert manager.get_metrics()['slow_disconnects'] == 1
+    await manager.close()
@@ -0,0 +1,125 @@
+import pytest
+from decimal import Decimal
+from src.core.advanced_features.consolidated_book import ConsolidatedOrderBook, DepthSplitRouter
+from src.core.exchange import Exchange, ExchangeConfig
+from src.core.trading import TradingSystem
+
+BOOKS = {
+    'binance': {'asks': [[100, 1], [101, 5]], 'bids': [[99, 2]]},
+    'kraken': {'asks': [[100.05, 2], [100.5, 1]], 'bids': [[99.5, 1]]}
+}
+
+@pytest.fixture
+def book():
+    exchanges = []
+    for name in BOOKS:
+        exchange = Exchange(ExchangeConfig(name, 'test_key', 'test_secret', testnet=False))
+        async def get_orderbook(symbol, limit=20, name=name):
+            return BOOKS[name]
+        exchange.get_orderbook = get_orderbook
+        exchanges.append(exchange)
+    return ConsolidatedOrderBook(
+        exchanges,
+        fee_rates={'binance': Decimal('0.001'), 'kraken': Decimal('0.002')}
+    )
+
+@pytest.mark.asyncio
+async def test_merge_orders_levels_by_all_in_price(book):
+    await book.refresh('BTC/USDT')
+
+    asks = [(level.venue, level.price) for level in book.asks['BTC/USDT']]
+    assert asks == [
+        ('binance', Decimal('100')),
+        ('kraken', Decimal('100.05')),
+        ('kraken', Decimal('100.5')),
+        ('binance', Decimal('101'))
+    ]
+    assert book.best_bid('BTC/USDT').venue == 'kraken'
+
+@pytest.mark.asyncio
+async def test_split_walks_cheapest_levels_first(book):
+    await book.refresh('BTC/USDT')
+    allocations = {
+        a.venue: a for a in book.split('BTC/USDT', 'buy', Decimal('5'))
+    }
+
+    assert allocations['binance'].quantity == Decimal('2')
+    assert allocations['binance'].limit_price == Decimal('101')
+    assert allocations['kraken'].quantity == Decimal('3')
+    assert allocations['kraken'].limit_price == Decimal('100.5')
+
+@pytest.mark.asyncio
+async def test_children_are_risk_checked_and_booked_through_the_trading_system(book):
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('10000')
+    )
+
+    sent = []
+    for name, exchange in book.exchanges.items():
+        async def create_order(symbol, order_type, side, amount, price=None, params={}, name=name):
+            sent.append((name, amount, params))
+            return {'id': f"{name}-1", 'status': 'closed', 'filled': float(amount),
+                    'average': float(price)}
+        exchange.create_order = create_order
+
+    router = DepthSplitRouter(system, book)
+    children = await router.route('BTC/USDT', 'buy', Decimal('5'), {'algorithm': 'multi_venue'})
+
+    assert sorted(name for name, _, _ in sent) == ['binance', 'kraken']
+    assert all(params == {'timeInForce': 'IOC'} for _, _, params in sent)
+    assert sum(child['filled'] for child in children) == Decimal('5')
+    # IOC children come back done: booked at once, never left to poll
+    assert system.active_orders == {}
+    assert system.portfolio.positions['BTC/USDT'].amount == Decimal('5')
+    assert {t['exchange'] for t in system.portfolio.trades_history} == {'binance', 'kraken'}
+    assert all(t['algorithm'] == 'multi_venue' for t in system.portfolio.trades_history)
+    assert all(t['time_in_force'] == 'IOC' for t in system.portfolio.trades_history)
+
+    # A child over the position limit is rejected before it reaches the venue
+    system.risk_manager.position_limits['BTC/USDT'] = Decimal('0.01')
+    sent.clear()
+    assert await router.route('BTC/USDT', 'buy', Decimal('5')) == []
+    assert sent == []
+
+@pytest.mark.asyncio
+async def test_open_children_are_polled_and_cancelled_on_their_venue(book):
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('10000')
+    )
+    venue_orders, cancelled = {}, []
+    for name, exchange in book.exchanges.items():
+        async def create_order(symbol, order_type, side, amount, price=None, params={}, name=name):
+            venue_orders[name] = {'id': f"{name}-1", 'symbol': symbol, 'side': side,
+                                  'type': order_type, 'status': 'open', 'filled': 0.0,
+                                  'price': float(price)}
+            return dict(venue_orders[name])
+
+        async def fetch_order(order_id, symbol, name=name):
+            assert order_id.startswith(name)
+            return dict(venue_orders[name])
+
+        async def cancel_order(order_id, symbol, name=name):
+            cancelled.append((name, order_id))
+            return {}
+
+        exchange.create_order = create_order
+        exchange.cancel_order = cancel_order
+        exchange.exchange.fetch_order = fetch_order
+
+    async def primary_fetch(order_id, symbol):
+        raise AssertionError("children must not be polled on the primary exchange")
+    system.exchange.exchange.fetch_order = primary_fetch
+
+    await DepthSplitRouter(system, book).route('BTC/USDT', 'buy', Decimal('5'))
+    assert set(system.active_orders) == {'binance-1', 'kraken-1'}
+
+    venue_orders['kraken'].update(status='closed', filled=3.0)
+    await system._check_order_status()
+    assert set(system.active_orders) == {'binance-1'}
+    assert system.portfolio.positions['BTC/USDT'].amount == Decimal('3')
+
+    assert await system.cancel_order('binance-1', 'BTC/USDT')
+    assert cancelled == [('binance', 'binance-1')]
+    assert system.active_orders == {} and system.order_exchanges == {}
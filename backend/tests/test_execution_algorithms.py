@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.core.advanced_features.execution_algorithms import TWAPExecution, VWAPExecution
+from src.core.advanced_features.volume_profile import VolumeProfile
+
+START = datetime(2024, 1, 1, 12, 0)
+
+class FakeTradingSystem:
+    """Records child orders; calls listed in reject are refused"""
+    def __init__(self, reject=()):
+        self.orders = []
+        self.reject = set(reject)
+
+    async def place_order(self, symbol, side, order_type, amount, context=None):
+        self.orders.append(amount)
+        if len(self.orders) - 1 in self.reject:
+            return None
+        return {'id': str(len(self.orders)), 'context': context}
+
+def flat_profile():
+    # 100 per hour, so each one-minute slice is forecast at 100 / 60
+    return VolumeProfile('BTC/USDT', 60, np.full(24, 1 / 24), 2400.0, START)
+
+async def run(execution):
+    while not execution.done:
+        await execution.step()
+
+@pytest.mark.asyncio
+async def test_vwap_replans_from_the_volume_that_traded():
+    slice_volume = 100 / 60
+    windows = []
+
+    async def realized_volume(symbol, start, end):
+        windows.append((start, end))
+        # Three slices' worth in the first slice, then no data
+        return 3 * slice_volume if len(windows) == 1 else None
+
+    system = FakeTradingSystem()
+    execution = VWAPExecution(
+        system, 'BTC/USDT', 'buy', Decimal('12'),
+        {'intervals': 4, 'interval_duration': 60},
+        profile=flat_profile(), realized_volume=realized_volume
+    )
+    execution.start = START
+    await run(execution)
+
+    # 3 on the forecast, then catch up to 4/6 of the horizon, then 5/6 and the rest
+    assert [float(q) for q in system.orders] == pytest.approx([3, 5, 2, 2])
+    assert execution.filled == Decimal('12')
+    assert windows == [
+        (START + timedelta(minutes=i), START + timedelta(minutes=i + 1)) for i in range(3)
+    ]
+
+@pytest.mark.asyncio
+async def test_twap_spreads_a_rejected_slice_over_the_rest():
+    system = FakeTradingSystem(reject={1})
+    execution = TWAPExecution(system, 'BTC/USDT', 'sell', Decimal('10'), {'intervals': 4})
+    intervals = []
+    while not execution.done:
+        intervals.append(await execution.step())
+
+    assert [float(q) for q in system.orders] == pytest.approx([2.5, 7.5 / 3, 3.75, 3.75])
+    assert execution.filled == Decimal('10')
+    assert intervals == [60] * 4
+
+@pytest.mark.parametrize('algorithm', [TWAPExecution, VWAPExecution])
+def test_intervals_must_be_positive(algorithm):
+    with pytest.raises(ValueError):
+        algorithm(FakeTradingSystem(), 'BTC/USDT', 'buy', Decimal('1'), {'intervals': 0})
@@ -0,0 +1,71 @@
+import random
+import pytest
+from decimal import Decimal
+from backend.src.strategies.grid_trading import GridTradingStrategy
+
+class RecordingTradingSystem:
+    def __init__(self):
+        self.placed = []
+        self.cancelled = []
+
+    async def place_order(self, symbol, side, order_type, quantity, price=None):
+        order = {'id': str(len(self.placed)), 'side': side, 'price': price, 'status': 'open'}
+        self.placed.append(order)
+        return order
+
+    async def cancel_order(self, order_id, symbol):
+        self.cancelled.append(order_id)
+        return True
+
+@pytest.fixture
+def strategy():
+    return GridTradingStrategy(RecordingTradingSystem(), {
+        'symbol': 'BTC/USDT',
+        'upper_price': '45000',
+        'lower_price': '35000',
+        'num_grids': 5001,   # 2.0 apart
+        'order_quantity': '0.001'
+    })
+
+async def tick(strategy, price):
+    signals = (await strategy.analyze({'price': price}))['signals']
+    for signal in signals:
+        await strategy.execute(signal)
+    return signals
+
+@pytest.mark.asyncio
+async def test_only_crossed_levels_signal(strategy):
+    await strategy.start()
+    assert len(await tick(strategy, '40000.5')) == 5001
+    assert await tick(strategy, '40001.5') == []
+
+    crossed = await tick(strategy, '40005')
+    assert [(s['type'], s['price']) for s in crossed] == [
+        ('SELL', Decimal('40002')), ('SELL', Decimal('40004'))
+    ]
+    # The replaced buy orders at those levels were pulled
+    assert len(strategy.trading_system.cancelled) == 2
+
+    crossed = await tick(strategy, '40001')
+    assert [(s['type'], s['price']) for s in crossed] == [
+        ('BUY', Decimal('40002')), ('BUY', Decimal('40004'))
+    ]
+
+@pytest.mark.asyncio
+async def test_level_sides_follow_price_after_random_walk(strategy):
+    await strategy.start()
+    rng = random.Random(3)
+    price = Decimal('40000')
+    await tick(strategy, price)
+    for _ in range(500):
+        price += Decimal(rng.randint(-40, 40))
+        await tick(strategy, price)
+
+    assert all(
+        level.side == ('SELL' if price > level.price else 'BUY')
+        and level.status == 'open'
+        for level in strategy.levels
+    )
+    # Exactly one order per level plus one per level change of side
+    placed = strategy.trading_system.placed
+    assert len(placed) - len(strategy.trading_system.cancelled) == len(strategy.levels)
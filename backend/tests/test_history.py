@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from datetime import datetime, timezone
+from src.core.history import HistoricalStore, MS_PER_DAY
+
+START = int(datetime(2024, 3, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+def minute_candles(start_ms: int, count: int) -> np.ndarray:
+    ts = start_ms + np.arange(count) * 60_000
+    close = 100 + np.arange(count) * 0.01
+    return np.column_stack([ts, close, close + 1, close - 1, close, np.ones(count)])
+
+def test_range_reads_across_day_partitions(tmp_path):
+    store = HistoricalStore(str(tmp_path))
+    candles = minute_candles(START, 3 * 1440)
+    assert store.write_candles('BTC/USDT', '1m', candles) == len(candles)
+    assert len(list((tmp_path / 'candles' / '1m' / 'BTC-USDT').iterdir())) == 3
+
+    # Inside one day: a view over the memory map, no copy
+    day = store.read_candles('BTC/USDT', '1m', START + 60_000 * 10, START + 60_000 * 20)
+    assert isinstance(day['close'], np.memmap)
+    np.testing.assert_array_equal(day['close'], candles[10:20, 4])
+
+    # Across the day boundary
+    start, end = START + MS_PER_DAY - 60_000 * 5, START + MS_PER_DAY + 60_000 * 5
+    rows = store.get_ohlcv('BTC/USDT', '1m', start, end)
+    np.testing.assert_array_equal(rows, candles[1435:1445])
+    assert store.candle_coverage('BTC/USDT', '1m') == (START, int(candles[-1, 0]))
+
+def test_live_append_skips_repeats_and_backfill_merges(tmp_path):
+    store = HistoricalStore(str(tmp_path))
+    candles = minute_candles(START, 100)
+
+    assert store.append_candles('BTC/USDT', '1m', candles[50:80]) == 30
+    # A feed re-sending the last candles only adds the new ones
+    assert store.append_candles('BTC/USDT', '1m', candles[75:90]) == 10
+    # Older candles cannot be appended to a day...
+    assert store.append_candles('BTC/USDT', '1m', candles[:50]) == 0
+    # ...but backfill merges them in
+    assert store.write_candles('BTC/USDT', '1m', candles[:60]) == 50
+
+    stored = store.get_ohlcv('BTC/USDT', '1m', START, START + MS_PER_DAY)
+    np.testing.assert_array_equal(stored, candles[:90])
+
+    # Columns left uneven by an interrupted append are repaired
+    with open(tmp_path / 'candles' / '1m' / 'BTC-USDT' / '2024-03-01' / 'close.bin', 'ab') as f:
+        f.write(b'\0' * 8)
+    assert store.append_candles('BTC/USDT', '1m', candles[90:]) == 10
+    np.testing.assert_array_equal(
+        store.get_ohlcv('BTC/USDT', '1m', START, START + MS_PER_DAY), candles
+    )
+
+def test_trades_round_trip(tmp_path):
+    store = HistoricalStore(str(tmp_path))
+    trades = [
+        {'timestamp': START + i * 500, 'price': 100 + i, 'amount': 0.1, 'side': 'buy' if i % 2 else 'sell'}
+        for i in range(10)
+    ]
+    assert store.append_trades('ETH/USDT', trades) == 10
+    window = store.read_trades('ETH/USDT', START + 1000, START + 3000)
+    np.testing.assert_array_equal(window['price'], [102, 103, 104, 105])
+    np.testing.assert_array_equal(window['side'], [-1, 1, -1, 1])
+
+    # A redelivered batch adds only the trades the store has not seen, while
+    # a different trade at the boundary timestamp is still kept
+    last = trades[-1]
+    redelivered = trades[-3:] + [
+        {**last, 'price': 120}, {**last, 'timestamp': last['timestamp'] + 1}
+    ]
+    assert store.append_trades('ETH/USDT', redelivered) == 2
+    tail = store.read_trades('ETH/USDT', last['timestamp'], last['timestamp'] + 2)
+    np.testing.assert_array_equal(tail['price'], [109, 120, 109])
+
+def test_leftover_staging_directories_are_ignored(tmp_path):
+    store = HistoricalStore(str(tmp_path))
+    candles = minute_candles(START, 10)
+    store.write_candles('BTC/USDT', '1m', candles)
+    store.write_candles('BTC/USDT', '1m', candles)
+
+    # Left behind by a rewrite that died, in the current and older layout
+    symbol_dir = tmp_path / 'candles' / '1m' / 'BTC-USDT'
+    (symbol_dir / '.2024-03-01.123.456').mkdir()
+    (symbol_dir / '2024-03-01.123.456.old').mkdir()
+
+    assert store.candle_coverage('BTC/USDT', '1m') == (START, int(candles[-1, 0]))
+    np.testing.assert_array_equal(
+        store.get_ohlcv('BTC/USDT', '1m', START, START + MS_PER_DAY), candles
+    )
@@ -0,0 +1,128 @@
+import pytest
+from decimal import Decimal
+from src.core.advanced_features.iceberg import IcebergExecution
+from src.core.exchange import ExchangeConfig
+from src.core.trading import TradingSystem
+
+@pytest.fixture
+def system():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('1000000')
+    )
+    system.venue = {}
+    system.exchange.last_prices['BTC/USDT'] = Decimal('100.2')
+    system.book = {'bids': [[100, 5]], 'asks': [[100.2, 5]]}
+
+    async def create_order(symbol, order_type, side, amount, price=None, params={}):
+        order = {
+            'id': str(len(system.venue)), 'symbol': symbol, 'side': side, 'type': order_type,
+            'amount': amount, 'price': price, 'filled': 0, 'status': 'open'
+        }
+        if order_type == 'market':
+            order.update(filled=amount, status='closed', average=100.2)
+        system.venue[order['id']] = order
+        return dict(order)
+
+    async def fetch_order(order_id, symbol):
+        return dict(system.venue[order_id])
+
+    async def cancel_order(order_id, symbol):
+        system.venue[order_id]['status'] = 'canceled'
+        return {}
+
+    async def get_orderbook(symbol, limit=20):
+        return system.book
+
+    system.exchange.create_order = create_order
+    system.exchange.cancel_order = cancel_order
+    system.exchange.get_orderbook = get_orderbook
+    system.exchange.exchange.fetch_order = fetch_order
+    return system
+
+def iceberg(system, total, **params):
+    return IcebergExecution(system, 'BTC/USDT', 'buy', Decimal(total), {
+        'duration': 3600, 'catch_up_threshold': 1, **params
+    })
+
+def limit_children(system):
+    return [o for o in system.venue.values() if o['type'] == 'limit']
+
+@pytest.mark.asyncio
+async def test_slices_are_refilled_at_display_size_until_done(system):
+    execution = iceberg(system, '2.5', display_quantity='1')
+
+    await execution.step()
+    children = limit_children(system)
+    assert [(c['amount'], c['price']) for c in children] == [(Decimal('1'), Decimal('100'))]
+
+    # Only one slice is ever visible; a full fill brings the next one
+    for expected in (Decimal('1'), Decimal('0.5')):
+        system.venue[execution.child.order_id].update(filled=1, status='closed')
+        await execution.step()
+        assert execution.child.quantity == expected
+        assert sum(1 for c in limit_children(system) if c['status'] == 'open') == 1
+
+    system.venue[execution.child.order_id].update(filled=0.5, status='closed')
+    await execution.step()
+    assert execution.done
+    assert execution.filled == Decimal('2.5')
+    assert execution.crossed == Decimal('0')
+    assert len(limit_children(system)) == 3
+
+@pytest.mark.asyncio
+async def test_partial_fill_keeps_slice_resting_until_filled(system):
+    execution = iceberg(system, '3', display_quantity='1')
+    await execution.step()
+    first = execution.child.order_id
+
+    system.venue[first]['filled'] = 0.4
+    await execution.step()
+    assert execution.child.order_id == first
+    assert execution.filled == Decimal('0.4')
+    assert len(limit_children(system)) == 1
+
+@pytest.mark.asyncio
+async def test_child_is_repriced_when_the_touch_moves_and_fills_are_booked(system):
+    execution = iceberg(system, '3', display_quantity='1')
+    await execution.step()
+    first = execution.child.order_id
+    system.venue[first]['filled'] = 0.25
+
+    system.book = {'bids': [[101, 5]], 'asks': [[101.2, 5]]}
+    await execution.step()
+
+    assert system.venue[first]['status'] == 'canceled'
+    assert execution.child.price == Decimal('101')
+    assert execution.child.quantity == Decimal('1')
+    assert execution.filled == Decimal('0.25')
+    assert system.portfolio.positions['BTC/USDT'].amount == Decimal('0.25')
+
+@pytest.mark.asyncio
+async def test_cancelled_partial_fill_is_published_like_a_polled_fill(system):
+    events = []
+    system.add_listener(lambda topic, symbol, data: events.append((topic, data)))
+    execution = iceberg(system, '3', display_quantity='1')
+    execution.parent_id = 'parent-1'
+    await execution.step()
+    first = execution.child.order_id
+    system.venue[first]['filled'] = 0.25
+
+    await execution.cancel()
+    trade, = system.portfolio.trades_history
+    assert (trade['algorithm'], trade['parent_id']) == ('iceberg', 'parent-1')
+    assert trade['order_time'] is not None
+    fills = [data for topic, data in events if topic == 'fills']
+    assert [(f['order_id'], f['amount'], f['price']) for f in fills] == [
+        (first, Decimal('0.25'), Decimal('100'))
+    ]
+    assert [data['amount'] for topic, data in events if topic == 'portfolio'] == [Decimal('0.25')]
+
+@pytest.mark.asyncio
+async def test_schedule_shortfall_is_crossed(system):
+    execution = iceberg(system, '2', display_quantity='0.5', duration=1e-6)
+    await execution.step()
+
+    assert execution.done
+    assert execution.crossed == Decimal('2')
+    assert limit_children(system) == []
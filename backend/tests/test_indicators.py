@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from src.core.indicators import (
+    ATR, EMA, RSI, Bar, BollingerBands, IndicatorRegistry, RollingVWAP
+)
+
+def random_bars(n: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.concatenate(([30000.0], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0005, n)) * close
+    return {
+        'timestamp': np.arange(n) * 60_000,
+        'open': open_,
+        'high': np.maximum(open_, close) + wick,
+        'low': np.minimum(open_, close) - wick,
+        'close': close,
+        'volume': rng.lognormal(0, 1, n)
+    }
+
+@pytest.mark.parametrize('make', [
+    lambda: EMA(20),
+    lambda: EMA(500),
+    lambda: ATR(14),
+    lambda: RSI(14),
+    lambda: BollingerBands(20, 2.0),
+    lambda: RollingVWAP(30)
+])
+def test_streaming_matches_batch(make):
+    columns = random_bars(20_000)
+    batch = make().batch(columns)
+
+    indicator = make()
+    streamed = []
+    for i in range(len(columns['close'])):
+        value = indicator.update(Bar(*(columns[k][i] for k in (
+            'timestamp', 'open', 'high', 'low', 'close', 'volume'
+        ))))
+        streamed.append(value if value is not None else np.full(batch.shape[1:], np.nan))
+
+    np.testing.assert_allclose(np.array(streamed, dtype=float), batch, rtol=1e-9)
+
+def test_registry_shares_state_per_symbol_and_timeframe():
+    registry = IndicatorRegistry()
+    first = registry.get('BTC/USDT', '1m', 'ema', period=3)
+    assert registry.get('BTC/USDT', '1m', 'ema', period=3) is first
+    assert registry.get('BTC/USDT', '5m', 'ema', period=3) is not first
+
+    # Ticks are aggregated into 1m bars; the EMA moves when a bar closes
+    for ts, price in [(0, 10), (30_000, 12), (60_000, 11), (120_000, 13)]:
+        registry.on_tick('BTC/USDT', price, 1.0, ts)
+    assert first.value == pytest.approx(12 + 0.5 * (11 - 12))
+
+    # A late subscriber is caught up from the shared bar history
+    late = registry.get('BTC/USDT', '1m', 'ema', period=3)
+    assert late is first
+    vwap = registry.get('BTC/USDT', '1m', 'vwap', period=2)
+    assert vwap.value == pytest.approx(((12 + 10 + 12) / 3 * 2 + 11) / 3)
@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+from decimal import Decimal
+from src.core.exchange import ExchangeConfig
+from src.core.trading import TradingSystem
+
+BOOK = {'bids': [[99.9, 1]], 'asks': [[100.1, 1]]}
+
+@pytest.fixture
+def system():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('1000000')
+    )
+    system.placed = []
+    system.cancelled = []
+    system.exchange.exchange.has = {}
+
+    async def create_order(symbol, order_type, side, amount, price=None, params={}):
+        order = {
+            'id': str(len(system.placed)), 'symbol': symbol, 'side': side,
+            'type': order_type, 'amount': amount, 'price': price
+        }
+        system.placed.append(order)
+        return order
+
+    async def cancel_order(order_id, symbol):
+        system.cancelled.append(order_id)
+        return {}
+
+    system.exchange.create_order = create_order
+    system.exchange.cancel_order = cancel_order
+    system.market_maker.min_requote_interval = 0
+    return system
+
+@pytest.mark.asyncio
+async def test_book_stream_requotes_and_filled_levels_are_replaced(system):
+    maker = system.market_maker
+    await maker.on_orderbook_update('BTC/USDT', BOOK, Decimal('0.1'))
+    assert [o['side'] for o in system.placed] == ['buy', 'sell']
+
+    # A book update inside the tolerance leaves both quotes resting
+    system.on_orderbook('BTC/USDT', {'bids': [[99.91, 1]], 'asks': [[100.11, 1]]})
+    await asyncio.sleep(0.01)
+    assert len(system.placed) == 2
+    assert maker.get_quote_stats('BTC/USDT')['skipped'] == 2
+
+    # The bid fills while the target has not moved
+    bid = system.placed[0]
+
+    async def fetch_order(order_id, symbol):
+        return {**bid, 'status': 'closed', 'filled': 0.1, 'price': bid['price']}
+
+    system.active_orders = {bid['id']: bid}
+    system.exchange.exchange.fetch_order = fetch_order
+    await system._check_order_status()
+    assert bid['id'] not in maker.active_orders['BTC/USDT']
+
+    system.on_orderbook('BTC/USDT', BOOK)
+    await asyncio.sleep(0.01)
+    assert [o['side'] for o in system.placed] == ['buy', 'sell', 'buy']
+    assert system.cancelled == []
+    assert len(maker.active_orders['BTC/USDT']) == 2
+
+@pytest.mark.asyncio
+async def test_books_for_symbols_not_being_made_are_ignored(system):
+    system.on_orderbook('ETH/USDT', BOOK)
+    await asyncio.sleep(0.01)
+    assert system.placed == []
+
+@pytest.mark.asyncio
+async def test_failed_cancel_keeps_the_quote_instead_of_doubling_the_level(system):
+    maker = system.market_maker
+    await maker.on_orderbook_update('BTC/USDT', BOOK, Decimal('0.1'))
+    resting = list(maker.active_orders['BTC/USDT'])
+
+    async def cancel_order(order_id, symbol):
+        raise ConnectionError("venue unreachable")
+
+    system.exchange.cancel_order = cancel_order
+    await maker.on_orderbook_update('BTC/USDT', {'bids': [[109.9, 1]], 'asks': [[110.1, 1]]})
+    assert len(system.placed) == 2
+    assert maker.active_orders['BTC/USDT'] == resting
+    assert maker.get_quote_stats('BTC/USDT')['cancel_failed'] == 2
+
+    await maker.cancel_quotes('BTC/USDT')
+    assert maker.active_orders['BTC/USDT'] == resting
+
+@pytest.mark.asyncio
+async def test_throttled_books_are_flushed_by_a_held_task(system):
+    maker = system.market_maker
+    maker.min_requote_interval = 0.02
+    await maker.on_orderbook_update('BTC/USDT', BOOK, Decimal('0.1'))
+    await maker.on_orderbook_update('BTC/USDT', {'bids': [[109.9, 1]], 'asks': [[110.1, 1]]})
+    assert len(maker._tasks) == 1
+    await asyncio.sleep(0.05)
+    assert not maker._tasks
+    assert len(system.placed) == 4
+
+@pytest.mark.asyncio
+async def test_polling_loop_survives_a_failed_book_fetch(system, monkeypatch):
+    maker = system.market_maker
+    replies = [ConnectionError("timed out"), BOOK]
+    quoted = []
+
+    async def get_orderbook(symbol, limit=20):
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    async def place_market_making_orders(symbol, bid_price, ask_price, quantity):
+        quoted.append((bid_price, ask_price))
+        raise asyncio.CancelledError
+
+    async def no_wait(delay):
+        pass
+
+    system.exchange.get_orderbook = get_orderbook
+    maker._place_market_making_orders = place_market_making_orders
+    monkeypatch.setattr(asyncio, 'sleep', no_wait)
+    with pytest.raises(asyncio.CancelledError):
+        await maker.start_market_making('BTC/USDT', Decimal('0.1'))
+    assert replies == [] and len(quoted) == 1
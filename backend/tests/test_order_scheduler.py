@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from decimal import Decimal
+from src.core.advanced_features.execution_algorithms import ExecutionAlgorithm
+from src.core.advanced_features.order_scheduler import ParentOrderScheduler
+
+class ScriptedExecution(ExecutionAlgorithm):
+    """Fills one unit per step after step_time, and logs what it did"""
+    name = 'scripted'
+
+    def __init__(self, log, total=3, step_time=0.0, interval=0.01, fail=False):
+        super().__init__(None, 'BTC/USDT', 'buy', Decimal(total))
+        self.log = log
+        self.step_time = step_time
+        self.interval = interval
+        self.fail = fail
+
+    async def step(self) -> float:
+        self.log.append(('start', self.parent_id))
+        await asyncio.sleep(self.step_time)
+        if self.fail:
+            raise RuntimeError("venue rejected the child")
+        self.filled += 1
+        self.done = self.remaining <= 0
+        self.log.append(('end', self.parent_id))
+        return self.interval
+
+    async def pause(self):
+        await super().pause()
+        self.log.append(('pause', self.parent_id))
+
+    async def cancel(self):
+        self.log.append(('cancel', self.parent_id))
+        await super().cancel()
+
+@pytest.mark.asyncio
+async def test_slow_slice_does_not_hold_up_other_parents():
+    log = []
+    scheduler = ParentOrderScheduler()
+    task = asyncio.create_task(scheduler.run())
+
+    slow = scheduler.submit('scripted', ScriptedExecution(log, total=1, step_time=0.3))
+    fast = scheduler.submit('scripted', ScriptedExecution(log, total=5))
+    await asyncio.wait_for(scheduler.wait(fast), 0.2)
+
+    assert scheduler.get_status(fast)['status'] == 'completed'
+    assert scheduler.get_status(slow)['status'] == 'running'
+    assert ('end', slow) not in log
+
+    await scheduler.wait(slow)
+    await scheduler.stop()
+    await task
+
+@pytest.mark.asyncio
+async def test_finished_parents_are_evicted_to_bounded_history():
+    log = []
+    scheduler = ParentOrderScheduler(max_history=2)
+    ids = [scheduler.submit('scripted', ScriptedExecution(log, total=2)) for _ in range(3)]
+    failed = scheduler.submit('scripted', ScriptedExecution(log, fail=True))
+    waiters = asyncio.gather(*[scheduler.wait(parent_id) for parent_id in ids + [failed]])
+    await asyncio.sleep(0)
+
+    task = asyncio.create_task(scheduler.run())
+    parents = await asyncio.wait_for(waiters, 1)
+
+    assert [p.status for p in parents] == ['completed'] * 3 + ['failed']
+    assert parents[-1].error == "venue rejected the child"
+    assert ('cancel', failed) in log
+
+    # Only the two most recently finished are still known
+    assert scheduler.parents == {}
+    assert len(scheduler.history) == 2
+    for parent_id in scheduler.history:
+        assert scheduler.get_status(parent_id)['status'] == 'completed'
+    with pytest.raises(ValueError):
+        scheduler.get_status(failed)
+
+    await scheduler.stop()
+    await task
+
+@pytest.mark.asyncio
+async def test_pause_waits_for_the_slice_in_flight():
+    log = []
+    scheduler = ParentOrderScheduler()
+    task = asyncio.create_task(scheduler.run())
+
+    parent_id = scheduler.submit(
+        'scripted', ScriptedExecution(log, total=3, step_time=0.05, interval=0)
+    )
+    await asyncio.sleep(0.01)
+    assert log == [('start', parent_id)]
+
+    await scheduler.pause(parent_id)
+    # The child posted by the slice was in place before pause() pulled it
+    assert log == [('start', parent_id), ('end', parent_id), ('pause', parent_id)]
+
+    await asyncio.sleep(0.1)
+    assert len(log) == 3
+    assert scheduler.get_status(parent_id)['filled'] == Decimal('1')
+
+    await scheduler.resume(parent_id)
+    await asyncio.wait_for(scheduler.wait(parent_id), 1)
+    assert scheduler.get_status(parent_id)['filled'] == Decimal('3')
+
+    await scheduler.stop()
+    await task
+
+@pytest.mark.asyncio
+async def test_cancel_during_a_slice_stops_after_it():
+    log = []
+    scheduler = ParentOrderScheduler()
+    task = asyncio.create_task(scheduler.run())
+
+    parent_id = scheduler.submit(
+        'scripted', ScriptedExecution(log, total=3, step_time=0.05, interval=0)
+    )
+    await asyncio.sleep(0.01)
+    await scheduler.cancel(parent_id)
+    await asyncio.sleep(0.1)
+
+    assert log == [('start', parent_id), ('end', parent_id), ('cancel', parent_id)]
+    assert scheduler.get_status(parent_id)['status'] == 'cancelled'
+    assert parent_id not in scheduler.parents
+
+    await scheduler.stop()
+    await task
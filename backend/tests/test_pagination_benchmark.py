@@ -0,0 +1,97 @@
+import sqlite3
+import time
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from backend.src.database.models import Base
+from backend.src.database.queries import decode_cursor, list_orders, list_trades
+
+USERS = 20
+SYMBOLS = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'XRP/USDT']
+STATUSES = ['PENDING', 'FILLED', 'FILLED', 'CANCELLED']
+START = datetime(2024, 1, 1)
+
+def seed(path, orders: int, first_id: int = 1):
+    """Bulk-load orders and one trade per filled order"""
+    conn = sqlite3.connect(path)
+    order_rows, trade_rows = [], []
+    for i in range(first_id, first_id + orders):
+        created = (START + timedelta(seconds=i * 7)).strftime('%Y-%m-%d %H:%M:%S.%f')
+        status = STATUSES[(i // USERS) % 4]
+        symbol = SYMBOLS[(i // (USERS * 4)) % 4]
+        order_rows.append((
+            i, i % USERS, 'binance', symbol, 'limit', 'buy', 0.01, 100.0,
+            status, str(i), created, created
+        ))
+        if status == 'FILLED':
+            trade_rows.append((i, i, i % USERS, symbol, 'buy', 0.01, 100.0, 0.001, 0.0, created))
+    conn.executemany('INSERT INTO orders VALUES (?,?,?,?,?,?,?,?,?,?,?,?)', order_rows)
+    conn.executemany('INSERT INTO trades VALUES (?,?,?,?,?,?,?,?,?,?)', trade_rows)
+    conn.commit()
+    conn.close()
+
+async def best_time(query, runs: int = 5) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await query()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+@pytest.mark.asyncio
+async def test_keyset_pages_use_indexes_and_stay_flat(tmp_path):
+    path = tmp_path / 'orders.db'
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        seed(path, 20_000)
+        first_page = lambda: list_orders(session, 3, limit=50)
+        small = await best_time(first_page)
+
+        seed(path, 180_000, first_id=20_001)
+        large = await best_time(first_page)
+
+        # Walk deep into the user's history: the cursor is a range seek, not an offset
+        cursor = None
+        for _ in range(16):
+            page = await list_orders(session, 3, cursor=cursor, limit=500)
+            cursor = page.next_cursor
+        deep = await best_time(lambda: list_orders(session, 3, cursor=cursor, limit=50))
+
+        assert large < small * 3 + 0.005
+        assert deep < large * 3 + 0.005
+
+        # Every page is distinct and in (created_at, id) order
+        page = await list_orders(session, 3, status='filled', symbol='ETH/USDT', limit=100)
+        second = await list_orders(
+            session, 3, status='filled', symbol='ETH/USDT', cursor=page.next_cursor, limit=100
+        )
+        keys = [(o['created_at'], o['id']) for o in page.items + second.items]
+        assert keys == sorted(keys, reverse=True) and len(set(keys)) == 200
+        assert all(o['status'] == 'FILLED' and o['symbol'] == 'ETH/USDT' for o in page.items)
+        assert decode_cursor(second.next_cursor) == keys[-1]
+
+        trades = await list_trades(session, 3, since=START + timedelta(days=1), limit=20)
+        assert len(trades.items) == 20
+        assert trades.items[0]['executed_at'] > trades.items[-1]['executed_at']
+
+        for sql in (
+            "SELECT * FROM orders WHERE user_id = 3 AND status = 'FILLED' "
+            "ORDER BY created_at DESC, id DESC LIMIT 50",
+            "SELECT * FROM orders WHERE user_id = 3 AND symbol = 'BTC/USDT' "
+            "AND (created_at, id) < ('2024-02-01', 1000) ORDER BY created_at DESC, id DESC LIMIT 50",
+            "SELECT * FROM trades WHERE user_id = 3 ORDER BY executed_at DESC, id DESC LIMIT 50",
+        ):
+            plan = ' '.join(
+                str(row[-1]) for row in (await session.execute(text('EXPLAIN QUERY PLAN ' + sql))).all()
+            )
+            assert 'USING INDEX' in plan and 'TEMP B-TREE' not in plan, plan
+
+    await engine.dispose()
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
@@ -0,0 +1,164 @@
+import asyncio
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.core.exchange import ExchangeConfig
+from src.core.trading import TradingSystem
+from backend.src.database.models import Base, Order, OrderStatus, Trade
+from backend.src.database.persistence import PersistenceWriter
+
+async def sqlite_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/trading.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+async def count(engine, model):
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(model))).scalar()
+
+@pytest.mark.asyncio
+async def test_order_and_fill_events_are_written_on_shutdown(tmp_path):
+    engine = await sqlite_engine(tmp_path)
+    writer = PersistenceWriter(engine, 'binance', user_id=7, flush_interval=60)
+    await writer.start()
+
+    for i in range(3000):
+        writer.record_order({
+            'id': i, 'symbol': 'BTC/USDT', 'side': 'buy', 'type': 'limit',
+            'amount': Decimal('0.01'), 'price': Decimal('100'), 'status': 'open'
+        })
+    # batch_size was reached, so this is written without waiting for the interval
+    for _ in range(200):
+        if writer.batches:
+            break
+        await asyncio.sleep(0.01)
+    assert await count(engine, Order) == 3000
+
+    for i in range(0, 3000, 2):
+        writer.record_order({'id': i, 'symbol': 'BTC/USDT', 'status': 'closed'})
+        writer.record_trade({
+            'order_id': i, 'symbol': 'BTC/USDT', 'side': 'buy', 'price': Decimal('100'),
+            'amount': Decimal('0.01'), 'fee': Decimal('0.001'), 'timestamp': datetime(2024, 1, 1)
+        })
+    writer.record_order({'id': 3000, 'symbol': 'BTC/USDT', 'side': 'sell',
+                         'type': 'market', 'amount': 1, 'status': 'closed'})
+    await writer.stop()
+
+    assert writer.pending == 0
+    assert await count(engine, Order) == 3001
+    assert await count(engine, Trade) == 1500
+    async with engine.connect() as conn:
+        filled = (await conn.execute(
+            select(func.count()).select_from(Order).where(Order.status == OrderStatus.FILLED)
+        )).scalar()
+        unlinked = (await conn.execute(
+            select(func.count()).select_from(Trade).where(Trade.order_id.is_(None))
+        )).scalar()
+        user = (await conn.execute(select(Order.user_id).limit(1))).scalar()
+    assert filled == 1501
+    assert unlinked == 0
+    assert user == 7
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_in_order(tmp_path):
+    engine = await sqlite_engine(tmp_path)
+    writer = PersistenceWriter(engine, 'binance', flush_interval=0.01, retry_delay=0.01)
+    real_write = writer._write
+    attempts = []
+
+    async def flaky_write(orders, trades):
+        attempts.append(len(orders))
+        if len(attempts) == 1:
+            raise ConnectionError("database unavailable")
+        await real_write(orders, trades)
+
+    writer._write = flaky_write
+    writer.record_order({'id': 'a', 'symbol': 'ETH/USDT', 'side': 'buy', 'type': 'limit',
+                         'amount': 1, 'price': 10, 'status': 'open'})
+    await writer.start()
+    await asyncio.sleep(0.005)
+    writer.record_order({'id': 'a', 'status': 'canceled'})
+    await writer.stop()
+
+    assert writer.failures == 1
+    async with engine.connect() as conn:
+        rows = (await conn.execute(select(Order.exchange_order_id, Order.status))).all()
+    assert rows == [('a', OrderStatus.CANCELLED)]
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_trading_system_publishes_orders_without_waiting_on_the_database(tmp_path):
+    engine = await sqlite_engine(tmp_path)
+    writer = PersistenceWriter(engine, 'binance', flush_interval=60)
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('1000000')
+    )
+    system.add_listener(writer.on_event)
+
+    async def create_order(symbol, order_type, side, amount, price=None, params={}):
+        return {'id': 'x1', 'symbol': symbol, 'side': side, 'type': order_type,
+                'amount': amount, 'price': price, 'status': 'closed', 'average': 100}
+
+    system.exchange.create_order = create_order
+    system.exchange.last_prices['BTC/USDT'] = Decimal('100')
+
+    order = await system.place_order('BTC/USDT', 'buy', 'market', Decimal('0.5'))
+    assert order['id'] == 'x1'
+    assert writer.pending == 2  # the order and its fill, queued only
+
+    await writer.start()
+    await writer.stop()
+    assert await count(engine, Order) == 1
+    assert await count(engine, Trade) == 1
+    await system.exchange.exchange.close()
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_rows_that_keep_failing_are_dead_lettered(tmp_path):
+    engine = await sqlite_engine(tmp_path)
+    writer = PersistenceWriter(
+        engine, 'binance', user_id=3, flush_interval=0.01, retry_delay=0.01, max_retries=2
+    )
+    writer.record_order({'id': 'a', 'symbol': 'ETH/USDT', 'side': 'buy', 'type': 'limit',
+                         'amount': 1, 'price': 10, 'status': 'closed'})
+    fill = {'order_id': 'a', 'symbol': 'ETH/USDT', 'side': 'buy', 'price': 10, 'amount': 1}
+    writer.record_trade(fill)
+    writer.record_trade({**fill, 'price': None})  # violates NOT NULL on every attempt
+    writer.record_trade(fill)
+    await writer.start()
+    await writer.stop()
+
+    assert writer.pending == 0
+    assert writer.failures == 2
+    assert [(d['kind'], d['row']['price']) for d in writer.dead_letters] == [('trade', None)]
+    assert writer.get_stats()['dead_lettered'] == 1
+    assert await count(engine, Order) == 1
+    assert await count(engine, Trade) == 2
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_nothing_is_dead_lettered_while_the_database_is_down(tmp_path):
+    engine = await sqlite_engine(tmp_path)
+    writer = PersistenceWriter(
+        engine, 'binance', flush_interval=0.01, retry_delay=0.01, max_retries=2
+    )
+
+    async def down(orders, trades):
+        raise ConnectionError("database unavailable")
+
+    writer._write = down
+    writer.record_order({'id': 'a', 'symbol': 'ETH/USDT', 'side': 'buy', 'type': 'limit',
+                         'amount': 1, 'price': 10, 'status': 'open'})
+    await writer.start()
+    await asyncio.sleep(0.05)
+    await writer.stop()
+
+    assert writer.pending == 1
+    assert writer.failures > 2
+    assert not writer.dead_letters
+    await engine.dispose()
@@ -0,0 +1,182 @@
+import asyncio
+import pytest
+from decimal import Decimal
+from src.core.exchange import ExchangeConfig
+from src.core.trading import TradingSystem
+
+def book(mid):
+    return {'bids': [[mid - 0.1, 1]], 'asks': [[mid + 0.1, 1]]}
+
+@pytest.fixture
+def system():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('1000000')
+    )
+    system.batches = []
+    system.cancels = []
+    system.cancel_ok = True
+
+    async def create_orders(orders):
+        system.batches.append(orders)
+        return [
+            {'id': f"{len(system.batches)}-{i}", **order} for i, order in enumerate(orders)
+        ]
+
+    async def cancel_orders(order_ids, symbol):
+        system.cancels.append((symbol, list(order_ids)))
+        return system.cancel_ok
+
+    async def get_orderbook(symbol, limit=20):
+        raise ConnectionError("books are pushed by the tests")
+
+    system.exchange.create_orders = create_orders
+    system.exchange.get_orderbook = get_orderbook
+    system.exchange.cancel_orders = cancel_orders
+    return system
+
+async def settle():
+    await asyncio.sleep(0.01)
+
+@pytest.mark.asyncio
+async def test_quotes_are_risk_checked_and_booked(system):
+    await system.start_quoting(['BTC/USDT', 'ETH/USDT'], Decimal('0.1'))
+    # 5000 at 100 is half the portfolio, over XRP's position limit
+    system.risk_manager.position_limits['XRP/USDT'] = Decimal('0.2')
+    system.quoting_manager.start_symbol('XRP/USDT', Decimal('5000'))
+
+    system.on_orderbook('BTC/USDT', book(100))
+    system.on_orderbook('ETH/USDT', book(10))
+    system.on_orderbook('XRP/USDT', book(100))
+    await settle()
+
+    # One batch for both symbols, nothing sent for the rejected one
+    assert len(system.batches) == 1
+    assert sorted({o['symbol'] for o in system.batches[0]}) == ['BTC/USDT', 'ETH/USDT']
+    assert len(system.active_orders) == 4
+    assert all(
+        system.order_context[order_id]['algorithm'] == 'quoting_manager'
+        for order_id in system.active_orders
+    )
+    assert system.quoting_manager.symbols['XRP/USDT'].quotes == {}
+    await system.quoting_manager.stop()
+
+@pytest.mark.asyncio
+async def test_failed_cancels_keep_quotes_tracked(system):
+    manager = system.quoting_manager
+    await system.start_quoting(['BTC/USDT'], Decimal('0.1'))
+    system.on_orderbook('BTC/USDT', book(100))
+    await settle()
+    resting = set(system.active_orders)
+    assert len(resting) == 2
+
+    system.cancel_ok = False
+    system.on_orderbook('BTC/USDT', book(105))
+    await settle()
+    assert len(system.cancels) == 1
+    assert len(system.batches) == 1
+    assert set(system.active_orders) == resting
+    assert {q.order_id for q in manager.symbols['BTC/USDT'].quotes.values()} == resting
+
+    system.cancel_ok = True
+    system.on_orderbook('BTC/USDT', book(105))
+    await settle()
+    assert len(system.batches) == 2
+    assert len(system.active_orders) == 2
+    assert not resting & set(system.active_orders)
+    await manager.stop()
+
+@pytest.mark.asyncio
+async def test_restarting_a_symbol_keeps_its_quotes_and_inventory(system):
+    manager = system.quoting_manager
+    await system.start_quoting(['BTC/USDT'], Decimal('0.1'))
+    assert system.market_data.watched('book') == ['BTC/USDT']
+    system.on_orderbook('BTC/USDT', book(100))
+    await settle()
+
+    with pytest.raises(ValueError):
+        manager.start_symbol('BTC/USDT', Decimal('0.1'))
+
+    buy = next(q for q in manager.symbols['BTC/USDT'].quotes.values() if q.side == 'buy')
+    system.active_orders.pop(buy.order_id)
+    manager.on_fill(buy.order_id, 'buy', Decimal('0.1'))
+
+    # A failed stop leaves the symbol tracked; starting it again resumes it
+    system.cancel_ok = False
+    manager.stop_symbol('BTC/USDT')
+    await settle()
+    assert 'BTC/USDT' in manager.symbols
+
+    manager.start_symbol('BTC/USDT', Decimal('0.1'))
+    state = manager.symbols['BTC/USDT']
+    assert state.active and state.inventory == Decimal('0.1')
+    assert manager.stopping == []
+
+    system.cancel_ok = True
+    await system.stop_quoting('BTC/USDT')
+    await settle()
+    assert system.market_data.watched('book') == []
+    assert 'BTC/USDT' not in manager.symbols
+    assert system.active_orders == {}
+    await manager.stop()
+
+class OtherVenue:
+    """A second venue: orders placed there are polled and cancelled there"""
+    def __init__(self):
+        self.orderbook_cache = {}
+        self.last_prices = {}
+        self.orders = {}
+        self.cancelled = []
+        venue = self
+
+        class Client:
+            async def fetch_order(self, order_id, symbol):
+                return venue.orders[order_id]
+
+        self.exchange = Client()
+
+    async def create_orders(self, orders):
+        created = []
+        for order in orders:
+            order_id = f"other-{len(self.orders)}"
+            self.orders[order_id] = {'id': order_id, 'status': 'open', **order}
+            created.append(dict(self.orders[order_id]))
+        return created
+
+    async def cancel_orders(self, order_ids, symbol):
+        self.cancelled.extend(order_ids)
+        return True
+
+    async def cancel_order(self, order_id, symbol):
+        self.cancelled.append(order_id)
+        return {}
+
+@pytest.mark.asyncio
+async def test_orders_on_another_venue_are_polled_and_cancelled_there(system):
+    other = OtherVenue()
+    manager = system.quoting_manager
+    manager.exchanges['other'] = other
+    events = []
+    system.add_listener(lambda topic, symbol, data: events.append((topic, data.get('status'))))
+
+    manager.start_symbol('BTC/USDT', Decimal('0.1'), venue='other')
+    if not manager.running:
+        asyncio.create_task(manager.run())
+    system.on_orderbook('BTC/USDT', book(100))
+    await settle()
+    assert system.batches == [] and len(other.orders) == 2
+    assert all(system.order_exchanges[order_id] is other for order_id in system.active_orders)
+
+    # A fill is found by asking the venue that holds the order
+    bid = next(o for o in other.orders.values() if o['side'] == 'buy')
+    bid.update(status='closed', filled=0.1, price=99.9, type='limit')
+    await system._check_order_status()
+    assert bid['id'] not in system.active_orders and bid['id'] not in system.order_exchanges
+    assert system.portfolio.positions['BTC/USDT'].amount == Decimal('0.1')
+
+    # Requote cancels go to the same venue and are published
+    system.on_orderbook('BTC/USDT', book(110))
+    await settle()
+    assert other.cancelled and system.cancels == []
+    assert ('orders', 'canceled') in events
+    await manager.stop()
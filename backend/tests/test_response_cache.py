@@ -0,0 +1,132 @@
+import asyncio
+import json
+import pytest
+from decimal import Decimal
+from src.core.exchange import ExchangeConfig
+from src.core.trading import TradingSystem
+from backend.src.api.cache import ResponseCache
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = ResponseCache()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {'symbol': 'BTC/USDT', 'last': Decimal('100.5')}
+
+    entries = await asyncio.gather(*[
+        cache.get(('ticker', 'BTC/USDT'), load, ttl=5) for _ in range(50)
+    ])
+    assert calls == 1
+    assert all(entry is entries[0] for entry in entries)
+    assert json.loads(entries[0].encoded()[0]) == {'symbol': 'BTC/USDT', 'last': '100.5'}
+
+    # Expired entries reload; an unchanged body keeps its ETag
+    cache.entries[('ticker', 'BTC/USDT')].expires = 0
+    refreshed = await cache.get(('ticker', 'BTC/USDT'), load, ttl=5)
+    assert calls == 2
+    assert refreshed.encoded()[1] == entries[0].encoded()[1]
+
+@pytest.mark.asyncio
+async def test_etag_revalidation_and_failed_loads():
+    cache = ResponseCache()
+
+    async def load():
+        return {'bids': [[100, 1]], 'asks': [[101, 1]]}
+
+    entry = await cache.get(('orderbook', 'BTC/USDT', 5), load)
+    body, etag = entry.encoded()
+    full = cache.respond(entry)
+    assert full.status_code == 200 and full.body == body
+    assert full.headers['etag'] == etag
+    assert cache.respond(entry, etag).status_code == 304
+    assert cache.respond(entry, '"stale"').status_code == 200
+
+    async def fail():
+        raise RuntimeError("exchange down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get(('ticker', 'ETH/USDT'), fail)
+    assert ('ticker', 'ETH/USDT') not in cache.entries
+    assert not cache.loading
+
+@pytest.mark.asyncio
+async def test_trading_system_serves_market_data_from_live_state():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False)
+    )
+    upstream = []
+
+    async def fetch_ticker(symbol):
+        upstream.append(symbol)
+        return {'last': 1.0}
+
+    async def fetch_order_book(symbol, limit):
+        upstream.append(symbol)
+        return {'bids': [[1.0, 1.0]] * limit, 'asks': [[2.0, 1.0]] * limit}
+
+    system.exchange.exchange.fetch_ticker = fetch_ticker
+    system.exchange.exchange.fetch_order_book = fetch_order_book
+
+    system.on_ticker('BTC/USDT', {'bid': 99.0, 'ask': 101.0, 'last': 100.0})
+    ticker = await system.get_ticker('BTC/USDT')
+    assert ticker['last'] == 100.0 and not upstream
+
+    system.on_orderbook('BTC/USDT', {
+        'bids': [[100 - i, 1.0] for i in range(10)],
+        'asks': [[101 + i, 1.0] for i in range(10)]
+    })
+    book = await system.get_orderbook('BTC/USDT', 5)
+    assert book['bids'][0] == [100, 1.0] and len(book['asks']) == 5
+    assert not upstream
+
+    # Deeper than the live book, or stale: ask the exchange
+    await system.get_orderbook('BTC/USDT', 50)
+    await system.get_ticker('BTC/USDT', max_age=-1)
+    assert upstream == ['BTC/USDT', 'BTC/USDT']
+    await system.exchange.exchange.close()
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_strand_the_others():
+    cache = ResponseCache()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {'last': 100}
+
+    leader = asyncio.ensure_future(cache.get('ticker', load))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(cache.get('ticker', load))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    entry = await asyncio.wait_for(follower, 1)
+    assert entry.data == {'last': 100} and calls == 1
+    assert leader.cancelled()
+    assert not cache.loading
+
+@pytest.mark.asyncio
+async def test_exchange_errors_are_raised_not_cached():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False)
+    )
+
+    async def fetch_ticker(symbol):
+        raise ConnectionError("exchange down")
+
+    system.exchange.exchange.fetch_ticker = fetch_ticker
+    system.exchange.exchange.fetch_order_book = lambda symbol, limit: fetch_ticker(symbol)
+    cache = ResponseCache()
+
+    with pytest.raises(ConnectionError):
+        await cache.get(('ticker', 'BTC/USDT'), lambda: system.get_ticker('BTC/USDT'))
+    with pytest.raises(ConnectionError):
+        await cache.get(('orderbook', 'BTC/USDT', 5), lambda: system.get_orderbook('BTC/USDT', 5))
+    assert cache.entries == {}
+    await system.exchange.exchange.close()
@@ -0,0 +1,93 @@
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.schema import CreateTable
+from backend.src.database.models import Base, Trade, TradeRollup
+from backend.src.database.partitioning import detach_partition, partition_name
+from backend.src.database.persistence import PersistenceWriter
+from backend.src.database import rollups
+from backend.src.database.rollups import daily_returns, read_rollups
+
+async def sqlite_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/trading.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+def fill(order_id, symbol, timestamp, pnl):
+    return {
+        'order_id': order_id, 'symbol': symbol, 'side': 'sell', 'price': Decimal('100'),
+        'amount': Decimal('2'), 'fee': Decimal('0.5'), 'realized_pnl': Decimal(pnl),
+        'timestamp': timestamp
+    }
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('upsert', [True, False], ids=['on_conflict', 'select_then_update'])
+async def test_rollups_follow_written_trades_across_flushes(tmp_path, monkeypatch, upsert):
+    if not upsert:
+        # Take the path used by dialects without ON CONFLICT
+        monkeypatch.delitem(rollups.UPSERT_INSERTS, 'sqlite')
+    engine = await sqlite_engine(tmp_path)
+    writer = PersistenceWriter(engine, 'binance', user_id=7, flush_interval=60)
+
+    writer.record_trade(fill(1, 'BTC/USDT', datetime(2024, 1, 1, 9, 15), '10'))
+    writer.record_trade(fill(2, 'BTC/USDT', datetime(2024, 1, 1, 9, 45), '-4'))
+    writer.record_trade(fill(3, 'ETH/USDT', datetime(2024, 1, 1, 10, 5), '1'))
+    await writer.flush()
+    writer.record_trade(fill(4, 'BTC/USDT', datetime(2024, 1, 1, 9, 50), '3'))
+    writer.record_trade(fill(5, 'BTC/USDT', datetime(2024, 1, 3, 12, 0), '-20'))
+    await writer.flush()
+
+    async with AsyncSession(engine) as session:
+        hours = await read_rollups(session, 7, '1h', symbol='BTC/USDT')
+        assert [(h['bucket'], h['trades'], h['realized_pnl']) for h in hours] == [
+            (datetime(2024, 1, 1, 9), 3, 9.0),
+            (datetime(2024, 1, 3, 12), 1, -20.0),
+        ]
+        assert hours[0]['volume'] == 6.0
+        assert hours[0]['notional'] == 600.0
+        assert hours[0]['fees'] == 1.5
+
+        days = await read_rollups(session, 7, '1d')
+        assert [(d['bucket'], d['trades'], d['realized_pnl']) for d in days] == [
+            (datetime(2024, 1, 1), 4, 10.0),
+            (datetime(2024, 1, 3), 1, -20.0),
+        ]
+        assert await read_rollups(session, 8, '1d') == []
+        with pytest.raises(ValueError):
+            await read_rollups(session, 7, '1w')
+
+        returns = await daily_returns(
+            session, 7, Decimal('1000'), days=4, now=datetime(2024, 1, 4, 8)
+        )
+        assert returns == [Decimal('0'), Decimal('0.01'), Decimal('0'), Decimal('-0.02')]
+
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_detaching_a_month_keeps_its_rollups(tmp_path):
+    engine = await sqlite_engine(tmp_path)
+    writer = PersistenceWriter(engine, 'binance', user_id=7, flush_interval=60)
+    writer.record_trade(fill(1, 'BTC/USDT', datetime(2024, 1, 31, 23, 59), '5'))
+    writer.record_trade(fill(2, 'BTC/USDT', datetime(2024, 2, 1, 0, 0), '7'))
+    await writer.flush()
+
+    await detach_partition(engine, date(2024, 1, 1))
+
+    async with AsyncSession(engine) as session:
+        remaining = (await session.execute(select(Trade.executed_at))).scalars().all()
+        assert remaining == [datetime(2024, 2, 1)]
+        rollups = (await session.execute(
+            select(func.count()).select_from(TradeRollup).where(TradeRollup.period == '1d')
+        )).scalar()
+        assert rollups == 2
+    await engine.dispose()
+
+def test_postgres_trades_ddl_can_take_the_partition_key():
+    ddl = str(CreateTable(Trade.__table__).compile(dialect=postgresql.dialect()))
+    # create_trades_table widens this primary key to (id, executed_at)
+    assert 'PRIMARY KEY (id)' in ddl
+    assert partition_name(datetime(2024, 3, 17)) == 'trades_2024_03'
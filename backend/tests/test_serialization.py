@@ -0,0 +1,70 @@
+import json
+import pytest
+import numpy as np
+from datetime import datetime
+from decimal import Decimal
+from src.core.portfolio import Portfolio
+from src.core.risk import RiskMetrics
+from backend.src.api import serialization
+from backend.src.api.serialization import EncodedMessage, SnapshotCache, dumps, negotiate
+
+def test_dumps_handles_trading_types():
+    metrics = RiskMetrics(
+        var_95=Decimal('0.0123'), var_99=Decimal('0.02'), expected_shortfall=Decimal('0.03'),
+        sharpe_ratio=Decimal('1.5'), max_drawdown=Decimal('0.1'), volatility=Decimal('0.2'),
+        beta=Decimal('1'), timestamp=datetime(2024, 1, 2, 3, 4, 5)
+    )
+    data = json.loads(dumps({
+        'risk': metrics,
+        'price': Decimal('64000.123456789012345'),
+        'closes': np.array([1.5, 2.5]),
+        'count': np.int64(3)
+    }))
+    assert data['risk']['var_95'] == '0.0123'
+    assert data['risk']['timestamp'] == '2024-01-02T03:04:05'
+    assert data['price'] == '64000.123456789012345'
+    assert data['closes'] == [1.5, 2.5]
+    assert data['count'] == 3
+
+def test_encoded_message_encodes_once_per_format(monkeypatch):
+    calls = []
+    real_dumps = serialization.dumps
+
+    def counting_dumps(data, fmt='json'):
+        calls.append(fmt)
+        return real_dumps(data, fmt)
+
+    monkeypatch.setattr(serialization, 'dumps', counting_dumps)
+    message = EncodedMessage({'topic': 'ticker', 'last': Decimal('1.5')})
+    for _ in range(100):
+        assert message.text() == '{"topic":"ticker","last":"1.5"}'
+        message.get('json')
+    assert calls == ['json']
+
+def test_msgpack_is_negotiated_only_when_available():
+    assert negotiate(None) == 'json'
+    assert negotiate('application/json') == 'json'
+    expected = 'msgpack' if serialization.msgpack is not None else 'json'
+    assert negotiate('application/msgpack') == expected
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip('msgpack')
+    data = msgpack.unpackb(dumps({'amount': Decimal('0.5')}, 'msgpack'))
+    assert data == {'amount': '0.5'}
+
+def test_snapshot_reused_until_portfolio_changes():
+    portfolio = Portfolio(Decimal('1000'))
+    cache = SnapshotCache()
+    build = lambda: {'positions': portfolio.get_position_summary(), 'metrics': portfolio.get_metrics()}
+
+    first = cache.get('portfolio', portfolio.version, build)
+    portfolio.update_prices({'BTC/USDT': Decimal('100')})  # no position, nothing changes
+    assert cache.get('portfolio', portfolio.version, build) is first
+
+    portfolio.update_position('BTC/USDT', Decimal('1'), Decimal('100'), datetime.now())
+    second = cache.get('portfolio', portfolio.version, build)
+    assert second is not first
+    assert json.loads(second.get())['positions']['BTC/USDT']['amount'] == '1'
+    portfolio.update_prices({'BTC/USDT': Decimal('100')})
+    assert cache.get('portfolio', portfolio.version, build) is second
+    assert (cache.builds, cache.reuses) == (2, 2)
@@ -0,0 +1,110 @@
+import queue
+import pytest
+from decimal import Decimal
+from src.core.exchange import ExchangeConfig
+from src.core.sharding import ShardSupervisor, allocate_capital, assign_symbols
+
+SYMBOLS = [f"COIN{i}/USDT" for i in range(40)]
+
+def supervisor(**kwargs):
+    supervisor = ShardSupervisor(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        num_shards=4, initial_balance=Decimal('100000'), **kwargs
+    )
+    supervisor.result_queue = queue.Queue()
+    supervisor.spawned = []
+    supervisor._spawn = lambda shard_id: supervisor.spawned.append(shard_id)
+    return supervisor
+
+def report(shard_id, balance, total_value, generation=0, active_orders=None):
+    return {
+        'shard_id': shard_id, 'generation': generation,
+        'active_orders': active_orders or {}, 'positions': {}, 'risk': None,
+        'timestamp': None,
+        'portfolio': {
+            'total_value': Decimal(total_value), 'balance': Decimal(balance),
+            'total_pnl': Decimal('0'), 'max_drawdown': Decimal('0'),
+            'open_positions': 0, 'total_trades': 0
+        }
+    }
+
+def test_assign_symbols_covers_every_symbol_once_and_is_stable():
+    assignment = assign_symbols(SYMBOLS, 4)
+    assigned = [s for symbols in assignment.values() for s in symbols]
+    assert sorted(assigned) == sorted(SYMBOLS)
+    assert all(assignment.values())
+    assert assign_symbols(list(reversed(SYMBOLS)), 4) == assignment
+
+    # A new symbol lands on one shard and nothing else moves
+    grown = assign_symbols(SYMBOLS + ['NEW/USDT'], 4)
+    changed = [i for i in range(4) if grown[i] != assignment[i]]
+    assert len(changed) == 1
+    assert set(grown[changed[0]]) - set(assignment[changed[0]]) == {'NEW/USDT'}
+
+def test_capital_is_split_not_repeated():
+    assert allocate_capital(Decimal('100000'), 4) == {i: Decimal('25000') for i in range(4)}
+    assert allocate_capital(
+        Decimal('100'), 2, {0: Decimal('70'), 1: Decimal('30')}
+    ) == {0: Decimal('70'), 1: Decimal('30')}
+    with pytest.raises(ValueError):
+        allocate_capital(Decimal('100'), 2, {0: Decimal('100'), 1: Decimal('100')})
+    with pytest.raises(ValueError):
+        allocate_capital(Decimal('100'), 2, {5: Decimal('100')})
+
+def test_aggregate_metrics_add_up_to_the_real_capital():
+    shards = supervisor()
+    assert shards.get_portfolio_metrics()['total_value'] == Decimal('100000')
+
+    shards.result_queue.put(report(0, '20000', '26000'))
+    shards.result_queue.put(report(1, '25000', '25000'))
+    shards._drain_reports()
+
+    metrics = shards.get_portfolio_metrics()
+    # Two reporting shards plus the cash of the two that have not reported
+    assert metrics['total_value'] == Decimal('101000')
+    assert metrics['balance'] == Decimal('95000')
+    assert metrics['shards'] == 2
+
+@pytest.mark.asyncio
+async def test_rebalance_only_messages_shards_whose_symbols_changed():
+    shards = supervisor(capital_allocation={0: 40000, 1: 20000, 2: 20000, 3: 20000})
+    assert shards.shards[0].capital == Decimal('40000')
+
+    shards.symbols = sorted(SYMBOLS)
+    for shard_id, symbols in assign_symbols(SYMBOLS, 4).items():
+        shards.shards[shard_id].symbols = symbols
+    shards.running = True
+    shards.processes = {i: object() for i in range(4)}
+    shards.command_queues = {i: queue.Queue() for i in range(4)}
+
+    await shards.add_symbols(['NEW/USDT'])
+    commands = {i: q.qsize() for i, q in shards.command_queues.items()}
+    assert sum(commands.values()) == 1
+
+    shard_id = next(i for i, n in commands.items() if n)
+    command = shards.command_queues[shard_id].get_nowait()
+    assert command['type'] == 'set_symbols'
+    assert 'NEW/USDT' in command['symbols']
+    assert command['removed'] == []
+    assert command['generation'] == 1
+    assert shards.spawned == []
+
+    # A report sent before the shard applied the rebalance is ignored
+    handed_over = dict(shards.shards[shard_id].active_orders)
+    shards.result_queue.put(report(shard_id, '1', '1', 0, {'stale': {'symbol': 'X/USDT'}}))
+    shards._drain_reports()
+    assert shards.shards[shard_id].active_orders == handed_over
+    assert not shards.shards[shard_id].portfolio
+
+    shards.result_queue.put(report(shard_id, '1', '1', 1, {'o1': {'symbol': 'NEW/USDT'}}))
+    shards._drain_reports()
+    assert shards.shards[shard_id].active_orders == {'o1': {'symbol': 'NEW/USDT'}}
+
+@pytest.mark.asyncio
+async def test_stop_cancels_the_monitor():
+    shards = supervisor()
+    await shards.start(SYMBOLS)
+    monitor = shards._monitor_task
+    assert not monitor.done()
+    await shards.stop()
+    assert monitor.cancelled() and shards._monitor_task is None
@@ -0,0 +1,109 @@
+import asyncio
+import time
+import pytest
+from decimal import Decimal
+from src.core.exchange import ExchangeConfig
+from src.core.trading import TradingSystem
+from backend.src.strategies.base_strategy import BaseStrategy
+from backend.src.strategies.grid_trading import GridTradingStrategy
+
+class SlowStrategy(BaseStrategy):
+    async def analyze(self, market_data):
+        deadline = time.thread_time() + 0.01
+        while time.thread_time() < deadline:
+            pass
+        return {}
+
+    async def execute(self, signal):
+        return {}
+
+def grid(symbol, lower, upper):
+    return {
+        'symbol': symbol, 'lower_price': lower, 'upper_price': upper,
+        'num_grids': 5, 'order_quantity': '0.01'
+    }
+
+@pytest.fixture
+def system():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('1000000')
+    )
+    system.batches = []
+    system.polled = []
+
+    async def create_orders(orders):
+        system.batches.append(orders)
+        return [{'id': f"{len(system.batches)}-{i}", **o} for i, o in enumerate(orders)]
+
+    async def update_prices(symbols):
+        system.polled.append(sorted(symbols))
+        return {}
+
+    system.exchange.create_orders = create_orders
+    system.exchange.update_prices = update_prices
+    system.strategy_runtime.slow_call_limit = 2
+    return system
+
+@pytest.mark.asyncio
+async def test_fan_out_batches_orders_and_isolates_slow_strategy(system):
+    await system.start_strategy('a', GridTradingStrategy(None, grid('BTC/USDT', 90, 110)))
+    await system.start_strategy('b', GridTradingStrategy(None, grid('BTC/USDT', 80, 120)))
+    await system.start_strategy('c', GridTradingStrategy(None, grid('ETH/USDT', 9, 11)))
+    await system.start_strategy('slow', SlowStrategy(None, {'symbol': 'BTC/USDT'}))
+    await asyncio.sleep(0.01)
+
+    # One subscription per symbol however many strategies use it
+    assert system.polled[0] == ['BTC/USDT', 'ETH/USDT']
+
+    system.on_ticker('BTC/USDT', {'last': 100, 'bid': 99.9, 'ask': 100.1})
+    system.on_ticker('ETH/USDT', {'last': 10, 'bid': 9.9, 'ask': 10.1})
+    await asyncio.sleep(0.05)
+
+    # Both symbols' grids went out in a single batch
+    assert len(system.batches) == 1
+    assert len(system.batches[0]) == 15
+    assert len(system.active_orders) == 15
+    assert all(
+        order['context']['algorithm'].startswith('strategy:')
+        for order in system.batches[0]
+    )
+
+    system.on_ticker('BTC/USDT', {'last': 101, 'bid': 100.9, 'ask': 101.1})
+    await asyncio.sleep(0.05)
+
+    stats = {s['strategy_id']: s for s in system.get_strategy_stats()}
+    assert system.get_strategy_stats()[0]['strategy_id'] == 'slow'
+    assert stats['slow']['isolated'] and not stats['a']['isolated']
+    # The ladder plus the level at 100 that the move to 101 crossed
+    assert stats['a']['orders'] == 6 and stats['a']['analyze_calls'] == 2
+    assert stats['a']['max_latency'] > 0
+
+    await system.stop_strategy('slow')
+    await system.strategy_runtime.stop()
+
+@pytest.mark.asyncio
+async def test_polling_survives_a_failed_fetch(system):
+    runtime = system.strategy_runtime
+    system.market_data.poll_interval = 0.01
+    failures = []
+
+    async def update_prices(symbols):
+        if not failures:
+            failures.append(symbols)
+            raise ConnectionError("venue unreachable")
+        system.polled.append(sorted(symbols))
+        return {'BTC/USDT': {'last': 100, 'bid': 99.9, 'ask': 100.1}}
+
+    system.exchange.update_prices = update_prices
+    await system.start_strategy('a', GridTradingStrategy(None, grid('BTC/USDT', 90, 110)))
+    await asyncio.sleep(0.05)
+
+    assert failures and system.polled
+    assert len(system.batches) == 1
+    assert runtime._flushes == set()
+
+    # The last strategy on a symbol stops its feed
+    await runtime.stop()
+    assert system.market_data.watched('ticker') == []
+    await system.market_data.stop()
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import pytest
+from decimal import Decimal
+from src.core.exchange import ExchangeConfig
+from src.core.trading import TradingSystem
+from backend.src.api.connections import ConnectionManager
+from backend.src.api.subscriptions import SubscriptionManager
+
+class FakeWebSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.received.append(json.loads(text))
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def book(bids, asks):
+    return {'bids': bids, 'asks': asks}
+
+@pytest.mark.asyncio
+async def test_book_snapshot_then_deltas_with_resync():
+    manager = ConnectionManager()
+    subscriptions = SubscriptionManager(manager)
+    first, second = FakeWebSocket(), FakeWebSocket()
+    for websocket in (first, second):
+        await manager.connect(websocket)
+        await subscriptions.handle(websocket, {
+            'action': 'subscribe', 'topic': 'book', 'symbol': 'BTC/USDT'
+        })
+
+    subscriptions.on_event('book', 'BTC/USDT', book([[100, 1], [99, 2]], [[101, 1]]))
+    subscriptions.on_event('book', 'BTC/USDT', book([[100, 3], [99, 2]], [[101, 1]]))
+    subscriptions.on_event('book', 'BTC/USDT', book([[100, 3]], [[101, 1], [102, 5]]))
+    await settle()
+
+    messages = [m for m in first.received if m['type'] != 'subscribed']
+    assert [(m['type'], m['seq']) for m in messages] == [
+        ('snapshot', 1), ('delta', 2), ('delta', 3)
+    ]
+    assert messages[1]['bids'] == [[100.0, 3.0]]
+    assert messages[2] == {
+        'topic': 'book', 'symbol': 'BTC/USDT', 'type': 'delta', 'seq': 3,
+        'bids': [[99.0, 0.0]], 'asks': [[102.0, 5.0]]
+    }
+    assert second.received == first.received
+
+    await subscriptions.handle(first, {
+        'action': 'resync', 'topic': 'book', 'symbol': 'BTC/USDT'
+    })
+    await settle()
+    snapshot = first.received[-1]
+    assert snapshot['type'] == 'snapshot' and snapshot['seq'] == 3
+    assert snapshot['bids'] == [[100.0, 3.0]]
+    assert snapshot['asks'] == [[101.0, 1.0], [102.0, 5.0]]
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_trading_system_updates_reach_topic_subscribers_only():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('10000')
+    )
+    manager = ConnectionManager()
+    subscriptions = SubscriptionManager(manager)
+    system.add_listener(subscriptions.on_event)
+
+    btc, eth = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(btc)
+    await manager.connect(eth)
+    await subscriptions.handle(btc, {'action': 'subscribe', 'topic': 'ticker', 'symbol': 'BTC/USDT'})
+    await subscriptions.handle(eth, {'action': 'subscribe', 'topic': 'ticker', 'symbol': 'ETH/USDT'})
+
+    system.on_ticker('BTC/USDT', {'bid': 99.5, 'ask': 100.5, 'last': 100.0})
+    await settle()
+    assert [m['type'] for m in btc.received] == ['subscribed', 'update']
+    assert btc.received[-1]['data']['last'] == 100.0
+    assert [m['type'] for m in eth.received] == ['subscribed']
+
+    # A late subscriber gets the last update straight away
+    late = FakeWebSocket()
+    await manager.connect(late)
+    await subscriptions.handle(late, {'action': 'subscribe', 'topic': 'ticker', 'symbol': 'BTC/USDT'})
+    await settle()
+    assert late.received[-1] == btc.received[-1]
+
+    subscriptions.drop(btc)
+    assert subscriptions.subscribers[('ticker', 'BTC/USDT')] == {late}
+    error = await subscriptions.handle(btc, {'action': 'subscribe', 'topic': 'news', 'symbol': 'BTC/USDT'})
+    assert error['type'] == 'error'
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_subscriptions_start_and_stop_the_market_data_feed():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('10000')
+    )
+    system.market_data.poll_interval = 0.01
+    polled = []
+
+    async def update_prices(symbols):
+        polled.append(('ticker', sorted(symbols)))
+        return {symbol: {'bid': 99.5, 'ask': 100.5, 'last': 100.0} for symbol in symbols}
+
+    async def get_orderbook(symbol, limit=20):
+        polled.append(('book', symbol))
+        return book([[100, 1]], [[101, 1]])
+
+    system.exchange.update_prices = update_prices
+    system.exchange.get_orderbook = get_orderbook
+    manager = ConnectionManager()
+    subscriptions = SubscriptionManager(manager, system.market_data)
+    system.add_listener(subscriptions.on_event)
+
+    first, second = FakeWebSocket(), FakeWebSocket()
+    for websocket in (first, second):
+        await manager.connect(websocket)
+        for topic in ('ticker', 'book'):
+            await subscriptions.handle(websocket, {'action': 'subscribe', 'topic': topic, 'symbol': 'BTC/USDT'})
+    await asyncio.sleep(0.005)
+
+    # One fetch per symbol and topic for both clients
+    assert polled[:2] == [('ticker', ['BTC/USDT']), ('book', 'BTC/USDT')]
+    assert [m['type'] for m in first.received] == ['subscribed', 'subscribed', 'update', 'snapshot']
+    assert second.received == first.received
+
+    subscriptions.drop(first)
+    assert system.market_data.watched('ticker') == ['BTC/USDT']
+    subscriptions.drop(second)
+    assert system.market_data.watched('ticker') == []
+    assert system.market_data.watched('book') == []
+    await asyncio.sleep(0.02)
+    count = len(polled)
+    await asyncio.sleep(0.02)
+    assert len(polled) == count
+    await system.market_data.stop()
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_feed_fetches_books_in_one_request_where_supported():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('10000')
+    )
+    requests = []
+
+    async def fetch_order_books(symbols, limit=None):
+        requests.append(list(symbols))
+        return {symbol: book([[100, 1]], [[101, 1]]) for symbol in symbols}
+
+    async def get_orderbook(symbol, limit=20):
+        raise AssertionError("books must come from the batch request")
+
+    system.exchange.exchange.has = {**system.exchange.exchange.has, 'fetchOrderBooks': True}
+    system.exchange.exchange.fetch_order_books = fetch_order_books
+    system.exchange.get_orderbook = get_orderbook
+    received = []
+    system.add_listener(lambda topic, symbol, data: received.append((topic, symbol)))
+    system.market_data.interest['book'] = {'BTC/USDT': 1, 'ETH/USDT': 1}
+
+    await system.market_data.poll()
+    assert requests == [['BTC/USDT', 'ETH/USDT']]
+    assert sorted(received) == [('book', 'BTC/USDT'), ('book', 'ETH/USDT')]
+    assert set(system.exchange.orderbook_cache) == {'BTC/USDT', 'ETH/USDT'}
+    await system.exchange.exchange.close()
@@ -0,0 +1,140 @@
+import pytest
+from decimal import Decimal
+from datetime import datetime, timedelta
+from src.core.exchange import ExchangeConfig
+from src.core.tca import TransactionCostAnalyzer
+from src.core.trading import TradingSystem
+
+START = datetime(2024, 1, 1, 12, 0)
+
+def trade(side, price, amount=1, symbol='BTC/USDT', algorithm='twap', order_type='limit',
+          decision=100, mid=100, spread=0.2, minutes=0, time_in_force=None):
+    return {
+        'symbol': symbol, 'side': side, 'type': order_type, 'algorithm': algorithm,
+        'time_in_force': time_in_force,
+        'price': price, 'amount': amount, 'decision_price': decision,
+        'arrival_mid': mid, 'arrival_spread': spread,
+        'order_time': START + timedelta(minutes=minutes),
+        'timestamp': START + timedelta(minutes=minutes, seconds=30)
+    }
+
+def test_slippage_is_a_cost_for_both_sides():
+    analyzer = TransactionCostAnalyzer()
+    buy, sell = analyzer.analyze(
+        [trade('buy', 100.1, decision=99.9), trade('sell', 99.9, decision=100.1, algorithm='vwap')],
+        group_by=('algorithm',)
+    )
+    for row in (buy, sell):
+        assert row['arrival_slippage_bps'] == pytest.approx(10)
+        assert row['decision_slippage_bps'] == pytest.approx(2e-3 / 1e-2 * 100, rel=1e-2)
+        assert row['cost'] == pytest.approx(0.1)
+        assert row['vwap_slippage_bps'] is None
+
+def test_market_orders_pay_the_spread_and_resting_orders_earn_it():
+    analyzer = TransactionCostAnalyzer()
+    market, limit = analyzer.analyze(
+        [trade('buy', 100.1, order_type='market', algorithm='a'), trade('buy', 99.9, algorithm='b')],
+        group_by=('algorithm',)
+    )
+    assert market['spread_paid_bps'] == pytest.approx(10)
+    assert limit['spread_paid_bps'] == pytest.approx(-10)
+    assert limit['arrival_slippage_bps'] == pytest.approx(-10)
+
+    # An immediate-or-cancel limit crosses like a market order
+    ioc, = analyzer.analyze([trade('buy', 100.1, time_in_force='IOC')], group_by=('algorithm',))
+    assert ioc['spread_paid_bps'] == pytest.approx(10)
+
+def test_interval_vwap_and_grouping_by_symbol_algorithm_and_bucket():
+    analyzer = TransactionCostAnalyzer(bucket=timedelta(hours=1))
+    trades = [
+        trade('buy', 101, amount=2),
+        trade('buy', 103, amount=2),
+        trade('buy', 10, symbol='ETH/USDT', decision=10, mid=10, spread=0.01),
+        trade('buy', 100, minutes=90),
+    ]
+    # One bar per minute at a typical price of 100
+    start = START.timestamp() * 1000
+    bars = [[start + i * 60000, 100, 100, 100, 100, 5] for i in range(120)]
+    rows = analyzer.analyze(trades, {'BTC/USDT': bars})
+
+    assert [(r['symbol'], r['algorithm'], r['bucket'], r['fills']) for r in rows] == [
+        ('BTC/USDT', 'twap', datetime(2024, 1, 1, 12), 2),
+        ('BTC/USDT', 'twap', datetime(2024, 1, 1, 13), 1),
+        ('ETH/USDT', 'twap', datetime(2024, 1, 1, 12), 1),
+    ]
+    first = rows[0]
+    assert first['quantity'] == 4
+    assert first['notional'] == pytest.approx(408)
+    # Averaged by notional: 100 bps on 202, 300 bps on 206
+    assert first['vwap_slippage_bps'] == pytest.approx((100 * 202 + 300 * 206) / 408)
+    assert rows[1]['vwap_slippage_bps'] == pytest.approx(0)
+    assert rows[2]['vwap_slippage_bps'] is None
+    assert analyzer.analyze([]) == []
+
+@pytest.fixture
+def system():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False),
+        initial_balance=Decimal('1000000')
+    )
+    system.placed = []
+
+    async def create_order(symbol, order_type, side, amount, price=None, params={}):
+        system.placed.append(symbol)
+        return {'id': str(len(system.placed)), 'symbol': symbol, 'status': 'closed',
+                'average': 100.05, 'filled': amount}
+
+    async def get_orderbook(symbol, limit=20):
+        raise AssertionError("arrival capture must not fetch a book")
+
+    system.exchange.create_order = create_order
+    system.exchange.get_orderbook = get_orderbook
+    return system
+
+@pytest.mark.asyncio
+async def test_arrival_comes_from_cached_market_data(system):
+    system.exchange.orderbook_cache['BTC/USDT'] = {
+        'bids': [[99.9, 1]], 'asks': [[100.1, 1]], 'timestamp': datetime.now().timestamp()
+    }
+    system.exchange.last_prices['BTC/USDT'] = Decimal('100.05')
+    system.exchange.last_prices['ETH/USDT'] = Decimal('10')
+
+    await system.place_order('BTC/USDT', 'buy', 'market', Decimal('0.1'),
+                             context={'algorithm': 'twap', 'decision_price': Decimal('99')})
+    await system.place_order('ETH/USDT', 'buy', 'market', Decimal('1'))
+
+    btc, eth = system.portfolio.trades_history
+    assert btc['arrival_mid'] == Decimal('100')
+    assert btc['arrival_spread'] == Decimal('0.2')
+    assert btc['decision_price'] == Decimal('99')
+    assert btc['algorithm'] == 'twap'
+    assert eth['arrival_mid'] == Decimal('10')
+    assert eth['arrival_spread'] is None
+    assert eth['decision_price'] == Decimal('10')
+
+@pytest.mark.asyncio
+async def test_stale_book_falls_back_to_last_price_and_rejected_orders_skip_capture(system):
+    system.exchange.orderbook_cache['BTC/USDT'] = {
+        'bids': [[90, 1]], 'asks': [[91, 1]], 'timestamp': datetime.now().timestamp() - 60
+    }
+    system.exchange.last_prices['BTC/USDT'] = Decimal('100')
+    system.risk_manager.position_limits['BTC/USDT'] = Decimal('0.01')
+    captured = []
+    capture = system._capture_arrival
+
+    def capture_arrival(symbol, context=None, exchange=None):
+        captured.append(symbol)
+        return capture(symbol, context, exchange)
+
+    system._capture_arrival = capture_arrival
+    assert await system.place_order('BTC/USDT', 'buy', 'market', Decimal('1000')) is None
+    results = await system.place_orders([
+        {'symbol': 'BTC/USDT', 'side': 'buy', 'type': 'market', 'amount': Decimal('1000')}
+    ])
+    assert results == [None]
+    assert captured == [] and system.placed == []
+
+    await system.place_order('BTC/USDT', 'buy', 'market', Decimal('0.1'))
+    assert captured == ['BTC/USDT']
+    assert system.portfolio.trades_history[0]['arrival_mid'] == Decimal('100')
+    assert system.portfolio.trades_history[0]['arrival_spread'] is None
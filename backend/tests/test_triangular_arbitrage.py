@@ -0,0 +1,73 @@
+import pytest
+from decimal import Decimal
+from src.core.exchange import ExchangeConfig
+from src.core.trading import TradingSystem
+
+def market(base, quote, taker=0.001):
+    return {'base': base, 'quote': quote, 'taker': taker, 'spot': True, 'active': True}
+
+MARKETS = {
+    'BTC/USDT': market('BTC', 'USDT'),
+    'ETH/USDT': market('ETH', 'USDT'),
+    'ETH/BTC': market('ETH', 'BTC'),
+    'SOL/USDT': market('SOL', 'USDT'),
+}
+
+@pytest.fixture
+def system():
+    system = TradingSystem(
+        ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False)
+    )
+    system.exchange.markets = dict(MARKETS)
+    return system
+
+def test_streamed_tickers_find_cycles_without_an_explicit_build(system):
+    assert system.on_ticker('BTC/USDT', {'last': 100, 'bid': 100, 'ask': 100}) == []
+    assert system.triangular_arbitrage.built
+    assert system.on_ticker('ETH/USDT', {'last': 10, 'bid': 10, 'ask': 10}) == []
+
+    # ETH is cheap in BTC: USDT -> ETH -> BTC -> USDT clears 0.3% of fees
+    opportunities = system.on_ticker('ETH/BTC', {'last': 0.11, 'bid': 0.11, 'ask': 0.11})
+    assert len(opportunities) == 1
+    opportunity = opportunities[0]
+    assert sorted(leg['symbol'] for leg in opportunity['legs']) == [
+        'BTC/USDT', 'ETH/BTC', 'ETH/USDT'
+    ]
+    assert opportunity['path'][0] == opportunity['path'][-1]
+    assert abs(opportunity['profit_percentage'] - Decimal('0.097')) < Decimal('0.001')
+
+    # A market outside every cycle re-checks nothing
+    assert system.on_ticker('SOL/USDT', {'last': 20, 'bid': 20, 'ask': 20}) == []
+
+def test_fair_prices_after_fees_are_not_opportunities(system):
+    system.triangular_arbitrage.update_tickers({
+        'BTC/USDT': {'bid': 100, 'ask': 100.01},
+        'ETH/USDT': {'bid': 10, 'ask': 10.001},
+        'ETH/BTC': {'bid': 0.1, 'ask': 0.10001},
+    })
+    assert system.triangular_arbitrage.update_ticker('ETH/BTC', 0.1001, 0.1002) == []
+
+def test_ticker_update_only_scans_cycles_through_its_market():
+    markets = {}
+    quotes = ['USDT', 'BTC', 'ETH', 'BNB']
+    for i in range(150):
+        for quote in quotes:
+            markets[f"C{i}/{quote}"] = market(f"C{i}", quote)
+    for a in quotes:
+        for b in quotes:
+            if a < b:
+                markets[f"{a}/{b}"] = market(a, b)
+
+    system = TradingSystem(ExchangeConfig('binance', 'test_key', 'test_secret', testnet=False))
+    system.exchange.markets = markets
+    arbitrage = system.triangular_arbitrage
+    arbitrage.update_tickers({symbol: {'bid': 1.0, 'ask': 1.0} for symbol in markets})
+    total = sum(len(cycles) for cycles in arbitrage.cycles.values())
+    through = sum(len(ids) for _, ids in arbitrage.market_cycles['C7/USDT'])
+    assert through < total / 50
+    assert arbitrage.last_scanned == total
+
+    arbitrage.update_ticker('C7/USDT', 1.0, 1.0)
+    assert arbitrage.last_scanned == through
+    arbitrage.update_ticker('C7/XYZ', 1.0, 1.0)
+    assert arbitrage.last_scanned == 0
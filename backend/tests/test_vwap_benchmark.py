@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from decimal import Decimal
+from datetime import datetime, timedelta, timezone
+from src.core.advanced_features.volume_profile import (
+    VolumeProfile, vwap_slice_quantity
+)
+
+# U-shaped intraday volume: heavy around the open/close of the US session
+HOURLY_SHAPE = np.array([
+    3, 2, 2, 1, 1, 1, 2, 3, 4, 5, 6, 6,
+    6, 7, 9, 11, 10, 8, 6, 5, 4, 4, 3, 3
+], dtype=float)
+
+def simulated_history(days: int, rng) -> list:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    candles = []
+    for day in range(days):
+        for hour in range(24):
+            ts = start + timedelta(days=day, hours=hour)
+            volume = HOURLY_SHAPE[hour] * 100 * rng.lognormal(0, 0.2)
+            candles.append([ts.timestamp() * 1000, 1, 1, 1, 1, volume])
+    return candles
+
+def tracking_error(fills, volumes) -> float:
+    """Mean gap between cumulative fill share and cumulative volume share"""
+    fill_share = np.cumsum(fills) / np.sum(fills)
+    volume_share = np.cumsum(volumes) / np.sum(volumes)
+    return float(np.mean(np.abs(fill_share - volume_share)))
+
+def test_vwap_tracks_participation_better_than_twap():
+    rng = np.random.default_rng(7)
+    profile = VolumeProfile.from_ohlcv('BTC/USDT', simulated_history(14, rng))
+
+    total = Decimal('100')
+    start = datetime(2024, 2, 1)
+    end = start + timedelta(hours=24)
+    actual = HOURLY_SHAPE * 100 * rng.lognormal(0, 0.3, 24)
+
+    executed = Decimal('0')
+    realized = 0.0
+    vwap_fills = []
+    for hour in range(24):
+        slice_start = start + timedelta(hours=hour)
+        slice_end = slice_start + timedelta(hours=1)
+        if hour == 23:
+            quantity = total - executed
+        else:
+            quantity = vwap_slice_quantity(
+                total, executed, realized,
+                profile.forecast_volume(slice_start, slice_end),
+                profile.forecast_volume(slice_end, end)
+            )
+        vwap_fills.append(float(quantity))
+        executed += quantity
+        realized += actual[hour]
+
+    twap_fills = [float(total / 24)] * 24
+
+    vwap_error = tracking_error(vwap_fills, actual)
+    twap_error = tracking_error(twap_fills, actual)
+
+    assert executed == total
+    assert vwap_error < 0.02
+    assert vwap_error < twap_error / 2
+
+def test_profile_fraction_wraps_midnight():
+    profile = VolumeProfile.from_ohlcv(
+        'BTC/USDT', simulated_history(3, np.random.default_rng(1))
+    )
+    start = datetime(2024, 2, 1, 22)
+    assert profile.fraction(start, start + timedelta(hours=24)) == pytest.approx(1.0)
+    assert profile.fraction(start, start + timedelta(hours=4)) == pytest.approx(
+        profile.fractions[[22, 23, 0, 1]].sum()
+    )
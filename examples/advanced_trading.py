@@ -3,10 +3,12 @@ async def run_advanced_trading():
     system = TradingSystem(config)
     await system.initialize()
 
-    # Start market making
+    # Start market making; the shared market data feed polls the books
+    # of every quoted symbol (one batched request where the venue allows
+    # it) and each update requotes through system.quoting_manager
     symbol = "BTC/USDT"
-    await system.market_maker.start_market_making(
-        symbol,
+    await system.start_quoting(
+        [symbol, "ETH/USDT"],
         base_quantity=Decimal('0.01')
     )
 
@@ -1,11 +1,27 @@
+from .backtest import BacktestEngine, BacktestResult, SimulatedBroker
+from .capture import CaptureReplay, CaptureWriter
 from .exchange import Exchange, ExchangeConfig
+from .history import HistoricalStore
+from .indicators import IndicatorRegistry
+from .market_data import MarketDataFeed
 from .portfolio import Portfolio, Position
 from .risk import RiskManager, RiskMetrics
+from .sharding import ShardSupervisor
+from .sweep import ParameterSweep
+from .tca import TransactionCostAnalyzer
 from .trading import TradingSystem
 
 __all__ = [
+    'BacktestEngine', 'BacktestResult', 'SimulatedBroker',
+    'CaptureReplay', 'CaptureWriter',
     'Exchange', 'ExchangeConfig',
+    'HistoricalStore',
+    'IndicatorRegistry',
+    'MarketDataFeed',
     'Portfolio', 'Position',
     'RiskManager', 'RiskMetrics',
+    'ShardSupervisor',
+    'ParameterSweep',
+    'TransactionCostAnalyzer',
     'TradingSystem'
 ]
\ No newline at end of file
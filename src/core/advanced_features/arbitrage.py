@@ -1,79 +1,295 @@
+from collections import deque
 from decimal import Decimal
 import asyncio
+import heapq
 import logging
-from typing import List, Dict, Tuple
+import time
+import uuid
+from typing import AsyncIterator, Deque, List, Dict, Optional, Tuple
 from datetime import datetime
+import ccxt.async_support as ccxt
 
 from ..exchange import Exchange, ExchangeConfig
 
+def taker_fee_rate(
+    exchange: Exchange,
+    symbol: str,
+    fee_rates: Dict[str, Decimal],
+    default_fee_rate: Decimal
+) -> Decimal:
+    """Taker fee for a symbol on a venue: configured, else the market's, else default"""
+    if exchange.config.name in fee_rates:
+        return fee_rates[exchange.config.name]
+    taker = exchange.markets.get(symbol, {}).get('taker')
+    if taker is not None:
+        return Decimal(str(taker))
+    return default_fee_rate
+
 class Arbitrage:
     """Cross-exchange arbitrage strategy"""
-    def __init__(self, exchanges: List[Dict]):
+    def __init__(
+        self,
+        exchanges: List[Dict],
+        fee_rates: Optional[Dict[str, Decimal]] = None,
+        depth: int = 20,
+        max_reports: int = 1000
+    ):
         self.exchanges = [Exchange(config) for config in exchanges]
         self.logger = logging.getLogger(__name__)
         self.min_profit_threshold = Decimal('0.001')  # 0.1% minimum profit
+        self.default_fee_rate = Decimal('0.001')  # 0.1% taker fee
+        self.fee_rates: Dict[str, Decimal] = fee_rates or {}
+        self.depth = depth
+        self.execution_reports: Deque[Dict] = deque(maxlen=max_reports)
+
+    def get_fee_rate(self, exchange: Exchange, symbol: str) -> Decimal:
+        """Get the taker fee for a symbol on a venue"""
+        return taker_fee_rate(
+            exchange, symbol, self.fee_rates, self.default_fee_rate
+        )
 
     async def find_arbitrage_opportunities(self, symbol: str) -> List[Dict]:
         """Find arbitrage opportunities across exchanges"""
-        opportunities = []
-        
+        return await self.scan_opportunities([symbol])
+
+    async def scan_opportunities(self, symbols: List[str]) -> List[Dict]:
+        """Find arbitrage opportunities for many symbols in one pass"""
         try:
-            # Get prices from all exchanges
-            prices = await asyncio.gather(*[
-                exchange.get_orderbook(symbol)
+            # Fetch every (symbol, exchange) book concurrently
+            books = await asyncio.gather(*[
+                exchange.get_orderbook(symbol, self.depth)
+                for symbol in symbols
                 for exchange in self.exchanges
-            ])
+            ], return_exceptions=True)
+            # A venue that failed to answer sits this scan out
+            books = [{} if isinstance(book, Exception) else book for book in books]
 
-            # Find opportunities
-            for i, buy_ex in enumerate(self.exchanges):
-                for j, sell_ex in enumerate(self.exchanges):
-                    if i != j:
-                        profit = self._calculate_arbitrage_profit(
-                            prices[i], prices[j]
-                        )
-                        if profit > self.min_profit_threshold:
-                            opportunities.append({
-                                'buy_exchange': buy_ex.config.name,
-                                'sell_exchange': sell_ex.config.name,
-                                'symbol': symbol,
-                                'profit_percentage': profit,
-                                'timestamp': datetime.now()
-                            })
+            opportunities = []
+            n = len(self.exchanges)
+            for i, symbol in enumerate(symbols):
+                opportunity = self._evaluate_symbol(
+                    symbol, books[i * n:(i + 1) * n]
+                )
+                if opportunity:
+                    opportunities.append(opportunity)
 
             return opportunities
 
         except Exception as e:
             self.logger.error(f"Arbitrage error: {e}")
             return []
-            
-    def _calculate_arbitrage_profit(
-        self, 
-        buy_orderbook: Dict, 
-        sell_orderbook: Dict
-    ) -> Decimal:
-        """Calculate potential profit from arbitrage between exchanges"""
+
+    def _evaluate_symbol(self, symbol: str, books: List[Dict]) -> Optional[Dict]:
+        """Walk the merged depth of all venues for one symbol"""
+        asks, bids = [], []
+        for exchange, book in zip(self.exchanges, books):
+            if not book or not book.get('asks') or not book.get('bids'):
+                continue
+            fee = self.get_fee_rate(exchange, symbol)
+            name = exchange.config.name
+            # Parse each level once; prices are fee-adjusted so venues compare directly
+            asks.append([
+                (Decimal(str(p)) * (1 + fee), Decimal(str(q)), name)
+                for p, q in book['asks']
+            ])
+            bids.append([
+                (Decimal(str(p)) * (1 - fee), Decimal(str(q)), name)
+                for p, q in book['bids']
+            ])
+
+        if len(asks) < 2:
+            return None
+
+        merged_asks = heapq.merge(*asks, key=lambda level: level[0])
+        merged_bids = heapq.merge(*bids, key=lambda level: -level[0])
+
+        ask = next(merged_asks, None)
+        bid = next(merged_bids, None)
+        if not ask or not bid or ask[2] == bid[2]:
+            return None
+
+        best_ask, best_bid = ask[0], bid[0]
+        profit_percentage = (best_bid / best_ask) - Decimal('1')
+        if profit_percentage <= self.min_profit_threshold:
+            return None
+
+        buy_exchange, sell_exchange = ask[2], bid[2]
+        ask_left, bid_left = ask[1], bid[1]
+        quantity = Decimal('0')
+        expected_profit = Decimal('0')
+        buy_legs: Dict[str, Decimal] = {}
+        sell_legs: Dict[str, Decimal] = {}
+
+        # Consume crossing levels until the net edge disappears
+        while ask and bid and bid[0] > ask[0] and ask[2] != bid[2]:
+            fill = min(ask_left, bid_left)
+            quantity += fill
+            expected_profit += (bid[0] - ask[0]) * fill
+            buy_legs[ask[2]] = buy_legs.get(ask[2], Decimal('0')) + fill
+            sell_legs[bid[2]] = sell_legs.get(bid[2], Decimal('0')) + fill
+
+            ask_left -= fill
+            bid_left -= fill
+            if ask_left == 0:
+                ask = next(merged_asks, None)
+                ask_left = ask[1] if ask else Decimal('0')
+            if bid_left == 0:
+                bid = next(merged_bids, None)
+                bid_left = bid[1] if bid else Decimal('0')
+
+        return {
+            'buy_exchange': buy_exchange,
+            'sell_exchange': sell_exchange,
+            'symbol': symbol,
+            'profit_percentage': profit_percentage,
+            'max_quantity': quantity,
+            'expected_profit': expected_profit,
+            'buy_legs': buy_legs,
+            'sell_legs': sell_legs,
+            'timestamp': datetime.now()
+        }
+
+    async def _execute_leg(
+        self,
+        exchange: Exchange,
+        symbol: str,
+        side: str,
+        amount: Decimal,
+        timeout: float
+    ) -> Dict:
+        """Send one market leg with a timeout.
+
+        The leg carries a client order id, so after a timeout or network
+        error the venue is asked whether the order went through before
+        the leg is counted as failed. confirmed is False when that lookup
+        fails too, or the order reports no fill or is still open, since
+        the leg's final size is then unknown.
+        """
+        name = exchange.config.name
+        client_order_id = f"arb{uuid.uuid4().hex[:24]}"
+        order = None
+        confirmed = True
         try:
-            # Get best bid and ask prices
-            best_ask = Decimal(str(buy_orderbook['asks'][0][0]))
-            best_bid = Decimal(str(sell_orderbook['bids'][0][0]))
-            
-            # Calculate profit percentage
-            profit_percentage = (best_bid / best_ask) - Decimal('1')
-            
-            # Subtract estimated fees (e.g., 0.1% per trade)
-            fee_rate = Decimal('0.001')  # 0.1% fee
-            total_fee = fee_rate * Decimal('2')  # Two trades: buy and sell
-            profit_percentage -= total_fee
-            
-            return profit_percentage
-        except (IndexError, KeyError) as e:
-            self.logger.error(f"Error calculating arbitrage profit: {e}")
-            return Decimal('-1')  # Return negative profit on error
-            
+            order = await asyncio.wait_for(
+                exchange.create_order(
+                    symbol, 'market', side, amount, None,
+                    {'clientOrderId': client_order_id}
+                ),
+                timeout
+            )
+        except (asyncio.TimeoutError, ccxt.NetworkError) as e:
+            self.logger.error(
+                f"{side} leg on {name} timed out or lost ({e!r}), reconciling"
+            )
+            try:
+                order = await asyncio.wait_for(
+                    exchange.fetch_order_by_client_id(client_order_id, symbol),
+                    timeout
+                )
+            except Exception as e:
+                confirmed = False
+                self.logger.error(
+                    f"Could not reconcile {side} leg {client_order_id} on {name}: {e!r}"
+                )
+        except Exception as e:
+            self.logger.error(f"{side} leg on {name} failed: {e}")
+
+        filled = Decimal('0')
+        if order:
+            if order.get('filled') is None or order.get('status') == 'open':
+                # The venue has not said how much executed, or may still fill
+                confirmed = False
+                self.logger.error(
+                    f"{side} leg {client_order_id} on {name} has no final fill"
+                )
+            if order.get('filled') is not None:
+                filled = Decimal(str(order['filled']))
+        return {
+            'order': order,
+            'filled': filled,
+            'confirmed': confirmed,
+            'client_order_id': client_order_id,
+            'completed_at': time.perf_counter()
+        }
+
+    async def _hedge(
+        self,
+        symbol: str,
+        bought_on: Exchange,
+        bought: Decimal,
+        sold_on: Exchange,
+        sold: Decimal
+    ) -> bool:
+        """Flatten the net exposure left when the legs did not match"""
+        if bought > sold:
+            exchange, side, amount = bought_on, 'sell', bought - sold
+        elif sold > bought:
+            exchange, side, amount = sold_on, 'buy', sold - bought
+        else:
+            return False
+
+        try:
+            await exchange.create_order(symbol, 'market', side, amount)
+            self.logger.warning(
+                f"Hedged {symbol}: {side} {amount} on {exchange.config.name}"
+            )
+            return True
+        except Exception as e:
+            self.logger.error(
+                f"Hedge failed, open exposure of {amount} {symbol} "
+                f"on {exchange.config.name}: {e}"
+            )
+            return False
+
+    async def stream_opportunities(
+        self,
+        symbols: List[str],
+        interval: float = 0.5
+    ) -> AsyncIterator[Dict]:
+        """Continuously scan a watched universe and yield opportunities"""
+        while True:
+            opportunities = await self.scan_opportunities(symbols)
+            detected_at = time.perf_counter()
+            for opportunity in opportunities:
+                opportunity['detected_at'] = detected_at
+                yield opportunity
+            await asyncio.sleep(interval)
+
+    async def run_continuous(
+        self,
+        symbols: List[str],
+        amount: Decimal,
+        interval: float = 0.5,
+        leg_timeout: float = 5.0
+    ):
+        """Execute streamed opportunities, one in flight per symbol"""
+        in_flight: Dict[str, asyncio.Task] = {}
+        try:
+            async for opportunity in self.stream_opportunities(symbols, interval):
+                symbol = opportunity['symbol']
+                if symbol in in_flight and not in_flight[symbol].done():
+                    continue
+
+                # Both legs go to a single venue, so size to that venue's depth
+                size = min(
+                    amount,
+                    opportunity['buy_legs'].get(opportunity['buy_exchange'], Decimal('0')),
+                    opportunity['sell_legs'].get(opportunity['sell_exchange'], Decimal('0'))
+                )
+                if size <= 0:
+                    continue
+                in_flight[symbol] = asyncio.create_task(
+                    self.execute_arbitrage(opportunity, size, leg_timeout)
+                )
+        except asyncio.CancelledError:
+            await asyncio.gather(*in_flight.values(), return_exceptions=True)
+            raise
+
     async def execute_arbitrage(
         self, 
         opportunity: Dict, 
-        amount: Decimal
+        amount: Decimal,
+        leg_timeout: float = 5.0
     ) -> bool:
         """Execute an arbitrage opportunity"""
         try:
@@ -95,30 +311,58 @@ class Arbitrage:
                 self.logger.error("Exchange not found")
                 return False
                 
-            # Execute buy order
-            buy_order = await buy_exchange.create_order(
-                symbol, 'market', 'buy', amount
+            # Send both legs at once so the spread has less time to close
+            buy_result, sell_result = await asyncio.gather(
+                self._execute_leg(buy_exchange, symbol, 'buy', amount, leg_timeout),
+                self._execute_leg(sell_exchange, symbol, 'sell', amount, leg_timeout)
             )
-            
-            if not buy_order:
-                self.logger.error("Failed to execute buy order")
-                return False
-                
-            # Execute sell order
-            sell_order = await sell_exchange.create_order(
-                symbol, 'market', 'sell', amount
-            )
-            
-            if not sell_order:
-                self.logger.error("Failed to execute sell order")
-                return False
-                
-            self.logger.info(
-                f"Executed arbitrage: Buy {amount} {symbol} at "
-                f"{buy_exchange_name}, Sell at {sell_exchange_name}"
-            )
-            
-            return True
+
+            report = {
+                'symbol': symbol,
+                'buy_exchange': buy_exchange_name,
+                'sell_exchange': sell_exchange_name,
+                'amount': amount,
+                'buy_order': buy_result['order'],
+                'sell_order': sell_result['order'],
+                'hedged': False,
+                'reconciled': buy_result['confirmed'] and sell_result['confirmed'],
+                'success': bool(buy_result['order'] and sell_result['order']),
+                'timestamp': datetime.now()
+            }
+
+            detected_at = opportunity.get('detected_at')
+            if detected_at is not None:
+                report['buy_latency_ms'] = (
+                    (buy_result['completed_at'] - detected_at) * 1000
+                )
+                report['sell_latency_ms'] = (
+                    (sell_result['completed_at'] - detected_at) * 1000
+                )
+                report['detection_to_fill_ms'] = max(
+                    report['buy_latency_ms'], report['sell_latency_ms']
+                )
+
+            if not report['reconciled']:
+                # Hedging blind could double the exposure instead of closing it
+                self.logger.error(
+                    f"Arbitrage on {symbol} left unreconciled legs, not hedging: "
+                    f"buy {buy_result['client_order_id']} on {buy_exchange_name}, "
+                    f"sell {sell_result['client_order_id']} on {sell_exchange_name}"
+                )
+            elif buy_result['filled'] != sell_result['filled']:
+                report['hedged'] = await self._hedge(
+                    symbol,
+                    buy_exchange, buy_result['filled'],
+                    sell_exchange, sell_result['filled']
+                )
+            if report['success']:
+                self.logger.info(
+                    f"Executed arbitrage: Buy {amount} {symbol} at "
+                    f"{buy_exchange_name}, Sell at {sell_exchange_name}"
+                )
+
+            self.execution_reports.append(report)
+            return report['success']
             
         except Exception as e:
             self.logger.error(f"Error executing arbitrage: {e}")
@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+from decimal import Decimal
+import asyncio
+import heapq
+import logging
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from ..exchange import Exchange
+from .arbitrage import taker_fee_rate
+from .execution_algorithms import ExecutionAlgorithm
+
+@dataclass
+class BookLevel:
+    effective_price: Decimal
+    price: Decimal
+    quantity: Decimal
+    venue: str
+
+@dataclass
+class VenueAllocation:
+    venue: str
+    quantity: Decimal
+    limit_price: Decimal
+    expected_cost: Decimal
+
+class ConsolidatedOrderBook:
+    """Top-N levels of every configured venue merged into one book.
+
+    Prices are fee-adjusted per venue (asks up, bids down) so levels
+    from different venues can be compared on all-in cost.
+    """
+    def __init__(
+        self,
+        exchanges: List[Exchange],
+        depth: int = 20,
+        fee_rates: Optional[Dict[str, Decimal]] = None,
+        default_fee_rate: Decimal = Decimal('0.001')
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.exchanges = {exchange.config.name: exchange for exchange in exchanges}
+        self.depth = depth
+        self.fee_rates: Dict[str, Decimal] = fee_rates or {}
+        self.default_fee_rate = default_fee_rate
+        self.asks: Dict[str, List[BookLevel]] = {}
+        self.bids: Dict[str, List[BookLevel]] = {}
+        self.updated_at: Dict[str, datetime] = {}
+
+    def get_fee_rate(self, venue: str, symbol: str) -> Decimal:
+        """Get the taker fee for a symbol on a venue"""
+        return taker_fee_rate(
+            self.exchanges[venue], symbol, self.fee_rates, self.default_fee_rate
+        )
+
+    async def refresh(self, symbol: str):
+        """Fetch every venue's book concurrently and merge them"""
+        venues = list(self.exchanges)
+        books = await asyncio.gather(*[
+            self.exchanges[venue].get_orderbook(symbol, self.depth)
+            for venue in venues
+        ], return_exceptions=True)
+
+        venue_asks, venue_bids = [], []
+        for venue, book in zip(venues, books):
+            if isinstance(book, Exception) or not book:
+                self.logger.warning(f"No {symbol} book from {venue}")
+                continue
+            fee = self.get_fee_rate(venue, symbol)
+            venue_asks.append([
+                BookLevel(Decimal(str(p)) * (1 + fee), Decimal(str(p)), Decimal(str(q)), venue)
+                for p, q in book.get('asks', [])[:self.depth]
+            ])
+            venue_bids.append([
+                BookLevel(Decimal(str(p)) * (1 - fee), Decimal(str(p)), Decimal(str(q)), venue)
+                for p, q in book.get('bids', [])[:self.depth]
+            ])
+
+        # Each venue's side is already sorted, so a k-way heap merge suffices
+        self.asks[symbol] = list(heapq.merge(
+            *venue_asks, key=lambda level: level.effective_price
+        ))
+        self.bids[symbol] = list(heapq.merge(
+            *venue_bids, key=lambda level: -level.effective_price
+        ))
+        self.updated_at[symbol] = datetime.now()
+
+    def best_bid(self, symbol: str) -> Optional[BookLevel]:
+        levels = self.bids.get(symbol)
+        return levels[0] if levels else None
+
+    def best_ask(self, symbol: str) -> Optional[BookLevel]:
+        levels = self.asks.get(symbol)
+        return levels[0] if levels else None
+
+    def split(self, symbol: str, side: str, quantity: Decimal) -> List[VenueAllocation]:
+        """Split an order across venues by walking the book from the best all-in price"""
+        levels = self.asks.get(symbol, []) if side == 'buy' else self.bids.get(symbol, [])
+        allocations: Dict[str, VenueAllocation] = {}
+        remaining = quantity
+
+        for level in levels:
+            if remaining <= 0:
+                break
+            take = min(level.quantity, remaining)
+            remaining -= take
+
+            allocation = allocations.get(level.venue)
+            if not allocation:
+                allocation = allocations[level.venue] = VenueAllocation(
+                    level.venue, Decimal('0'), level.price, Decimal('0')
+                )
+            allocation.quantity += take
+            allocation.limit_price = level.price  # worst price reached on this venue
+            allocation.expected_cost += take * level.effective_price
+
+        if remaining > 0:
+            self.logger.warning(
+                f"Consolidated {symbol} book only covers "
+                f"{quantity - remaining}/{quantity}"
+            )
+        return list(allocations.values())
+
+class DepthSplitRouter:
+    """Routes a parent order across venues using the consolidated book"""
+    def __init__(self, trading_system, book: ConsolidatedOrderBook):
+        self.trading_system = trading_system
+        self.book = book
+        self.logger = logging.getLogger(__name__)
+
+    async def route(
+        self,
+        symbol: str,
+        side: str,
+        quantity: Decimal,
+        context: Optional[Dict] = None
+    ) -> List[Dict]:
+        """Split an order across venues and send the children concurrently"""
+        await self.book.refresh(symbol)
+        allocations = self.book.split(symbol, side, quantity)
+
+        results = await asyncio.gather(*[
+            self._send_child(symbol, side, allocation, context)
+            for allocation in allocations
+        ])
+        return [result for result in results if result]
+
+    async def _send_child(
+        self,
+        symbol: str,
+        side: str,
+        allocation: VenueAllocation,
+        context: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """Send an immediate-or-cancel child capped at the walked price.
+
+        The child goes through TradingSystem.place_order, so it is risk
+        checked and its fill is booked like any other order.
+        """
+        order = await self.trading_system.place_order(
+            symbol=symbol,
+            side=side,
+            order_type='limit',
+            amount=allocation.quantity,
+            price=allocation.limit_price,
+            params={'timeInForce': 'IOC'},
+            context={**(context or {}), 'exchange': allocation.venue},
+            exchange=self.book.exchanges[allocation.venue]
+        )
+        if not order:
+            self.logger.error(f"Child order on {allocation.venue} was not placed")
+            return None
+
+        filled = Decimal(str(order.get('filled') or 0))
+        return {
+            'venue': allocation.venue,
+            'order': order,
+            'quantity': allocation.quantity,
+            'filled': filled,
+            'expected_cost': allocation.expected_cost
+        }
+
+class MultiVenueExecution(ExecutionAlgorithm):
+    """Single-shot parent order split across venues by DepthSplitRouter"""
+    name = 'multi_venue'
+
+    def __init__(
+        self,
+        trading_system,
+        symbol,
+        side,
+        total_quantity,
+        params={},
+        router: Optional[DepthSplitRouter] = None
+    ):
+        super().__init__(trading_system, symbol, side, total_quantity, params)
+        self.router = router
+        self.children: List[Dict] = []
+
+    async def step(self) -> float:
+        self.children = await self.router.route(
+            self.symbol, self.side, self.remaining, self._order_context()
+        )
+        self.filled += sum((child['filled'] for child in self.children), Decimal('0'))
+        self.done = True
+        return 0.0
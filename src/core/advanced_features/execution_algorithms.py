@@ -0,0 +1,189 @@
+from abc import ABC, abstractmethod
+from decimal import Decimal
+import logging
+import time
+from typing import Callable, Dict, Optional
+from datetime import datetime, timedelta
+
+from .volume_profile import VolumeProfile, vwap_slice_quantity
+
+class ExecutionAlgorithm(ABC):
+    """A parent order worked in steps by the ParentOrderScheduler.
+
+    step() does the work that is due now and returns the number of
+    seconds until it wants to run again; it must never sleep itself.
+    """
+    name = 'algo'
+
+    def __init__(
+        self,
+        trading_system,
+        symbol: str,
+        side: str,
+        total_quantity: Decimal,
+        params: Dict = {}
+    ):
+        self.trading_system = trading_system
+        self.logger = logging.getLogger(__name__)
+        self.symbol = symbol
+        self.side = side
+        self.total_quantity = total_quantity
+        self.params = params
+        self.filled = Decimal('0')
+        self.done = False
+        self.paused_at: Optional[float] = None
+        self.parent_id: Optional[str] = None
+        self.decision_price: Optional[Decimal] = None
+
+    @property
+    def remaining(self) -> Decimal:
+        return self.total_quantity - self.filled
+
+    @abstractmethod
+    async def step(self) -> float:
+        """Advance the execution by one tick"""
+        pass
+
+    def amend(self, total_quantity: Decimal):
+        """Change the parent quantity; later slices are resized to match"""
+        if total_quantity < self.filled:
+            raise ValueError(
+                f"Cannot amend below filled quantity {self.filled}"
+            )
+        self.total_quantity = total_quantity
+
+    async def pause(self):
+        """Stop working the order until resume()"""
+        self.paused_at = time.monotonic()
+
+    async def resume(self) -> float:
+        """Resume a paused order; returns how long it was paused"""
+        paused_for = time.monotonic() - self.paused_at if self.paused_at else 0.0
+        self.paused_at = None
+        return paused_for
+
+    async def cancel(self):
+        """Stop working the order for good"""
+        self.done = True
+
+    def _order_context(self) -> Dict:
+        """Decision context recorded with every child for cost analysis"""
+        return {
+            'algorithm': self.name,
+            'parent_id': self.parent_id,
+            'decision_price': self.decision_price
+        }
+
+    async def _send_market(self, quantity: Decimal) -> bool:
+        """Send a market child order"""
+        order = await self.trading_system.place_order(
+            symbol=self.symbol,
+            side=self.side,
+            order_type='market',
+            amount=quantity,
+            context=self._order_context()
+        )
+        if order:
+            self.filled += quantity
+        return bool(order)
+
+    def _intervals(self) -> int:
+        """Number of slices from params; a parent needs at least one"""
+        intervals = int(self.params.get('intervals', 10))
+        if intervals < 1:
+            raise ValueError(f"intervals must be at least 1: {intervals}")
+        return intervals
+
+class TWAPExecution(ExecutionAlgorithm):
+    """Time-Weighted Average Price execution"""
+    name = 'twap'
+
+    def __init__(self, trading_system, symbol, side, total_quantity, params={}):
+        super().__init__(trading_system, symbol, side, total_quantity, params)
+        self.intervals = self._intervals()
+        self.interval_duration = params.get('interval_duration', 60)
+        self.slice = 0
+
+    async def step(self) -> float:
+        slices_left = self.intervals - self.slice
+        quantity = self.remaining / Decimal(str(slices_left))
+        if quantity > 0:
+            await self._send_market(quantity)
+
+        self.slice += 1
+        if self.slice >= self.intervals:
+            self.done = True
+        return self.interval_duration
+
+class VWAPExecution(ExecutionAlgorithm):
+    """Volume-Weighted Average Price execution"""
+    name = 'vwap'
+
+    def __init__(
+        self,
+        trading_system,
+        symbol,
+        side,
+        total_quantity,
+        params={},
+        profile: Optional[VolumeProfile] = None,
+        realized_volume: Optional[Callable] = None
+    ):
+        super().__init__(trading_system, symbol, side, total_quantity, params)
+        self.intervals = self._intervals()
+        self.interval_duration = params.get('interval_duration', 60)
+        self.interval = timedelta(seconds=self.interval_duration)
+        self.profile = profile
+        self.realized_volume_fn = realized_volume
+        self.start = datetime.utcnow()
+        self.realized_volume = 0.0
+        self.slice = 0
+
+    def _window(self, index: int):
+        slice_start = self.start + self.interval * index
+        return slice_start, slice_start + self.interval
+
+    async def step(self) -> float:
+        end = self.start + self.interval * self.intervals
+
+        if self.slice > 0:
+            # Re-plan from the volume that traded during the previous slice
+            prev_start, prev_end = self._window(self.slice - 1)
+            actual = None
+            if self.realized_volume_fn:
+                actual = await self.realized_volume_fn(
+                    self.symbol, prev_start, prev_end
+                )
+            if actual is None:
+                actual = self.profile.forecast_volume(prev_start, prev_end)
+            self.realized_volume += actual
+
+        slice_start, slice_end = self._window(self.slice)
+        if self.slice == self.intervals - 1:
+            quantity = self.remaining
+        else:
+            quantity = vwap_slice_quantity(
+                self.total_quantity,
+                self.filled,
+                self.realized_volume,
+                self.profile.forecast_volume(slice_start, slice_end),
+                self.profile.forecast_volume(slice_end, end)
+            )
+
+        if quantity > 0:
+            await self._send_market(quantity)
+
+        self.slice += 1
+        if self.slice >= self.intervals:
+            self.done = True
+            self.logger.info(
+                f"VWAP {self.side} {self.symbol} complete: {self.filled}/"
+                f"{self.total_quantity} over {self.intervals} slices"
+            )
+        return self.interval_duration
+
+    async def resume(self) -> float:
+        paused_for = await super().resume()
+        # Keep slice windows aligned with the time actually spent trading
+        self.start += timedelta(seconds=paused_for)
+        return paused_for
@@ -0,0 +1,177 @@
+from dataclasses import dataclass
+from decimal import Decimal
+import time
+from typing import Dict, Optional
+
+from .execution_algorithms import ExecutionAlgorithm
+
+TERMINAL_STATUSES = ('closed', 'canceled', 'cancelled', 'expired', 'rejected')
+
+@dataclass
+class ChildOrder:
+    order_id: str
+    price: Decimal
+    quantity: Decimal
+    filled: Decimal = Decimal('0')
+
+class IcebergExecution(ExecutionAlgorithm):
+    """Works a parent order through a small passive limit order at the touch.
+
+    The visible child is refilled as it fills and repriced when the touch
+    moves away from it. If fills fall behind a linear schedule the
+    shortfall is crossed with a market order. Call step() repeatedly; it
+    returns the number of seconds until it wants to run again.
+    """
+    name = 'iceberg'
+
+    def __init__(
+        self,
+        trading_system,
+        symbol: str,
+        side: str,
+        total_quantity: Decimal,
+        params: Dict = {}
+    ):
+        super().__init__(trading_system, symbol, side, total_quantity, params)
+        self.display_quantity = Decimal(str(
+            params.get('display_quantity', total_quantity / 10)
+        ))
+        self.duration = params.get('duration', 600)
+        self.poll_interval = params.get('poll_interval', 1.0)
+        self.reprice_threshold = Decimal(str(params.get('reprice_threshold', '0.0005')))
+        self.catch_up_threshold = Decimal(str(params.get('catch_up_threshold', '0.1')))
+
+        self.crossed = Decimal('0')
+        self.child: Optional[ChildOrder] = None
+        self.started_at = time.monotonic()
+
+    async def step(self) -> float:
+        """Advance the execution by one tick"""
+        if self.done:
+            return 0.0
+
+        if self.child:
+            order = await self.trading_system.exchange.exchange.fetch_order(
+                self.child.order_id, self.symbol
+            )
+            self.on_order_update(order)
+
+        if self.remaining <= 0:
+            await self._finish()
+            return 0.0
+
+        elapsed = time.monotonic() - self.started_at
+        progress = min(Decimal(str(elapsed / self.duration)), Decimal('1'))
+        behind = self.total_quantity * progress - self.filled
+
+        if elapsed >= self.duration or behind > self.total_quantity * self.catch_up_threshold:
+            await self._cancel_child()
+            shortfall = self.remaining if elapsed >= self.duration else behind
+            await self._cross(min(shortfall, self.remaining))
+            if self.remaining <= 0:
+                await self._finish()
+                return 0.0
+
+        try:
+            orderbook = await self.trading_system.exchange.get_orderbook(self.symbol, 5)
+        except Exception as e:
+            self.logger.warning(f"No {self.symbol} book for iceberg {self.parent_id}: {e}")
+            return self.poll_interval
+        levels = orderbook.get('bids' if self.side == 'buy' else 'asks')
+        if not levels:
+            return self.poll_interval
+        touch = Decimal(str(levels[0][0]))
+
+        if self.child:
+            drift = abs(touch - self.child.price) / self.child.price
+            if drift > self.reprice_threshold:
+                await self._cancel_child()
+
+        if not self.child and self.remaining > 0:
+            await self._post_child(touch)
+
+        return self.poll_interval
+
+    def on_order_update(self, order: Dict):
+        """Apply an order update for the resting child"""
+        if not self.child or order.get('id') != self.child.order_id:
+            return
+
+        filled = Decimal(str(order.get('filled') or 0))
+        if filled > self.child.filled:
+            self.filled += filled - self.child.filled
+            self.child.filled = filled
+
+        if order.get('status') in TERMINAL_STATUSES:
+            self.child = None
+
+    async def _post_child(self, price: Decimal):
+        """Rest a new visible slice at the touch"""
+        quantity = min(self.display_quantity, self.remaining)
+        order = await self.trading_system.place_order(
+            symbol=self.symbol,
+            side=self.side,
+            order_type='limit',
+            amount=quantity,
+            price=price,
+            context=self._order_context()
+        )
+        if order:
+            self.child = ChildOrder(order['id'], price, quantity)
+
+    async def _cancel_child(self):
+        """Pull the resting child, booking any fills it picked up"""
+        child = self.child
+        if not child:
+            return
+
+        # Cancelling drops the order's context; keep it for booking the fills
+        context = dict(self.trading_system.order_context.get(child.order_id, {}))
+        await self.trading_system.cancel_order(child.order_id, self.symbol)
+        status, price, order = 'canceled', child.price, None
+        try:
+            order = await self.trading_system.exchange.exchange.fetch_order(
+                child.order_id, self.symbol
+            )
+            self.on_order_update(order)
+            status = order.get('status')
+            price = Decimal(str(order.get('average') or child.price))
+        except Exception as e:
+            self.logger.error(f"Error fetching cancelled child {child.order_id}: {e}")
+        self.child = None
+
+        # Orders that closed before the cancel landed are booked by the
+        # system's own fill handling; cancelled ones never reach it
+        if child.filled > 0 and status != 'closed':
+            self.trading_system.book_fill(
+                {'id': child.order_id, **(order or {})}, self.symbol, self.side,
+                child.filled, price, 'limit', context
+            )
+
+    async def _cross(self, quantity: Decimal):
+        """Take liquidity for a schedule shortfall"""
+        if quantity > 0 and await self._send_market(quantity):
+            self.crossed += quantity
+
+    async def _finish(self):
+        await self._cancel_child()
+        self.done = True
+        self.logger.info(
+            f"Iceberg {self.side} {self.symbol} complete: {self.filled}/"
+            f"{self.total_quantity}, {self.crossed} crossed"
+        )
+
+    async def pause(self):
+        await super().pause()
+        await self._cancel_child()
+
+    async def resume(self) -> float:
+        paused_for = await super().resume()
+        # Time spent paused does not count against the schedule
+        self.started_at += paused_for
+        return paused_for
+
+    async def cancel(self):
+        """Stop working the order and pull the resting child"""
+        await self._cancel_child()
+        await super().cancel()
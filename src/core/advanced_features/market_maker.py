@@ -1,23 +1,60 @@
+from dataclasses import dataclass
 from decimal import Decimal
 import asyncio
 import logging
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional, Tuple
+
+@dataclass
+class QuoteLevel:
+    side: str
+    level: int
+    price: Decimal
+    quantity: Decimal
+    order_id: Optional[str] = None
 
 class MarketMaker:
     """Advanced market making strategy"""
-    def __init__(self, trading_system, spread_percentage: Decimal = Decimal('0.002')):
+    def __init__(
+        self,
+        trading_system,
+        spread_percentage: Decimal = Decimal('0.002'),
+        num_levels: int = 1,
+        level_spacing: Decimal = Decimal('0.001'),
+        requote_tolerance: Decimal = Decimal('0.0005'),
+        min_requote_interval: float = 0.25
+    ):
         self.trading_system = trading_system
         self.spread_percentage = spread_percentage
+        self.num_levels = num_levels
+        self.level_spacing = level_spacing
+        self.requote_tolerance = requote_tolerance
+        self.min_requote_interval = min_requote_interval
         self.logger = logging.getLogger(__name__)
         self.active_orders: Dict[str, List[str]] = {}
 
+        # Requoting state per symbol
+        self.quotes: Dict[str, Dict[Tuple[str, int], QuoteLevel]] = {}
+        self.base_quantities: Dict[str, Decimal] = {}
+        self.last_requote: Dict[str, float] = {}
+        self.pending_books: Dict[str, Dict] = {}
+        self.quote_stats: Dict[str, Dict[str, int]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: set = set()
+
     async def start_market_making(self, symbol: str, base_quantity: Decimal):
         """Start market making for a symbol"""
         try:
             while True:
-                orderbook = await self.trading_system.exchange.get_orderbook(symbol)
-                mid_price = self._calculate_mid_price(orderbook)
-                
+                try:
+                    orderbook = await self.trading_system.exchange.get_orderbook(symbol)
+                    mid_price = self._calculate_mid_price(orderbook)
+                except Exception as e:
+                    # A transient exchange error skips this round, not the loop
+                    self.logger.warning(f"No {symbol} book for market making: {e}")
+                    await asyncio.sleep(5)
+                    continue
+
                 # Calculate bid and ask prices
                 bid_price = mid_price * (1 - self.spread_percentage)
                 ask_price = mid_price * (1 + self.spread_percentage)
@@ -26,7 +63,7 @@ class MarketMaker:
                 await self._place_market_making_orders(
                     symbol, bid_price, ask_price, base_quantity
                 )
-                
+
                 await asyncio.sleep(5)  # Update every 5 seconds
 
         except Exception as e:
@@ -36,4 +73,223 @@ class MarketMaker:
         """Calculate mid price from orderbook"""
         best_bid = Decimal(str(orderbook['bids'][0][0]))
         best_ask = Decimal(str(orderbook['asks'][0][0]))
-        return (best_bid + best_ask) / 2
\ No newline at end of file
+        return (best_bid + best_ask) / 2
+
+    def on_market_data(self, symbol: str, orderbook: Dict):
+        """Feed handler: requote symbols being made from the book stream"""
+        if symbol not in self.base_quantities:
+            return
+        task = asyncio.ensure_future(self.on_orderbook_update(symbol, orderbook))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def on_fill(self, order_id: str):
+        """Forget a filled quote so its level is placed again on the next update"""
+        for symbol, quotes in self.quotes.items():
+            for key, quote in list(quotes.items()):
+                if quote.order_id == order_id:
+                    del quotes[key]
+                    self._count(symbol, 'filled')
+                    self.active_orders[symbol] = [
+                        q.order_id for q in quotes.values() if q.order_id
+                    ]
+                    return
+
+    async def on_orderbook_update(
+        self,
+        symbol: str,
+        orderbook: Dict,
+        base_quantity: Optional[Decimal] = None
+    ):
+        """Requote a symbol from a streamed order book update.
+
+        Updates that arrive inside the throttle window are coalesced so
+        only the latest book is quoted once the window expires.
+        """
+        if base_quantity is not None:
+            self.base_quantities[symbol] = base_quantity
+        if symbol not in self.base_quantities:
+            return
+
+        elapsed = time.monotonic() - self.last_requote.get(symbol, 0.0)
+        if elapsed < self.min_requote_interval:
+            if symbol not in self.pending_books:
+                task = asyncio.create_task(self._flush_pending(
+                    symbol, self.min_requote_interval - elapsed
+                ))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            self.pending_books[symbol] = orderbook
+            self._count(symbol, 'throttled')
+            return
+
+        await self._quote_from_book(symbol, orderbook)
+
+    async def _flush_pending(self, symbol: str, delay: float):
+        """Quote the latest coalesced book once the throttle window ends"""
+        await asyncio.sleep(delay)
+        orderbook = self.pending_books.pop(symbol, None)
+        if orderbook is not None:
+            await self._quote_from_book(symbol, orderbook)
+
+    async def _quote_from_book(self, symbol: str, orderbook: Dict):
+        """Derive quote prices from a book and apply them"""
+        try:
+            mid_price = self._calculate_mid_price(orderbook)
+        except (IndexError, KeyError):
+            return
+
+        await self._place_market_making_orders(
+            symbol,
+            mid_price * (1 - self.spread_percentage),
+            mid_price * (1 + self.spread_percentage),
+            self.base_quantities[symbol]
+        )
+
+    async def _place_market_making_orders(
+        self,
+        symbol: str,
+        bid_price: Decimal,
+        ask_price: Decimal,
+        base_quantity: Decimal
+    ):
+        """Bring resting quotes in line with the target ladder"""
+        self.base_quantities[symbol] = base_quantity
+        lock = self._locks.setdefault(symbol, asyncio.Lock())
+
+        async with lock:
+            self.last_requote[symbol] = time.monotonic()
+            targets = self._build_ladder(bid_price, ask_price, base_quantity)
+            current = self.quotes.setdefault(symbol, {})
+
+            for key, target in targets.items():
+                existing = current.get(key)
+                if existing and self._within_tolerance(existing, target):
+                    self._count(symbol, 'skipped')
+                    continue
+
+                quote = await self._apply_quote(symbol, existing, target)
+                if quote:
+                    current[key] = quote
+                else:
+                    current.pop(key, None)
+
+            # Levels no longer in the ladder (e.g. num_levels was reduced)
+            for key in [k for k in current if k not in targets]:
+                if await self._cancel_quote(symbol, current[key]):
+                    del current[key]
+
+            self.active_orders[symbol] = [
+                q.order_id for q in current.values() if q.order_id
+            ]
+
+    def _build_ladder(
+        self,
+        bid_price: Decimal,
+        ask_price: Decimal,
+        base_quantity: Decimal
+    ) -> Dict[Tuple[str, int], QuoteLevel]:
+        """Build target quote levels on both sides of the book"""
+        ladder = {}
+        for level in range(self.num_levels):
+            offset = self.level_spacing * level
+            ladder[('buy', level)] = QuoteLevel(
+                'buy', level, bid_price * (1 - offset), base_quantity
+            )
+            ladder[('sell', level)] = QuoteLevel(
+                'sell', level, ask_price * (1 + offset), base_quantity
+            )
+        return ladder
+
+    def _within_tolerance(self, existing: QuoteLevel, target: QuoteLevel) -> bool:
+        """Check whether a resting quote is close enough to its target"""
+        if existing.quantity != target.quantity or not existing.price:
+            return False
+        move = abs(target.price - existing.price) / existing.price
+        return move <= self.requote_tolerance
+
+    async def _apply_quote(
+        self,
+        symbol: str,
+        existing: Optional[QuoteLevel],
+        target: QuoteLevel
+    ) -> Optional[QuoteLevel]:
+        """Amend a resting quote in place, or replace it"""
+        exchange = self.trading_system.exchange
+        if existing and existing.order_id and exchange.exchange.has.get('editOrder'):
+            try:
+                order = await exchange.edit_order(
+                    existing.order_id, symbol, 'limit',
+                    target.side, target.quantity, target.price
+                )
+                self._count(symbol, 'amended')
+                self.trading_system.active_orders.pop(existing.order_id, None)
+                self.trading_system.active_orders[order['id']] = order
+                target.order_id = order['id']
+                return target
+            except Exception as e:
+                self.logger.warning(
+                    f"Amend failed for {symbol} {target.side} level "
+                    f"{target.level}, replacing: {e}"
+                )
+
+        if existing and not await self._cancel_quote(symbol, existing):
+            # Still resting; placing the replacement would double the level
+            return existing
+
+        order = await self.trading_system.place_order(
+            symbol=symbol,
+            side=target.side,
+            order_type='limit',
+            amount=target.quantity,
+            price=target.price,
+            context={'algorithm': 'market_maker'}
+        )
+        if not order:
+            return None
+
+        self._count(symbol, 'placed')
+        target.order_id = order['id']
+        return target
+
+    async def _cancel_quote(self, symbol: str, quote: QuoteLevel) -> bool:
+        """Cancel a resting quote; False if it may still be resting"""
+        if not quote.order_id:
+            return True
+        if not await self.trading_system.cancel_order(quote.order_id, symbol):
+            self._count(symbol, 'cancel_failed')
+            self.logger.warning(
+                f"Cancel failed for {symbol} {quote.side} level {quote.level}, keeping it"
+            )
+            return False
+        self._count(symbol, 'cancelled')
+        return True
+
+    async def cancel_quotes(self, symbol: str):
+        """Pull all quotes for a symbol"""
+        lock = self._locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            remaining = {
+                key: quote for key, quote in self.quotes.pop(symbol, {}).items()
+                if not await self._cancel_quote(symbol, quote)
+            }
+            self.pending_books.pop(symbol, None)
+            if remaining:
+                self.quotes[symbol] = remaining
+                self.active_orders[symbol] = [q.order_id for q in remaining.values()]
+            else:
+                self.active_orders.pop(symbol, None)
+
+    def _count(self, symbol: str, event: str):
+        stats = self.quote_stats.setdefault(symbol, {})
+        stats[event] = stats.get(event, 0) + 1
+
+    def get_quote_stats(self, symbol: str) -> Dict[str, int]:
+        """Get requote counters, including order messages sent"""
+        stats = dict(self.quote_stats.get(symbol, {}))
+        stats['order_messages'] = (
+            stats.get('placed', 0) +
+            stats.get('amended', 0) +
+            stats.get('cancelled', 0)
+        )
+        return stats
@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from decimal import Decimal
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime
+
+from .execution_algorithms import ExecutionAlgorithm
+
+@dataclass
+class ParentOrder:
+    parent_id: str
+    algorithm: str
+    execution: ExecutionAlgorithm
+    status: str = 'running'
+    generation: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    finished: asyncio.Event = field(default_factory=asyncio.Event)
+    # Held while a slice runs so pause/resume/cancel never interleave with it
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+class ParentOrderScheduler:
+    """Runs the child-order timers of every parent order from one task.
+
+    Due times live in a heap keyed by monotonic time. Entries are never
+    removed in place: pausing, cancelling or rescheduling bumps the
+    parent's generation so stale entries are dropped when popped. Each
+    due slice runs as its own task, so a slow child order only delays
+    its own parent. Finished parents leave parents for a bounded
+    history that still answers get_status() and wait().
+    """
+    def __init__(self, max_batch: int = 100, max_history: int = 1000):
+        self.logger = logging.getLogger(__name__)
+        self.max_batch = max_batch
+        self.max_history = max_history
+        self.parents: Dict[str, ParentOrder] = {}
+        self.history: "OrderedDict[str, ParentOrder]" = OrderedDict()
+        self._inflight: Set[asyncio.Task] = set()
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self.running = False
+
+    def submit(self, algorithm: str, execution: ExecutionAlgorithm) -> str:
+        """Register a parent order; its first slice is due immediately"""
+        parent_id = str(uuid.uuid4())
+        execution.parent_id = parent_id
+        parent = ParentOrder(parent_id, algorithm, execution)
+        self.parents[parent_id] = parent
+        self._schedule(parent, 0.0)
+        self.logger.info(
+            f"Submitted {algorithm} {execution.side} {execution.total_quantity} "
+            f"{execution.symbol} as {parent_id}"
+        )
+        return parent_id
+
+    def _schedule(self, parent: ParentOrder, delay: float):
+        heapq.heappush(self._heap, (
+            time.monotonic() + delay,
+            next(self._sequence),
+            parent.parent_id,
+            parent.generation
+        ))
+        self._wakeup.set()
+
+    def _get(self, parent_id: str) -> ParentOrder:
+        parent = self.parents.get(parent_id) or self.history.get(parent_id)
+        if not parent:
+            raise ValueError(f"Unknown parent order: {parent_id}")
+        return parent
+
+    def _finish(self, parent: ParentOrder, status: str):
+        """Move a parent out of the active set once it is done"""
+        parent.status = status
+        parent.finished.set()
+        self.parents.pop(parent.parent_id, None)
+        self.history[parent.parent_id] = parent
+        while len(self.history) > self.max_history:
+            self.history.popitem(last=False)
+
+    async def run(self):
+        """Fire due slices, each in its own task, until stopped"""
+        self.running = True
+        while self.running:
+            now = time.monotonic()
+            fired = 0
+            while self._heap and self._heap[0][0] <= now and fired < self.max_batch:
+                _, _, parent_id, generation = heapq.heappop(self._heap)
+                parent = self.parents.get(parent_id)
+                if parent and parent.generation == generation and parent.status == 'running':
+                    task = asyncio.create_task(self._step(parent, generation))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._inflight.discard)
+                    fired += 1
+
+            if fired:
+                # Let the slices start before looking at the heap again
+                await asyncio.sleep(0)
+                continue
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self):
+        """Stop the scheduler, cancelling every active parent order"""
+        for parent_id, parent in list(self.parents.items()):
+            if parent.status in ('running', 'paused'):
+                await self.cancel(parent_id)
+        self.running = False
+        self._wakeup.set()
+
+    async def _step(self, parent: ParentOrder, generation: int):
+        """Run one step of a parent and schedule its next one"""
+        async with parent.lock:
+            # Paused or cancelled while this slice was waiting to start
+            if parent.status != 'running' or parent.generation != generation:
+                return
+            try:
+                delay = await parent.execution.step()
+            except Exception as e:
+                self.logger.error(f"Parent order {parent.parent_id} failed: {e}")
+                parent.error = str(e)
+                await parent.execution.cancel()
+                self._finish(parent, 'failed')
+                return
+
+            if parent.execution.done:
+                self._finish(parent, 'completed')
+            else:
+                self._schedule(parent, delay)
+
+    async def pause(self, parent_id: str):
+        """Pause a running parent order, after any slice in flight"""
+        parent = self._get(parent_id)
+        async with parent.lock:
+            if parent.status != 'running':
+                raise ValueError(f"Parent order {parent_id} is {parent.status}")
+            parent.status = 'paused'
+            parent.generation += 1
+            await parent.execution.pause()
+
+    async def resume(self, parent_id: str):
+        """Resume a paused parent order"""
+        parent = self._get(parent_id)
+        async with parent.lock:
+            if parent.status != 'paused':
+                raise ValueError(f"Parent order {parent_id} is {parent.status}")
+            await parent.execution.resume()
+            parent.status = 'running'
+            parent.generation += 1
+            self._schedule(parent, 0.0)
+
+    def amend(self, parent_id: str, total_quantity: Decimal):
+        """Change the total quantity of an active parent order"""
+        parent = self._get(parent_id)
+        if parent.status not in ('running', 'paused'):
+            raise ValueError(f"Parent order {parent_id} is {parent.status}")
+        parent.execution.amend(total_quantity)
+
+    async def cancel(self, parent_id: str):
+        """Cancel an active parent order"""
+        parent = self._get(parent_id)
+        async with parent.lock:
+            if parent.status not in ('running', 'paused'):
+                return
+            parent.generation += 1
+            await parent.execution.cancel()
+            self._finish(parent, 'cancelled')
+
+    async def wait(self, parent_id: str) -> ParentOrder:
+        """Wait until a parent order completes, fails or is cancelled"""
+        parent = self._get(parent_id)
+        await parent.finished.wait()
+        return parent
+
+    def get_status(self, parent_id: str) -> Dict:
+        """Get progress of a parent order"""
+        parent = self._get(parent_id)
+        execution = parent.execution
+        return {
+            'parent_id': parent_id,
+            'algorithm': parent.algorithm,
+            'symbol': execution.symbol,
+            'side': execution.side,
+            'status': parent.status,
+            'total_quantity': execution.total_quantity,
+            'filled': execution.filled,
+            'remaining': execution.remaining,
+            'error': parent.error,
+            'created_at': parent.created_at
+        }
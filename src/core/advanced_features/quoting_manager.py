@@ -0,0 +1,325 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from .market_maker import QuoteLevel
+
+@dataclass
+class SymbolQuoteState:
+    symbol: str
+    venue: str
+    base_quantity: Decimal
+    max_inventory: Decimal
+    inventory: Decimal = Decimal('0')
+    quotes: Dict[Tuple[str, int], QuoteLevel] = field(default_factory=dict)
+    active: bool = True
+
+class QuotingManager:
+    """Drives quotes for many symbols from one task and a shared feed"""
+    def __init__(
+        self,
+        trading_system,
+        spread_percentage: Decimal = Decimal('0.002'),
+        num_levels: int = 1,
+        level_spacing: Decimal = Decimal('0.001'),
+        requote_tolerance: Decimal = Decimal('0.0005'),
+        inventory_skew: Decimal = Decimal('0.001'),
+        exchanges: Optional[Dict] = None
+    ):
+        self.trading_system = trading_system
+        self.spread_percentage = spread_percentage
+        self.num_levels = num_levels
+        self.level_spacing = level_spacing
+        self.requote_tolerance = requote_tolerance
+        self.inventory_skew = inventory_skew
+        self.logger = logging.getLogger(__name__)
+
+        # Venue name -> Exchange; defaults to the trading system's exchange
+        self.exchanges = exchanges or {
+            trading_system.exchange.config.name: trading_system.exchange
+        }
+        self.default_venue = next(iter(self.exchanges))
+
+        self.symbols: Dict[str, SymbolQuoteState] = {}
+        self.order_index: Dict[str, Tuple[str, Tuple[str, int]]] = {}
+        self.books: Dict[str, Dict] = {}
+        self.dirty: Dict[str, bool] = {}
+        self.stopping: List[str] = []
+        self._wakeup = asyncio.Event()
+        self.running = False
+
+    def start_symbol(
+        self,
+        symbol: str,
+        base_quantity: Decimal,
+        max_inventory: Optional[Decimal] = None,
+        venue: Optional[str] = None
+    ):
+        """Start quoting a symbol.
+
+        A symbol that is still being stopped is resumed with its resting
+        quotes and inventory; one that is already quoting is rejected.
+        """
+        venue = venue or self.default_venue
+        if venue not in self.exchanges:
+            raise ValueError(f"Unknown venue: {venue}")
+
+        state = self.symbols.get(symbol)
+        if state and state.active:
+            raise ValueError(f"Already quoting {symbol}")
+        if state and state.venue != venue:
+            raise ValueError(f"{symbol} is still being stopped on {state.venue}")
+
+        if state:
+            state.base_quantity = base_quantity
+            state.max_inventory = max_inventory or base_quantity * 10
+            state.active = True
+            self.stopping = [s for s in self.stopping if s != symbol]
+        else:
+            self.symbols[symbol] = SymbolQuoteState(
+                symbol=symbol,
+                venue=venue,
+                base_quantity=base_quantity,
+                max_inventory=max_inventory or base_quantity * 10
+            )
+        if symbol in self.books:
+            self._mark_dirty(symbol)
+        self.logger.info(f"Started quoting {symbol} on {venue}")
+
+    def stop_symbol(self, symbol: str):
+        """Stop quoting a symbol; its quotes are pulled on the next cycle"""
+        state = self.symbols.get(symbol)
+        if state and state.active:
+            state.active = False
+            self.stopping.append(symbol)
+            self._wakeup.set()
+            self.logger.info(f"Stopping quotes for {symbol}")
+
+    def on_market_data(self, symbol: str, orderbook: Dict):
+        """Feed callback: record the latest book and schedule a requote"""
+        self.books[symbol] = orderbook
+        if symbol in self.symbols:
+            self._mark_dirty(symbol)
+
+    def on_fill(self, order_id: str, side: str, amount: Decimal):
+        """Update inventory when one of our quotes fills"""
+        owner = self.order_index.pop(order_id, None)
+        if not owner:
+            return
+
+        symbol, key = owner
+        state = self.symbols.get(symbol)
+        if not state:
+            return
+
+        state.inventory += amount if side == 'buy' else -amount
+        state.quotes.pop(key, None)
+        self._mark_dirty(symbol)
+
+    def _mark_dirty(self, symbol: str):
+        self.dirty[symbol] = True
+        self._wakeup.set()
+
+    async def run(self):
+        """Single task that requotes every symbol with a pending update"""
+        self.running = True
+        try:
+            while self.running:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+
+                symbols = list(self.dirty)
+                self.dirty.clear()
+                stopping, self.stopping = self.stopping, []
+
+                await self._requote(symbols, stopping)
+
+        except Exception as e:
+            self.logger.error(f"Quoting manager error: {e}")
+            self.running = False
+
+    async def stop(self):
+        """Pull all quotes and stop the quoting task"""
+        stopping = list(self.symbols)
+        for state in self.symbols.values():
+            state.active = False
+        await self._requote([], stopping)
+        self.running = False
+        self._wakeup.set()
+
+    async def _requote(self, symbols: List[str], stopping: List[str]):
+        """Compute order actions for all symbols and send them per venue.
+
+        Quotes being cancelled stay tracked until the venue confirms the
+        cancel; a stopped symbol is dropped once none are left resting.
+        """
+        creates: Dict[str, List[Tuple[str, Tuple[str, int], QuoteLevel]]] = {}
+        cancels: Dict[str, Dict[str, List[Tuple[Tuple[str, int], QuoteLevel]]]] = {}
+
+        for symbol in stopping:
+            state = self.symbols.get(symbol)
+            if not state or state.active:
+                continue
+            for key, quote in list(state.quotes.items()):
+                if quote.order_id:
+                    cancels.setdefault(state.venue, {}).setdefault(
+                        symbol, []
+                    ).append((key, quote))
+                else:
+                    del state.quotes[key]
+
+        for symbol in symbols:
+            state = self.symbols.get(symbol)
+            book = self.books.get(symbol)
+            if not state or not state.active or not book:
+                continue
+
+            try:
+                targets = self._build_targets(state, book)
+            except (IndexError, KeyError):
+                continue
+
+            for key in list(state.quotes):
+                existing = state.quotes[key]
+                target = targets.get(key)
+                if target and self._within_tolerance(existing, target):
+                    del targets[key]
+                    continue
+                if existing.order_id:
+                    cancels.setdefault(state.venue, {}).setdefault(
+                        symbol, []
+                    ).append((key, existing))
+                else:
+                    del state.quotes[key]
+
+            for key, target in targets.items():
+                creates.setdefault(state.venue, []).append((symbol, key, target))
+
+        await asyncio.gather(*[
+            self._dispatch(
+                venue, cancels.get(venue, {}), creates.get(venue, [])
+            )
+            for venue in set(cancels) | set(creates)
+        ])
+
+        for symbol in stopping:
+            state = self.symbols.get(symbol)
+            if not state or state.active:
+                continue
+            if state.quotes:
+                # Retried on the next wakeup rather than in a tight loop
+                self.stopping.append(symbol)
+            else:
+                del self.symbols[symbol]
+
+    async def _dispatch(
+        self,
+        venue: str,
+        cancels: Dict[str, List[Tuple[Tuple[str, int], QuoteLevel]]],
+        creates: List[Tuple[str, Tuple[str, int], QuoteLevel]]
+    ):
+        """Send one venue's cancels, then its new quotes, as batches.
+
+        Both go through the TradingSystem (cancel_orders, place_orders) so
+        each order is risk checked, booked and published like any other.
+        A symbol whose cancels failed keeps its old quotes and gets no new
+        ones.
+        """
+        exchange = self.exchanges[venue]
+        try:
+            results = await asyncio.gather(*[
+                self.trading_system.cancel_orders(
+                    [quote.order_id for _, quote in quotes], symbol, exchange=exchange
+                )
+                for symbol, quotes in cancels.items()
+            ])
+
+            failed = set()
+            for (symbol, quotes), cancelled in zip(cancels.items(), results):
+                if not cancelled:
+                    self.logger.warning(
+                        f"Cancel failed for {symbol} quotes on {venue}, keeping them"
+                    )
+                    failed.add(symbol)
+                    self.dirty[symbol] = True
+                    continue
+                state = self.symbols.get(symbol)
+                for key, quote in quotes:
+                    self.order_index.pop(quote.order_id, None)
+                    if state and state.quotes.get(key) is quote:
+                        del state.quotes[key]
+
+            creates = [create for create in creates if create[0] not in failed]
+            if not creates:
+                return
+
+            orders = await self.trading_system.place_orders(
+                [
+                    {
+                        'symbol': symbol,
+                        'type': 'limit',
+                        'side': quote.side,
+                        'amount': quote.quantity,
+                        'price': quote.price,
+                        'context': {'algorithm': 'quoting_manager'}
+                    }
+                    for symbol, _, quote in creates
+                ],
+                exchange=exchange
+            )
+
+            for (symbol, key, quote), order in zip(creates, orders):
+                state = self.symbols.get(symbol)
+                if not order or not state:
+                    continue
+                quote.order_id = order['id']
+                state.quotes[key] = quote
+                self.order_index[order['id']] = (symbol, key)
+
+        except Exception as e:
+            self.logger.error(f"Error dispatching quotes on {venue}: {e}")
+
+    def _build_targets(
+        self,
+        state: SymbolQuoteState,
+        orderbook: Dict
+    ) -> Dict[Tuple[str, int], QuoteLevel]:
+        """Build the target ladder, skewed away from current inventory"""
+        best_bid = Decimal(str(orderbook['bids'][0][0]))
+        best_ask = Decimal(str(orderbook['asks'][0][0]))
+        mid_price = (best_bid + best_ask) / 2
+
+        # Lean quotes against inventory so fills bring it back to flat
+        inventory_ratio = state.inventory / state.max_inventory
+        mid_price *= 1 - self.inventory_skew * inventory_ratio
+
+        bid_price = mid_price * (1 - self.spread_percentage)
+        ask_price = mid_price * (1 + self.spread_percentage)
+
+        targets = {}
+        for level in range(self.num_levels):
+            offset = self.level_spacing * level
+            if state.inventory + state.base_quantity <= state.max_inventory:
+                targets[('buy', level)] = QuoteLevel(
+                    'buy', level, bid_price * (1 - offset), state.base_quantity
+                )
+            if state.inventory - state.base_quantity >= -state.max_inventory:
+                targets[('sell', level)] = QuoteLevel(
+                    'sell', level, ask_price * (1 + offset), state.base_quantity
+                )
+        return targets
+
+    def _within_tolerance(self, existing: QuoteLevel, target: QuoteLevel) -> bool:
+        """Check whether a resting quote is close enough to its target"""
+        if existing.quantity != target.quantity or not existing.price:
+            return False
+        move = abs(target.price - existing.price) / existing.price
+        return move <= self.requote_tolerance
+
+    def get_inventory(self) -> Dict[str, Decimal]:
+        """Get current inventory per quoted symbol"""
+        return {
+            symbol: state.inventory for symbol, state in self.symbols.items()
+        }
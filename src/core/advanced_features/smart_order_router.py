@@ -1,18 +1,39 @@
 from decimal import Decimal
 import asyncio
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+from datetime import datetime, timedelta, timezone
+
+from .consolidated_book import (
+    ConsolidatedOrderBook, DepthSplitRouter, MultiVenueExecution
+)
+from .execution_algorithms import TWAPExecution, VWAPExecution
+from .iceberg import IcebergExecution
+from .order_scheduler import ParentOrderScheduler
+from .volume_profile import VolumeProfile
 
 class SmartOrderRouter:
     """Smart order routing system"""
-    def __init__(self, trading_system):
+    def __init__(
+        self,
+        trading_system,
+        profile_lookback_days: int = 14,
+        profile_ttl: timedelta = timedelta(hours=6)
+    ):
         self.trading_system = trading_system
         self.logger = logging.getLogger(__name__)
+        self.profile_lookback_days = profile_lookback_days
+        self.profile_ttl = profile_ttl
+        self.volume_profiles: Dict[str, VolumeProfile] = {}
+        self.scheduler = ParentOrderScheduler()
+        self._scheduler_task: Optional[asyncio.Task] = None
         self.execution_algorithms = {
             'twap': self._twap_execution,
             'vwap': self._vwap_execution,
-            'iceberg': self._iceberg_execution
+            'iceberg': self._iceberg_execution,
+            'multi_venue': self._multi_venue_execution
         }
+        self._depth_router: Optional[DepthSplitRouter] = None
 
     async def execute_smart_order(
         self,
@@ -21,37 +42,150 @@ class SmartOrderRouter:
         total_quantity: Decimal,
         algorithm: str = 'twap',
         params: Dict = {}
-    ):
-        """Execute order using smart routing"""
+    ) -> str:
+        """Submit a parent order for smart routing and return its id.
+
+        Child orders are fired by the shared scheduler, so this returns
+        as soon as the parent is accepted; use scheduler.wait() to block.
+        """
         try:
-            if algorithm in self.execution_algorithms:
-                await self.execution_algorithms[algorithm](
-                    symbol, side, total_quantity, params
-                )
-            else:
+            if algorithm not in self.execution_algorithms:
                 raise ValueError(f"Unknown algorithm: {algorithm}")
 
+            execution = await self.execution_algorithms[algorithm](
+                symbol, side, total_quantity, params
+            )
+            try:
+                # Benchmark for cost analysis: the price when we decided to trade
+                execution.decision_price = (
+                    await self.trading_system._get_current_price(symbol)
+                )
+            except Exception:
+                execution.decision_price = None
+
+            if not self._scheduler_task or self._scheduler_task.done():
+                self._scheduler_task = asyncio.create_task(self.scheduler.run())
+            return self.scheduler.submit(algorithm, execution)
+
         except Exception as e:
             self.logger.error(f"Smart order routing error: {e}")
             raise
 
+    async def pause_order(self, parent_id: str):
+        """Pause a running parent order"""
+        await self.scheduler.pause(parent_id)
+
+    async def resume_order(self, parent_id: str):
+        """Resume a paused parent order"""
+        await self.scheduler.resume(parent_id)
+
+    def amend_order(self, parent_id: str, total_quantity: Decimal):
+        """Change the total quantity of a parent order"""
+        self.scheduler.amend(parent_id, total_quantity)
+
+    async def cancel_order(self, parent_id: str):
+        """Cancel a parent order"""
+        await self.scheduler.cancel(parent_id)
+
     async def _twap_execution(
         self,
         symbol: str,
         side: str,
         total_quantity: Decimal,
         params: Dict
-    ):
+    ) -> TWAPExecution:
         """Time-Weighted Average Price execution"""
-        intervals = params.get('intervals', 10)
-        interval_duration = params.get('interval_duration', 60)
-        quantity_per_interval = total_quantity / Decimal(str(intervals))
-
-        for _ in range(intervals):
-            await self.trading_system.place_order(
-                symbol=symbol,
-                side=side,
-                order_type='market',
-                amount=quantity_per_interval
+        return TWAPExecution(
+            self.trading_system, symbol, side, total_quantity, params
+        )
+
+    async def get_volume_profile(self, symbol: str) -> VolumeProfile:
+        """Get the cached intraday volume profile, rebuilding it when stale"""
+        profile = self.volume_profiles.get(symbol)
+        if profile and datetime.utcnow() - profile.built_at < self.profile_ttl:
+            return profile
+
+        ohlcv = await self.trading_system.get_ohlcv(
+            symbol, timeframe='1h', limit=24 * self.profile_lookback_days
+        )
+        profile = VolumeProfile.from_ohlcv(symbol, ohlcv, bucket_minutes=60)
+        self.volume_profiles[symbol] = profile
+        return profile
+
+    async def _realized_volume(
+        self,
+        symbol: str,
+        start: datetime,
+        end: datetime
+    ) -> Optional[float]:
+        """Market volume actually traded between start and end"""
+        since = int(start.replace(tzinfo=timezone.utc).timestamp() * 1000)
+        until = int(end.replace(tzinfo=timezone.utc).timestamp() * 1000)
+        minutes = max(int((end - start).total_seconds() // 60), 1)
+        ohlcv = await self.trading_system.get_ohlcv(
+            symbol, timeframe='1m', limit=minutes + 1, since=since
+        )
+        if not len(ohlcv):
+            return None
+        return float(sum(candle[5] for candle in ohlcv if candle[0] < until))
+
+    async def _vwap_execution(
+        self,
+        symbol: str,
+        side: str,
+        total_quantity: Decimal,
+        params: Dict
+    ) -> VWAPExecution:
+        """Volume-Weighted Average Price execution"""
+        return VWAPExecution(
+            self.trading_system, symbol, side, total_quantity, params,
+            profile=await self.get_volume_profile(symbol),
+            realized_volume=self._realized_volume
+        )
+
+    async def _iceberg_execution(
+        self,
+        symbol: str,
+        side: str,
+        total_quantity: Decimal,
+        params: Dict
+    ) -> IcebergExecution:
+        """Passive iceberg execution with a small visible limit order"""
+        return IcebergExecution(
+            self.trading_system, symbol, side, total_quantity, params
+        )
+
+    def get_depth_router(self) -> DepthSplitRouter:
+        """Router over the primary exchange and any arbitrage venues"""
+        if not self._depth_router:
+            exchanges = {
+                self.trading_system.exchange.config.name: self.trading_system.exchange
+            }
+            fees = {}
+            arbitrage = self.trading_system.arbitrage
+            if arbitrage:
+                for exchange in arbitrage.exchanges:
+                    exchanges.setdefault(exchange.config.name, exchange)
+                # Same fee schedule the arbitrage scanner uses
+                fees = {
+                    'fee_rates': arbitrage.fee_rates,
+                    'default_fee_rate': arbitrage.default_fee_rate
+                }
+            self._depth_router = DepthSplitRouter(
+                self.trading_system,
+                ConsolidatedOrderBook(list(exchanges.values()), **fees)
             )
-            await asyncio.sleep(interval_duration)
\ No newline at end of file
+        return self._depth_router
+
+    async def _multi_venue_execution(
+        self,
+        symbol: str,
+        side: str,
+        total_quantity: Decimal,
+        params: Dict
+    ) -> MultiVenueExecution:
+        """Split across venues by walking the consolidated book"""
+        return MultiVenueExecution(
+            self.trading_system, symbol, side, total_quantity, params,
+            router=self.get_depth_router()
+        )
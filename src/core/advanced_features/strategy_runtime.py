@@ -0,0 +1,365 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+@dataclass
+class StrategyStats:
+    strategy_id: str
+    symbol: str
+    analyze_calls: int = 0
+    cpu_time: float = 0.0
+    wall_time: float = 0.0
+    last_latency: float = 0.0
+    max_latency: float = 0.0
+    signals: int = 0
+    orders: int = 0
+    errors: int = 0
+    slow_streak: int = 0
+    isolated: bool = False
+
+    def as_dict(self) -> Dict:
+        calls = self.analyze_calls or 1
+        return {
+            'strategy_id': self.strategy_id,
+            'symbol': self.symbol,
+            'analyze_calls': self.analyze_calls,
+            'cpu_time': self.cpu_time,
+            'avg_cpu_time': self.cpu_time / calls,
+            'avg_wall_time': self.wall_time / calls,
+            'last_latency': self.last_latency,
+            'max_latency': self.max_latency,
+            'signals': self.signals,
+            'orders': self.orders,
+            'errors': self.errors,
+            'isolated': self.isolated
+        }
+
+@dataclass
+class _Registration:
+    strategy_id: str
+    strategy: object
+    symbol: str
+    stats: StrategyStats
+    active: bool = False
+    task: Optional[asyncio.Task] = None
+    pending: bool = False
+
+class _BatchingTradingSystem:
+    """The trading system as a strategy sees it while the runtime drives it.
+
+    place_order() joins the runtime's next order batch; everything else
+    is passed through to the real trading system.
+    """
+    def __init__(self, runtime, trading_system, strategy_id: str):
+        self._runtime = runtime
+        self._trading_system = trading_system
+        self._strategy_id = strategy_id
+
+    def __getattr__(self, name):
+        return getattr(self._trading_system, name)
+
+    async def place_order(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str,
+        amount: Optional[Decimal] = None,
+        price: Optional[Decimal] = None,
+        params: Dict = {},
+        context: Optional[Dict] = None,
+        quantity: Optional[Decimal] = None
+    ) -> Optional[Dict]:
+        amount = amount if amount is not None else quantity
+        return await self._runtime._enqueue_order(self._strategy_id, {
+            'symbol': symbol,
+            'side': side.lower(),
+            'type': order_type.lower(),
+            'amount': Decimal(str(amount)),
+            'price': Decimal(str(price)) if price is not None else None,
+            'params': params,
+            'context': {'algorithm': f"strategy:{self._strategy_id}", **(context or {})}
+        })
+
+class StrategyRuntime:
+    """Drives every running strategy from one shared market data feed.
+
+    Each symbol's ticker is watched on the trading system's market data
+    feed once however many strategies trade it; an update is coalesced per symbol and fanned out to the strategies
+    on that symbol. Orders placed by strategies in the same loop turn
+    go to the exchange as one batch. A strategy whose analyze() keeps
+    using more than max_cpu_per_call is isolated: it then runs in its own
+    task on the latest update only, so it can no longer hold up the rest.
+    """
+    def __init__(
+        self,
+        trading_system,
+        max_cpu_per_call: float = 0.005,
+        slow_call_limit: int = 20
+    ):
+        self.trading_system = trading_system
+        self.logger = logging.getLogger(__name__)
+        self.max_cpu_per_call = max_cpu_per_call
+        self.slow_call_limit = slow_call_limit
+
+        self.strategies: Dict[str, _Registration] = {}
+        self.subscriptions: Dict[str, Set[str]] = {}
+        self.latest: Dict[str, Tuple[Dict, float]] = {}
+        self.dirty: Dict[str, bool] = {}
+        self._wakeup = asyncio.Event()
+        self._order_queue: List[Tuple[str, Dict, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._tasks: List[asyncio.Task] = []
+        self._flushes: Set[asyncio.Task] = set()
+        self.batches_sent = 0
+        self.running = False
+
+    # Registration
+
+    def add(self, strategy_id: str, strategy) -> None:
+        """Register a strategy; it receives updates once started"""
+        strategy_id = str(strategy_id)
+        if strategy_id in self.strategies:
+            raise ValueError(f"Strategy {strategy_id} already registered")
+        symbol = strategy.config['symbol']
+        strategy.trading_system = _BatchingTradingSystem(
+            self, self.trading_system, strategy_id
+        )
+        self.strategies[strategy_id] = _Registration(
+            strategy_id, strategy, symbol, StrategyStats(strategy_id, symbol)
+        )
+
+    def _get(self, strategy_id) -> _Registration:
+        try:
+            return self.strategies[str(strategy_id)]
+        except KeyError:
+            raise ValueError(f"Unknown strategy: {strategy_id}")
+
+    async def start_strategy(self, strategy_id) -> None:
+        registration = self._get(strategy_id)
+        if registration.active:
+            return
+        await registration.strategy.start()
+        registration.active = True
+        if registration.symbol not in self.subscriptions:
+            self.trading_system.market_data.watch('ticker', registration.symbol)
+        self.subscriptions.setdefault(registration.symbol, set()).add(
+            registration.strategy_id
+        )
+        if registration.symbol in self.latest:
+            self._mark_dirty(registration.symbol)
+        if not self.running:
+            self.start()
+        self.logger.info(
+            f"Started strategy {registration.strategy_id} on {registration.symbol}"
+        )
+
+    async def stop_strategy(self, strategy_id) -> None:
+        registration = self._get(strategy_id)
+        if not registration.active:
+            return
+        registration.active = False
+        subscribers = self.subscriptions.get(registration.symbol, set())
+        subscribers.discard(registration.strategy_id)
+        if not subscribers:
+            # Last strategy on the symbol: drop the subscription
+            if self.subscriptions.pop(registration.symbol, None) is not None:
+                self.trading_system.market_data.unwatch('ticker', registration.symbol)
+            self.latest.pop(registration.symbol, None)
+        await registration.strategy.stop()
+
+    def isolate(self, strategy_id, isolated: bool = True) -> None:
+        """Move a strategy out of (or back into) the shared dispatch cycle"""
+        registration = self._get(strategy_id)
+        registration.stats.isolated = isolated
+        registration.stats.slow_streak = 0
+
+    # Feed
+
+    def on_market_data(self, symbol: str, ticker: Dict) -> None:
+        """Feed callback: keep the latest update per subscribed symbol"""
+        if symbol not in self.subscriptions:
+            return
+        self.latest[symbol] = (ticker, time.perf_counter())
+        self._mark_dirty(symbol)
+
+    def _mark_dirty(self, symbol: str):
+        self.dirty[symbol] = True
+        self._wakeup.set()
+
+    # Dispatch
+
+    def start(self):
+        """Start the dispatch task"""
+        self.running = True
+        self._tasks = [asyncio.create_task(self.run())]
+
+    async def stop(self):
+        for registration in self.strategies.values():
+            if registration.active:
+                await self.stop_strategy(registration.strategy_id)
+        self.running = False
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def run(self):
+        """Single task that fans coalesced updates out to strategies"""
+        while self.running:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            symbols = list(self.dirty)
+            self.dirty.clear()
+            try:
+                await self._dispatch(symbols)
+            except Exception as e:
+                self.logger.error(f"Strategy runtime error: {e}")
+
+    async def _dispatch(self, symbols: List[str]):
+        """Analyze every shared strategy, then execute all signals together"""
+        executions = []
+        for symbol in symbols:
+            if symbol not in self.latest:
+                continue
+            ticker, received_at = self.latest[symbol]
+            market_data = self._market_data(symbol, ticker)
+
+            for strategy_id in list(self.subscriptions.get(symbol, ())):
+                registration = self.strategies[strategy_id]
+                if registration.stats.isolated:
+                    self._dispatch_isolated(registration)
+                    continue
+                signals = await self._analyze(registration, market_data, received_at)
+                executions.extend(
+                    self._execute(registration, signal) for signal in signals
+                )
+
+        if executions:
+            await asyncio.gather(*executions)
+
+    def _dispatch_isolated(self, registration: _Registration):
+        """Run an isolated strategy in its own task, one update at a time"""
+        if registration.task and not registration.task.done():
+            registration.pending = True
+            return
+
+        async def run():
+            registration.pending = True
+            while registration.pending and registration.active:
+                registration.pending = False
+                if registration.symbol not in self.latest:
+                    break
+                ticker, received_at = self.latest[registration.symbol]
+                signals = await self._analyze(
+                    registration, self._market_data(registration.symbol, ticker), received_at
+                )
+                await asyncio.gather(*[
+                    self._execute(registration, signal) for signal in signals
+                ])
+
+        registration.task = asyncio.create_task(run())
+
+    @staticmethod
+    def _market_data(symbol: str, ticker: Dict) -> Dict:
+        return {
+            **ticker,
+            'symbol': symbol,
+            'price': ticker.get('last') if ticker.get('last') is not None else ticker.get('price')
+        }
+
+    async def _analyze(
+        self,
+        registration: _Registration,
+        market_data: Dict,
+        received_at: float
+    ) -> List[Dict]:
+        """Run analyze() and account its CPU time and latency"""
+        stats = registration.stats
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        try:
+            analysis = await registration.strategy.analyze(market_data)
+        except Exception as e:
+            stats.errors += 1
+            self.logger.error(f"Strategy {registration.strategy_id} analyze failed: {e}")
+            analysis = {}
+        finished = time.perf_counter()
+        cpu = time.thread_time() - cpu_start
+
+        stats.analyze_calls += 1
+        stats.cpu_time += cpu
+        stats.wall_time += finished - wall_start
+        stats.last_latency = finished - received_at
+        stats.max_latency = max(stats.max_latency, stats.last_latency)
+
+        if cpu > self.max_cpu_per_call:
+            stats.slow_streak += 1
+            if stats.slow_streak >= self.slow_call_limit and not stats.isolated:
+                stats.isolated = True
+                self.logger.warning(
+                    f"Isolating strategy {registration.strategy_id}: "
+                    f"{stats.slow_streak} calls over {self.max_cpu_per_call * 1000:.1f}ms CPU"
+                )
+        else:
+            stats.slow_streak = 0
+
+        signals = (analysis or {}).get('signals', [])
+        stats.signals += len(signals)
+        return signals
+
+    async def _execute(self, registration: _Registration, signal: Dict):
+        try:
+            await registration.strategy.execute(signal)
+        except Exception as e:
+            registration.stats.errors += 1
+            self.logger.error(f"Strategy {registration.strategy_id} execute failed: {e}")
+
+    # Order batching
+
+    def _enqueue_order(self, strategy_id: str, order: Dict) -> asyncio.Future:
+        """Queue an order for the batch sent at the end of this loop turn"""
+        future = asyncio.get_running_loop().create_future()
+        self._order_queue.append((strategy_id, order, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._schedule_flush)
+        return future
+
+    def _schedule_flush(self):
+        # Hold a reference so the batch task is not collected mid-flight
+        task = asyncio.ensure_future(self._flush_orders())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush_orders(self):
+        queue, self._order_queue = self._order_queue, []
+        self._flush_scheduled = False
+        if not queue:
+            return
+
+        try:
+            results = await self.trading_system.place_orders(
+                [order for _, order, _ in queue]
+            )
+        except Exception as e:
+            self.logger.error(f"Strategy order batch failed: {e}")
+            results = [None] * len(queue)
+
+        self.batches_sent += 1
+        for (strategy_id, _, future), result in zip(queue, results):
+            if result:
+                self.strategies[strategy_id].stats.orders += 1
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> List[Dict]:
+        """Per-strategy accounting, highest CPU time first"""
+        return sorted(
+            (r.stats.as_dict() for r in self.strategies.values()),
+            key=lambda stats: stats['cpu_time'],
+            reverse=True
+        )
@@ -0,0 +1,192 @@
+import numpy as np
+from decimal import Decimal
+import logging
+import math
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime
+
+from ..exchange import Exchange
+
+class TriangularArbitrage:
+    """Multi-leg cycle detector over the market graph of a single venue.
+
+    Currencies are nodes and every market contributes two directed edges
+    weighted by -log(rate after fees), so a profitable cycle is one whose
+    weights sum below zero. Cycles are enumerated once when the graph is
+    built and indexed by market, so a ticker update only re-checks the
+    cycles that trade through that market.
+    """
+    def __init__(
+        self,
+        exchange: Exchange,
+        max_legs: int = 3,
+        min_profit_threshold: Decimal = Decimal('0.001'),
+        default_fee_rate: Decimal = Decimal('0.001')
+    ):
+        self.exchange = exchange
+        self.logger = logging.getLogger(__name__)
+        self.max_legs = max_legs
+        self.min_profit_threshold = min_profit_threshold
+        self.default_fee_rate = default_fee_rate
+
+        self.currencies: List[str] = []
+        self.currency_index: Dict[str, int] = {}
+        # Edge e: (from currency, to currency, symbol, side)
+        self.edges: List[Tuple[int, int, str, str]] = []
+        self.edge_weights = np.zeros(0)
+        self.market_edges: Dict[str, Tuple[int, int]] = {}
+        self.fee_factors: Dict[str, float] = {}
+        # Cycles grouped by length: (n_cycles, legs) arrays of edge ids
+        self.cycles: Dict[int, np.ndarray] = {}
+        self.market_cycles: Dict[str, List[Tuple[int, np.ndarray]]] = {}
+        self.built = False
+        # Cycles re-checked by the last update
+        self.last_scanned = 0
+
+    def build(self, markets: Optional[Dict] = None):
+        """Index currencies, markets and candidate cycles"""
+        markets = markets if markets is not None else self.exchange.markets
+        self.currencies, self.currency_index = [], {}
+        self.edges, self.market_edges, self.fee_factors = [], {}, {}
+
+        def index(currency: str) -> int:
+            if currency not in self.currency_index:
+                self.currency_index[currency] = len(self.currencies)
+                self.currencies.append(currency)
+            return self.currency_index[currency]
+
+        for symbol, market in markets.items():
+            if market.get('active') is False or not market.get('spot', True):
+                continue
+            base, quote = index(market['base']), index(market['quote'])
+            fee = market.get('taker')
+            self.fee_factors[symbol] = 1.0 - float(
+                fee if fee is not None else self.default_fee_rate
+            )
+            # Selling base at the bid, buying base with quote at the ask
+            self.market_edges[symbol] = (len(self.edges), len(self.edges) + 1)
+            self.edges.append((base, quote, symbol, 'sell'))
+            self.edges.append((quote, base, symbol, 'buy'))
+
+        # Edges without a price yet never take part in a profitable cycle
+        self.edge_weights = np.full(len(self.edges), np.inf)
+        self._enumerate_cycles()
+        self.built = True
+        self.logger.info(
+            f"Built market graph: {len(self.currencies)} currencies, "
+            f"{len(self.market_edges)} markets, "
+            f"{sum(len(c) for c in self.cycles.values())} cycles"
+        )
+
+    def _enumerate_cycles(self):
+        """Find all simple cycles of 3..max_legs edges"""
+        outgoing: List[List[int]] = [[] for _ in self.currencies]
+        for edge_id, (source, _, _, _) in enumerate(self.edges):
+            outgoing[source].append(edge_id)
+
+        found: Dict[int, List[List[int]]] = {}
+
+        def extend(start: int, node: int, path: List[int], visited: Set[int]):
+            for edge_id in outgoing[node]:
+                target = self.edges[edge_id][1]
+                if target == start and len(path) >= 2:
+                    found.setdefault(len(path) + 1, []).append(path + [edge_id])
+                # Only visit nodes above the start so each cycle is found once
+                elif (
+                    target > start and target not in visited
+                    and len(path) + 1 < self.max_legs
+                ):
+                    visited.add(target)
+                    extend(start, target, path + [edge_id], visited)
+                    visited.discard(target)
+
+        for start in range(len(self.currencies)):
+            extend(start, start, [], {start})
+
+        self.cycles = {
+            legs: np.array(paths, dtype=np.int64)
+            for legs, paths in found.items()
+        }
+
+        market_cycles: Dict[str, Dict[int, List[int]]] = {}
+        for legs, cycle_edges in self.cycles.items():
+            for cycle_id, path in enumerate(cycle_edges):
+                for edge_id in path:
+                    symbol = self.edges[edge_id][2]
+                    ids = market_cycles.setdefault(symbol, {}).setdefault(legs, [])
+                    if not ids or ids[-1] != cycle_id:
+                        ids.append(cycle_id)
+
+        self.market_cycles = {
+            symbol: [
+                (legs, np.array(ids, dtype=np.int64))
+                for legs, ids in by_length.items()
+            ]
+            for symbol, by_length in market_cycles.items()
+        }
+
+    def _set_prices(self, symbol: str, bid: float, ask: float) -> bool:
+        """Update the two edge weights of a market"""
+        edges = self.market_edges.get(symbol)
+        if not edges or not bid or not ask:
+            return False
+        fee_factor = self.fee_factors[symbol]
+        sell_edge, buy_edge = edges
+        self.edge_weights[sell_edge] = -math.log(bid * fee_factor)
+        self.edge_weights[buy_edge] = -math.log(fee_factor / ask)
+        return True
+
+    def update_ticker(self, symbol: str, bid: float, ask: float) -> List[Dict]:
+        """Apply one ticker and return opportunities through that market"""
+        return self.update_tickers({symbol: {'bid': bid, 'ask': ask}})
+
+    def update_tickers(self, tickers: Dict[str, Dict]) -> List[Dict]:
+        """Apply a batch of tickers and re-check only the affected cycles.
+
+        The graph is built from the exchange's markets on first use.
+        """
+        if not self.built:
+            if not self.exchange.markets:
+                return []
+            self.build()
+        touched: Dict[int, List[np.ndarray]] = {}
+        for symbol, ticker in tickers.items():
+            if self._set_prices(symbol, ticker.get('bid'), ticker.get('ask')):
+                for legs, ids in self.market_cycles.get(symbol, []):
+                    touched.setdefault(legs, []).append(ids)
+
+        threshold = -math.log1p(float(self.min_profit_threshold))
+        opportunities = []
+        self.last_scanned = 0
+        for legs, id_lists in touched.items():
+            cycle_ids = np.unique(np.concatenate(id_lists))
+            self.last_scanned += len(cycle_ids)
+            cycle_edges = self.cycles[legs][cycle_ids]
+            totals = self.edge_weights[cycle_edges].sum(axis=1)
+            for row in np.nonzero(totals < threshold)[0]:
+                opportunities.append(
+                    self._describe(cycle_edges[row], totals[row])
+                )
+
+        return opportunities
+
+    def _describe(self, path: np.ndarray, total_weight: float) -> Dict:
+        """Turn a cycle of edge ids into an opportunity"""
+        legs = [self.edges[edge_id] for edge_id in path]
+        return {
+            'path': [self.currencies[leg[0]] for leg in legs] + [
+                self.currencies[legs[0][0]]
+            ],
+            'legs': [{'symbol': leg[2], 'side': leg[3]} for leg in legs],
+            'profit_percentage': Decimal(str(math.expm1(-total_weight))),
+            'timestamp': datetime.now()
+        }
+
+    async def refresh(self) -> List[Dict]:
+        """Fetch all tickers from the venue and scan the whole graph"""
+        try:
+            tickers = await self.exchange.exchange.fetch_tickers()
+            return self.update_tickers(tickers)
+        except Exception as e:
+            self.logger.error(f"Triangular arbitrage error: {e}")
+            return []
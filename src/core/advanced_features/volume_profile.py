@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from decimal import Decimal
+import numpy as np
+from typing import List
+from datetime import datetime, timedelta
+
+MINUTES_PER_DAY = 1440
+
+@dataclass
+class VolumeProfile:
+    """Average share of daily volume traded in each intraday bucket (UTC)"""
+    symbol: str
+    bucket_minutes: int
+    fractions: np.ndarray
+    daily_volume: float
+    built_at: datetime
+
+    @classmethod
+    def from_ohlcv(
+        cls,
+        symbol: str,
+        ohlcv: List[List],
+        bucket_minutes: int = 60
+    ) -> 'VolumeProfile':
+        """Build a profile from OHLCV candles ([ts_ms, o, h, l, c, v])"""
+        if MINUTES_PER_DAY % bucket_minutes:
+            raise ValueError(f"bucket_minutes must divide a day: {bucket_minutes}")
+
+        num_buckets = MINUTES_PER_DAY // bucket_minutes
+        candles = np.asarray(ohlcv, dtype=float)
+        if len(candles) == 0:
+            # No history: fall back to a flat profile
+            return cls(
+                symbol, bucket_minutes,
+                np.full(num_buckets, 1.0 / num_buckets), 0.0, datetime.utcnow()
+            )
+
+        minutes = (candles[:, 0] // 60000).astype(np.int64)
+        buckets = (minutes % MINUTES_PER_DAY) // bucket_minutes
+        volume = np.bincount(buckets, weights=candles[:, 5], minlength=num_buckets)
+
+        total = volume.sum()
+        fractions = (
+            volume / total if total > 0
+            else np.full(num_buckets, 1.0 / num_buckets)
+        )
+        num_days = max(len(np.unique(minutes // MINUTES_PER_DAY)), 1)
+
+        return cls(
+            symbol, bucket_minutes, fractions,
+            float(total / num_days), datetime.utcnow()
+        )
+
+    def _cumulative(self, minute_of_day: float) -> float:
+        """Share of daily volume traded between midnight and minute_of_day"""
+        bucket = min(int(minute_of_day // self.bucket_minutes), len(self.fractions) - 1)
+        within = (minute_of_day - bucket * self.bucket_minutes) / self.bucket_minutes
+        return float(self.fractions[:bucket].sum() + self.fractions[bucket] * within)
+
+    def fraction(self, start: datetime, end: datetime) -> float:
+        """Expected share of daily volume traded between start and end"""
+        if end <= start:
+            return 0.0
+
+        def minute_of_day(ts: datetime) -> float:
+            return ts.hour * 60 + ts.minute + ts.second / 60
+
+        whole_days = (end - start) // timedelta(days=1)
+        start_minute = minute_of_day(start)
+        end_minute = minute_of_day(end)
+
+        partial = self._cumulative(end_minute) - self._cumulative(start_minute)
+        if end_minute < start_minute:
+            partial += 1.0  # window wraps past midnight
+        return whole_days + partial
+
+    def forecast_volume(self, start: datetime, end: datetime) -> float:
+        """Expected market volume between start and end"""
+        return self.fraction(start, end) * self.daily_volume
+
+
+def vwap_slice_quantity(
+    total_quantity: Decimal,
+    executed: Decimal,
+    realized_volume: float,
+    forecast_slice: float,
+    forecast_rest: float
+) -> Decimal:
+    """Quantity for the next VWAP slice.
+
+    Targets a cumulative fill equal to the share of horizon volume that
+    will have traded by the end of the slice, using the volume actually
+    traded so far and the forecast for the rest of the horizon. Slices
+    are re-planned each time the realized volume drifts from forecast.
+    """
+    horizon_volume = realized_volume + forecast_slice + forecast_rest
+    if horizon_volume <= 0:
+        return Decimal('0')
+
+    share = (realized_volume + forecast_slice) / horizon_volume
+    target = total_quantity * Decimal(str(share))
+    return min(max(target - executed, Decimal('0')), total_quantity - executed)
@@ -0,0 +1,353 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+import itertools
+import logging
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from datetime import datetime, timezone
+
+from .indicators import Bar, IndicatorRegistry
+from .risk import RiskManager, RiskMetrics
+
+MS_PER_DAY = 86_400_000
+
+@dataclass
+class BacktestResult:
+    symbol: str
+    initial_capital: Decimal
+    final_equity: Decimal
+    pnl: Decimal
+    total_return: Decimal
+    max_drawdown: Decimal
+    fees: Decimal
+    risk_metrics: RiskMetrics
+    trades: List[Dict]
+    bars: int
+    analyze_calls: int
+    timestamps: np.ndarray = field(repr=False)
+    equity_curve: np.ndarray = field(repr=False)
+
+class SimulatedBroker:
+    """Stands in for TradingSystem when a strategy runs in a backtest.
+
+    Orders are only recorded here; BacktestEngine fills them against
+    later bars. Limit orders fill at their price (or the open if the bar
+    gaps through it), market orders at the next open plus slippage.
+    """
+    def __init__(
+        self,
+        initial_capital: Decimal = Decimal('10000'),
+        fee_rate: Decimal = Decimal('0.001'),
+        slippage: Decimal = Decimal('0.0005')
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.initial_capital = initial_capital
+        self.fee_rate = float(fee_rate)
+        self.slippage = float(slippage)
+        self.cash = float(initial_capital)
+        self.position = 0.0
+        self.fees = 0.0
+        self.open_orders: Dict[str, Dict] = {}
+        self.trades: List[Dict] = []
+        self.current_time: Optional[datetime] = None
+        self.indicators = IndicatorRegistry()
+        self._ids = itertools.count(1)
+
+    async def initialize(self) -> bool:
+        return True
+
+    async def shutdown(self):
+        self.open_orders.clear()
+
+    async def place_order(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str,
+        amount: Optional[Decimal] = None,
+        price: Optional[Decimal] = None,
+        params: Dict = {},
+        context: Optional[Dict] = None,
+        quantity: Optional[Decimal] = None
+    ) -> Optional[Dict]:
+        """Accept an order; it rests until a later bar fills it"""
+        amount = amount if amount is not None else quantity
+        order_type = order_type.lower()
+        if not amount or (order_type == 'limit' and price is None):
+            self.logger.warning(f"Rejected backtest order: {side} {amount} @ {price}")
+            return None
+
+        order = {
+            'id': str(next(self._ids)),
+            'symbol': symbol,
+            'side': side.lower(),
+            'type': order_type,
+            'price': Decimal(str(price)) if price is not None else None,
+            'amount': Decimal(str(amount)),
+            'filled': Decimal('0'),
+            'status': 'open',
+            'timestamp': self.current_time,
+            'context': context
+        }
+        self.open_orders[order['id']] = order
+        return order
+
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        order = self.open_orders.pop(order_id, None)
+        if order:
+            order['status'] = 'canceled'
+        return order is not None
+
+    def limit_bounds(self):
+        """Highest resting buy and lowest resting sell, and whether a market order waits"""
+        best_buy, best_sell, market = -np.inf, np.inf, False
+        for order in self.open_orders.values():
+            if order['type'] == 'market':
+                market = True
+            elif order['side'] == 'buy':
+                best_buy = max(best_buy, float(order['price']))
+            else:
+                best_sell = min(best_sell, float(order['price']))
+        return best_buy, best_sell, market
+
+    def fill_bar(self, timestamp: datetime, bar_open: float, high: float, low: float) -> List[Dict]:
+        """Fill every resting order the bar's range reaches"""
+        fills = []
+        for order_id, order in list(self.open_orders.items()):
+            if order['type'] == 'market':
+                direction = 1 if order['side'] == 'buy' else -1
+                price = bar_open * (1 + direction * self.slippage)
+            elif order['side'] == 'buy':
+                limit = float(order['price'])
+                if low > limit:
+                    continue
+                price = min(limit, bar_open)
+            else:
+                limit = float(order['price'])
+                if high < limit:
+                    continue
+                price = max(limit, bar_open)
+
+            del self.open_orders[order_id]
+            fills.append(self._fill(order, price, timestamp))
+        return fills
+
+    def _fill(self, order: Dict, price: float, timestamp: datetime) -> Dict:
+        amount = float(order['amount'])
+        notional = amount * price
+        fee = notional * self.fee_rate
+        if order['side'] == 'buy':
+            self.position += amount
+            self.cash -= notional + fee
+        else:
+            self.position -= amount
+            self.cash += notional - fee
+        self.fees += fee
+
+        order['status'] = 'closed'
+        order['filled'] = order['amount']
+        order['average'] = Decimal(str(price))
+        trade = {
+            'symbol': order['symbol'],
+            'side': order['side'],
+            'price': order['average'],
+            'amount': order['amount'],
+            'type': order['type'],
+            'fee': Decimal(str(fee)),
+            'order_id': order['id'],
+            'order_time': order['timestamp'],
+            'timestamp': timestamp,
+            **(order['context'] or {})
+        }
+        self.trades.append(trade)
+        return trade
+
+class BacktestEngine:
+    """Replays OHLCV bars through a strategy's analyze/execute.
+
+    A strategy may implement precompute(bars) to do its per-bar work for
+    the whole history at once. It returns a dict with an 'evaluate' mask
+    of the bars analyze() has to see, plus any feature arrays that should
+    be passed along in market_data. Bars in between are skipped with
+    vectorized scans unless a resting order fills on them.
+    """
+    def __init__(
+        self,
+        strategy_class,
+        config: Dict,
+        initial_capital: Decimal = Decimal('10000'),
+        fee_rate: Decimal = Decimal('0.001'),
+        slippage: Decimal = Decimal('0.0005'),
+        risk_manager: Optional[RiskManager] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.strategy_class = strategy_class
+        self.config = config
+        self.symbol = config['symbol']
+        self.timeframe = config.get('timeframe', '1m')
+        self.initial_capital = initial_capital
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.risk_manager = risk_manager or RiskManager(
+            max_position_size=Decimal('1'),
+            max_drawdown=Decimal('1'),
+            risk_free_rate=0.0
+        )
+
+    @staticmethod
+    def to_columns(ohlcv: Sequence) -> Dict[str, np.ndarray]:
+        """Split [ts_ms, o, h, l, c, v] rows into column arrays"""
+        bars = np.asarray(ohlcv, dtype=float)
+        return {
+            'timestamp': bars[:, 0],
+            'open': bars[:, 1],
+            'high': bars[:, 2],
+            'low': bars[:, 3],
+            'close': bars[:, 4],
+            'volume': bars[:, 5]
+        }
+
+    async def run(self, ohlcv: Sequence) -> BacktestResult:
+        """Run the strategy over the bars and report performance"""
+        bars = ohlcv if isinstance(ohlcv, dict) else self.to_columns(ohlcv)
+        n = len(bars['close'])
+        if not n:
+            raise ValueError("No bars to backtest")
+
+        broker = SimulatedBroker(self.initial_capital, self.fee_rate, self.slippage)
+        strategy = self.strategy_class(broker, self.config)
+        await strategy.start()
+
+        precomputed = {}
+        if hasattr(strategy, 'precompute'):
+            precomputed = strategy.precompute(bars) or {}
+        features = {k: v for k, v in precomputed.items() if k != 'evaluate'}
+        evaluate = precomputed.get('evaluate')
+        eval_index = (
+            np.flatnonzero(evaluate) if evaluate is not None else None
+        )
+
+        timestamps, opens = bars['timestamp'], bars['open']
+        highs, lows, closes = bars['high'], bars['low'], bars['close']
+
+        # (bar index, cash, position) after each bar that changed them
+        events = [(-1, broker.cash, broker.position)]
+        analyze_calls = 0
+        i = 0
+
+        while i < n:
+            if eval_index is not None:
+                j = self._next_bar(broker, eval_index, highs, lows, i, n)
+                if j >= n:
+                    break
+            else:
+                j = i
+
+            timestamp = datetime.fromtimestamp(timestamps[j] / 1000, timezone.utc)
+            broker.current_time = timestamp
+            fills = broker.fill_bar(timestamp, opens[j], highs[j], lows[j])
+            if fills:
+                events.append((j, broker.cash, broker.position))
+                await strategy.update_position(self.symbol, {
+                    'amount': Decimal(str(broker.position)),
+                    'cash': Decimal(str(broker.cash)),
+                    'fills': fills
+                })
+
+            if eval_index is None:
+                # Streaming indicators need every bar; precomputing
+                # strategies use the batch forms instead
+                broker.indicators.on_bar(self.symbol, self.timeframe, Bar(
+                    int(timestamps[j]), opens[j], highs[j], lows[j],
+                    closes[j], bars['volume'][j]
+                ))
+
+            if eval_index is None or fills or evaluate[j]:
+                market_data = {
+                    'symbol': self.symbol,
+                    'price': closes[j],
+                    'open': opens[j],
+                    'high': highs[j],
+                    'low': lows[j],
+                    'close': closes[j],
+                    'volume': bars['volume'][j],
+                    'timestamp': timestamp,
+                    **{name: values[j] for name, values in features.items()}
+                }
+                analysis = await strategy.analyze(market_data)
+                analyze_calls += 1
+                for signal in (analysis or {}).get('signals', []):
+                    await strategy.execute(signal)
+
+            i = j + 1
+
+        await strategy.stop()
+        return self._report(bars, broker, events, analyze_calls)
+
+    @staticmethod
+    def _next_bar(broker, eval_index, highs, lows, start, n) -> int:
+        """First bar from start that is flagged for analysis or fills an order"""
+        best_buy, best_sell, market = broker.limit_bounds()
+        if market:
+            return start
+
+        k = np.searchsorted(eval_index, start)
+        stop = eval_index[k] if k < len(eval_index) else n
+        if best_buy == -np.inf and best_sell == np.inf:
+            return stop
+
+        # Scan ahead in growing chunks so a fill close by stays cheap
+        size = 256
+        while start < stop:
+            end = min(stop, start + size)
+            hit = (lows[start:end] <= best_buy) | (highs[start:end] >= best_sell)
+            first = hit.argmax()
+            if hit[first]:
+                return start + first
+            start = end
+            size = min(size * 2, 1 << 16)
+        return stop
+
+    def _report(self, bars, broker, events, analyze_calls) -> BacktestResult:
+        """Expand fill events into a mark-to-market equity curve"""
+        closes = bars['close']
+        event_bars = np.array([e[0] for e in events])
+        cash = np.array([e[1] for e in events])
+        position = np.array([e[2] for e in events])
+
+        state = np.searchsorted(event_bars, np.arange(len(closes)), 'right') - 1
+        equity = cash[state] + position[state] * closes
+
+        peak = np.maximum.accumulate(equity)
+        max_drawdown = float(np.max((peak - equity) / peak))
+
+        # Risk metrics are computed on daily returns
+        day = (bars['timestamp'] // MS_PER_DAY).astype(np.int64)
+        day_close = np.append(np.flatnonzero(np.diff(day)), len(day) - 1)
+        daily = np.concatenate(([float(self.initial_capital)], equity[day_close]))
+        returns = np.diff(daily) / daily[:-1]
+        risk_metrics = self.risk_manager.calculate_metrics(
+            [Decimal(str(r)) for r in returns]
+        )
+
+        final_equity = Decimal(str(equity[-1]))
+        pnl = final_equity - self.initial_capital
+        self.logger.info(
+            f"Backtest {self.symbol}: {len(closes)} bars, {len(broker.trades)} "
+            f"fills, {analyze_calls} analyze calls, P&L {pnl:.2f}"
+        )
+        return BacktestResult(
+            symbol=self.symbol,
+            initial_capital=self.initial_capital,
+            final_equity=final_equity,
+            pnl=pnl,
+            total_return=pnl / self.initial_capital,
+            max_drawdown=Decimal(str(max_drawdown)),
+            fees=Decimal(str(broker.fees)),
+            risk_metrics=risk_metrics,
+            trades=broker.trades,
+            bars=len(closes),
+            analyze_calls=analyze_calls,
+            timestamps=bars['timestamp'],
+            equity_curve=equity
+        )
@@ -0,0 +1,273 @@
+from decimal import Decimal
+import asyncio
+import inspect
+import logging
+import math
+import mmap
+import struct
+import time
+import numpy as np
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+MAGIC = b'TCAP\x01\x00\x00\x00'
+
+# Record kinds
+SYMBOL = 0
+TICKER = 1
+BOOK_SNAPSHOT = 2
+BOOK_DIFF = 3
+FILL = 4
+
+RECORD = struct.Struct('<BqH')      # kind, receive time (ns), symbol id
+NAME = struct.Struct('<H')          # length of a UTF-8 string that follows
+TICK = struct.Struct('<ddd')        # bid, ask, last (NaN when missing)
+BOOK = struct.Struct('<HH')         # bid levels, ask levels; (price, amount) pairs follow
+FILL_EVENT = struct.Struct('<BddH') # side (0 buy, 1 sell), price, amount, order id length
+
+
+def _float(value) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class CaptureWriter:
+    """Records live market events to a compact binary capture file.
+
+    Every record carries its receive time in nanoseconds so a replay
+    reproduces the gaps between events. Order books are stored as a
+    snapshot followed by diffs of the levels that changed.
+    """
+    def __init__(self, path: str, buffer_size: int = 1 << 16):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.file = open(path, 'ab', buffering=buffer_size)
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.symbol_ids: Dict[str, int] = {}
+        self.books: Dict[str, Tuple[Dict[float, float], Dict[float, float]]] = {}
+        self.events = 0
+
+    def _symbol(self, symbol: str, now: int) -> int:
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.symbol_ids[symbol] = len(self.symbol_ids)
+            name = symbol.encode('utf-8')
+            self.file.write(RECORD.pack(SYMBOL, now, symbol_id) + NAME.pack(len(name)) + name)
+        return symbol_id
+
+    def record_ticker(self, symbol: str, ticker: Dict):
+        now = time.time_ns()
+        symbol_id = self._symbol(symbol, now)
+        self.file.write(RECORD.pack(TICKER, now, symbol_id) + TICK.pack(
+            _float(ticker.get('bid')), _float(ticker.get('ask')), _float(ticker.get('last'))
+        ))
+        self.events += 1
+
+    def record_book(self, symbol: str, orderbook: Dict):
+        """Record a book update as the levels that changed since the last one"""
+        now = time.time_ns()
+        symbol_id = self._symbol(symbol, now)
+        bids = {float(p): float(a) for p, a, *_ in orderbook.get('bids', [])}
+        asks = {float(p): float(a) for p, a, *_ in orderbook.get('asks', [])}
+
+        previous = self.books.get(symbol)
+        self.books[symbol] = (bids, asks)
+        if previous is None:
+            kind, bid_levels, ask_levels = BOOK_SNAPSHOT, bids, asks
+        else:
+            kind = BOOK_DIFF
+            bid_levels = self._diff(previous[0], bids)
+            ask_levels = self._diff(previous[1], asks)
+            if not bid_levels and not ask_levels:
+                return
+
+        levels = np.array(
+            list(bid_levels.items()) + list(ask_levels.items()), dtype='<f8'
+        )
+        self.file.write(
+            RECORD.pack(kind, now, symbol_id) +
+            BOOK.pack(len(bid_levels), len(ask_levels)) +
+            levels.tobytes()
+        )
+        self.events += 1
+
+    @staticmethod
+    def _diff(old: Dict[float, float], new: Dict[float, float]) -> Dict[float, float]:
+        """Changed levels; a zero amount removes a level"""
+        changes = {p: a for p, a in new.items() if old.get(p) != a}
+        changes.update({p: 0.0 for p in old if p not in new})
+        return changes
+
+    def record_fill(self, order_id: str, symbol: str, side: str, price, amount):
+        now = time.time_ns()
+        symbol_id = self._symbol(symbol, now)
+        oid = str(order_id).encode('utf-8')
+        self.file.write(RECORD.pack(FILL, now, symbol_id) + FILL_EVENT.pack(
+            0 if side == 'buy' else 1, float(price), float(amount), len(oid)
+        ) + oid)
+        self.events += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        self.logger.info(f"Captured {self.events} events to {self.path}")
+
+
+class CaptureReplay:
+    """Feeds a capture file back through the live callbacks.
+
+    speed=1.0 replays at the recorded pace, 10.0 ten times faster and
+    None as fast as possible. Callbacks may be plain functions or
+    coroutines and get the same arguments as the live feed handlers:
+    on_ticker(symbol, ticker), on_book(symbol, orderbook) and
+    on_fill(symbol, fill), where fill holds order_id, side, price and
+    amount.
+    """
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+
+    def events(self) -> Iterator[Tuple[int, int, str, Dict]]:
+        """Decode (kind, receive time ns, symbol, payload) records in order"""
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{self.path} is not a capture file")
+            symbols: Dict[int, str] = {}
+            books: Dict[str, Tuple[Dict[float, float], Dict[float, float]]] = {}
+            offset = len(MAGIC)
+            end = len(data)
+
+            while offset + RECORD.size <= end:
+                try:
+                    kind, ts, symbol_id = RECORD.unpack_from(data, offset)
+                    offset += RECORD.size
+
+                    if kind == SYMBOL:
+                        (length,) = NAME.unpack_from(data, offset)
+                        offset += NAME.size
+                        if offset + length > end:
+                            break
+                        symbols[symbol_id] = data[offset:offset + length].decode('utf-8')
+                        offset += length
+                        continue
+
+                    symbol = symbols[symbol_id]
+                    if kind == TICKER:
+                        bid, ask, last = TICK.unpack_from(data, offset)
+                        offset += TICK.size
+                        payload = {
+                            'symbol': symbol, 'bid': _optional(bid),
+                            'ask': _optional(ask), 'last': _optional(last)
+                        }
+                    elif kind in (BOOK_SNAPSHOT, BOOK_DIFF):
+                        num_bids, num_asks = BOOK.unpack_from(data, offset)
+                        offset += BOOK.size
+                        size = (num_bids + num_asks) * 16
+                        if offset + size > end:
+                            break
+                        levels = np.frombuffer(
+                            data, dtype='<f8', count=(num_bids + num_asks) * 2, offset=offset
+                        ).reshape(-1, 2).tolist()
+                        offset += size
+                        payload = self._apply_book(
+                            books, symbol, kind, levels[:num_bids], levels[num_bids:]
+                        )
+                    elif kind == FILL:
+                        side, price, amount, length = FILL_EVENT.unpack_from(data, offset)
+                        offset += FILL_EVENT.size
+                        if offset + length > end:
+                            break
+                        payload = {
+                            'order_id': data[offset:offset + length].decode('utf-8'),
+                            'symbol': symbol,
+                            'side': 'buy' if side == 0 else 'sell',
+                            'price': Decimal(repr(price)),
+                            'amount': Decimal(repr(amount))
+                        }
+                        offset += length
+                    else:
+                        raise ValueError(f"Unknown record kind {kind} at byte {offset}")
+                except struct.error:
+                    break  # record cut short by a crash while capturing
+
+                yield kind, ts, symbol, payload
+
+    @staticmethod
+    def _apply_book(books, symbol, kind, bid_levels, ask_levels) -> Dict:
+        """Rebuild the full book a diff applies to"""
+        if kind == BOOK_SNAPSHOT or symbol not in books:
+            books[symbol] = ({}, {})
+        bids, asks = books[symbol]
+        for side, levels in ((bids, bid_levels), (asks, ask_levels)):
+            for price, amount in levels:
+                if amount:
+                    side[price] = amount
+                else:
+                    side.pop(price, None)
+        return {
+            'symbol': symbol,
+            'bids': [[p, bids[p]] for p in sorted(bids, reverse=True)],
+            'asks': [[p, asks[p]] for p in sorted(asks)]
+        }
+
+    async def replay(
+        self,
+        on_ticker: Optional[Callable] = None,
+        on_book: Optional[Callable] = None,
+        on_fill: Optional[Callable] = None,
+        speed: Optional[float] = 1.0
+    ) -> Dict:
+        """Replay every event and report how closely the pacing was kept"""
+        first_ts = None
+        started = time.perf_counter()
+        events = 0
+        max_lag = 0.0
+
+        for kind, ts, symbol, payload in self.events():
+            if first_ts is None:
+                first_ts = ts
+
+            if speed:
+                due = (ts - first_ts) / 1e9 / speed
+                ahead = due - (time.perf_counter() - started)
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+                else:
+                    max_lag = max(max_lag, -ahead)
+            else:
+                await asyncio.sleep(0)  # let tasks woken by the last event run
+
+            if kind == TICKER and on_ticker:
+                result = on_ticker(symbol, payload)
+            elif kind in (BOOK_SNAPSHOT, BOOK_DIFF) and on_book:
+                result = on_book(symbol, payload)
+            elif kind == FILL and on_fill:
+                result = on_fill(symbol, payload)
+            else:
+                result = None
+            if inspect.isawaitable(result):
+                await result
+            events += 1
+
+        elapsed = time.perf_counter() - started
+        self.logger.info(f"Replayed {events} events from {self.path} in {elapsed:.3f}s")
+        return {
+            'events': events,
+            'elapsed': elapsed,
+            'recorded_span': (ts - first_ts) / 1e9 if first_ts is not None else 0.0,
+            'max_lag': max_lag
+        }
+
+    async def replay_into(self, trading_system, speed: Optional[float] = 1.0) -> Dict:
+        """Replay through a TradingSystem's feed handlers"""
+        return await self.replay(
+            on_ticker=trading_system.on_ticker,
+            on_book=trading_system.on_orderbook,
+            on_fill=trading_system.on_fill,
+            speed=speed
+        )
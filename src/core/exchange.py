@@ -23,6 +23,7 @@ class Exchange:
         self.markets: Dict = {}
         self.orderbook_cache: Dict[str, Dict] = {}
         self.last_prices: Dict[str, Decimal] = {}
+        self.tickers: Dict[str, Tuple[Dict, float]] = {}  # ticker, receive time
         
     def _initialize_exchange(self) -> ccxt.Exchange:
         try:
@@ -59,6 +60,16 @@ class Exchange:
         except Exception as e:
             self.logger.error(f"Error closing exchange connection: {e}")
 
+    async def get_ticker(self, symbol: str) -> Dict:
+        """Get the current ticker for symbol"""
+        try:
+            ticker = await self.exchange.fetch_ticker(symbol)
+            self.tickers[symbol] = (ticker, datetime.now().timestamp())
+            return ticker
+        except Exception as e:
+            self.logger.error(f"Error fetching ticker for {symbol}: {e}")
+            raise
+
     async def get_orderbook(self, symbol: str, limit: int = 20) -> Dict:
         """Get real-time orderbook for symbol"""
         try:
@@ -71,7 +82,33 @@ class Exchange:
             return orderbook
         except Exception as e:
             self.logger.error(f"Error fetching orderbook for {symbol}: {e}")
-            return self.orderbook_cache.get(symbol, {})
+            raise
+
+    async def get_orderbooks(self, symbols: List[str], limit: int = 20) -> Dict[str, Dict]:
+        """Order books for many symbols, in a single request where supported.
+
+        Symbols whose book could not be fetched are left out.
+        """
+        if self.exchange.has.get('fetchOrderBooks'):
+            try:
+                books = await self.exchange.fetch_order_books(symbols, limit)
+                received = datetime.now().timestamp()
+                for symbol, book in books.items():
+                    self.orderbook_cache[symbol] = {
+                        'bids': book['bids'], 'asks': book['asks'], 'timestamp': received
+                    }
+                return books
+            except Exception as e:
+                self.logger.error(f"Error fetching order book batch: {e}")
+                return {}
+
+        books = await asyncio.gather(*[
+            self.get_orderbook(symbol, limit) for symbol in symbols
+        ], return_exceptions=True)
+        return {
+            symbol: book for symbol, book in zip(symbols, books)
+            if not isinstance(book, Exception)
+        }
 
     async def create_order(
         self,
@@ -98,6 +135,110 @@ class Exchange:
             self.logger.error(f"Error creating order: {e}")
             raise
 
+    async def create_orders(self, orders: List[Dict]) -> List[Optional[Dict]]:
+        """Create several orders, in a single request where supported.
+
+        Each entry holds symbol, type, side, amount and optional price.
+        Failed orders come back as None instead of failing the batch.
+        """
+        if self.exchange.has.get('createOrders'):
+            try:
+                created = await self.exchange.create_orders([
+                    {
+                        'symbol': order['symbol'],
+                        'type': order['type'],
+                        'side': order['side'],
+                        'amount': float(order['amount']),
+                        'price': float(order['price']) if order.get('price') else None,
+                        'params': order.get('params', {})
+                    }
+                    for order in orders
+                ])
+                self.logger.info(f"Created batch of {len(created)} orders")
+                return created
+            except Exception as e:
+                self.logger.error(f"Error creating order batch: {e}")
+                return [None] * len(orders)
+
+        results = await asyncio.gather(*[
+            self.create_order(
+                order['symbol'],
+                order['type'],
+                order['side'],
+                order['amount'],
+                order.get('price'),
+                order.get('params', {})
+            )
+            for order in orders
+        ], return_exceptions=True)
+        return [None if isinstance(r, Exception) else r for r in results]
+
+    async def fetch_order_by_client_id(
+        self,
+        client_order_id: str,
+        symbol: str
+    ) -> Optional[Dict]:
+        """Look up an order by the client order id it was sent with.
+
+        Returns None when the venue has no such order; any other error is
+        raised, since the order's state is then unknown.
+        """
+        try:
+            return await self.exchange.fetch_order(
+                None, symbol, {'clientOrderId': client_order_id}
+            )
+        except ccxt.OrderNotFound:
+            return None
+        except (ccxt.NotSupported, ccxt.ArgumentsRequired):
+            orders = await self.exchange.fetch_orders(symbol, limit=50)
+            return next(
+                (o for o in orders if o.get('clientOrderId') == client_order_id),
+                None
+            )
+
+    async def cancel_orders(self, order_ids: List[str], symbol: str) -> bool:
+        """Cancel several orders on a symbol, in a single request where supported"""
+        if self.exchange.has.get('cancelOrders'):
+            try:
+                await self.exchange.cancel_orders(order_ids, symbol)
+                self.logger.info(f"Cancelled {len(order_ids)} orders for {symbol}")
+                return True
+            except Exception as e:
+                self.logger.error(f"Error cancelling order batch: {e}")
+                return False
+
+        results = await asyncio.gather(*[
+            self.cancel_order(order_id, symbol) for order_id in order_ids
+        ], return_exceptions=True)
+        return not any(isinstance(r, Exception) for r in results)
+
+    async def edit_order(
+        self,
+        order_id: str,
+        symbol: str,
+        order_type: str,
+        side: str,
+        amount: Decimal,
+        price: Optional[Decimal] = None,
+        params: Dict = {}
+    ) -> Dict:
+        """Amend an existing order in place where the exchange supports it"""
+        try:
+            order = await self.exchange.edit_order(
+                order_id,
+                symbol,
+                order_type,
+                side,
+                float(amount),
+                float(price) if price else None,
+                params
+            )
+            self.logger.info(f"Amended order {order_id} to {amount} {symbol} at {price}")
+            return order
+        except Exception as e:
+            self.logger.error(f"Error amending order: {e}")
+            raise
+
     async def cancel_order(self, order_id: str, symbol: str) -> Dict:
         """Cancel an existing order"""
         try:
@@ -137,26 +278,35 @@ class Exchange:
         self,
         symbol: str,
         timeframe: str = '1m',
-        limit: int = 100
+        limit: int = 100,
+        since: Optional[int] = None
     ) -> List[List]:
         """Get OHLCV candle data"""
         try:
-            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            ohlcv = await self.exchange.fetch_ohlcv(
+                symbol, timeframe, since=since, limit=limit
+            )
             return ohlcv
         except Exception as e:
             self.logger.error(f"Error fetching OHLCV data: {e}")
             return []
 
-    async def update_prices(self, symbols: List[str]):
-        """Update last prices for multiple symbols"""
+    async def update_prices(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Update last prices for multiple symbols and return the tickers"""
         try:
             tickers = await self.exchange.fetch_tickers(symbols)
+            received = datetime.now().timestamp()
             self.last_prices.update({
                 symbol: Decimal(str(ticker['last']))
                 for symbol, ticker in tickers.items()
             })
+            self.tickers.update({
+                symbol: (ticker, received) for symbol, ticker in tickers.items()
+            })
+            return tickers
         except Exception as e:
             self.logger.error(f"Error updating prices: {e}")
+            return {}
 
     def get_market_info(self, symbol: str) -> Dict:
         """Get market information for symbol"""
@@ -0,0 +1,347 @@
+import logging
+import os
+import shutil
+import time
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from datetime import datetime, timezone
+
+MS_PER_DAY = 86_400_000
+TIMEFRAME_UNITS = {'m': 60_000, 'h': 3_600_000, 'd': MS_PER_DAY, 'w': 7 * MS_PER_DAY}
+
+CANDLE_SCHEMA: Tuple[Tuple[str, type], ...] = (
+    ('timestamp', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64)
+)
+TRADE_SCHEMA: Tuple[Tuple[str, type], ...] = (
+    ('timestamp', np.int64),
+    ('price', np.float64),
+    ('amount', np.float64),
+    ('side', np.int8)  # 1 buy, -1 sell
+)
+
+
+def timeframe_ms(timeframe: str) -> int:
+    """Length of a ccxt timeframe string ('1m', '4h', '1d') in milliseconds"""
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS[timeframe[-1]]
+
+
+def to_ms(value: Union[int, float, datetime]) -> int:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+class HistoricalStore:
+    """Columnar on-disk history of candles and trades.
+
+    Data lives under root/<dataset>/<symbol>/<YYYY-MM-DD>/<column>.bin,
+    one raw little-endian array per column, so a day is read with one
+    np.memmap per column and sliced without copying. Within a day rows
+    are sorted by timestamp; live feeds only ever append to the newest
+    day, while backfill merges and rewrites whole days.
+    """
+    def __init__(self, root: str):
+        self.logger = logging.getLogger(__name__)
+        self.root = root
+        self._maps: Dict[str, Tuple[int, Dict[str, np.ndarray]]] = {}
+
+    # Layout
+
+    def _symbol_dir(self, dataset: str, symbol: str) -> str:
+        return os.path.join(self.root, dataset, symbol.replace('/', '-'))
+
+    def _partition(self, dataset: str, symbol: str, day: int) -> str:
+        date = datetime.fromtimestamp(day * 86_400, timezone.utc).strftime('%Y-%m-%d')
+        return os.path.join(self._symbol_dir(dataset, symbol), date)
+
+    def _days(self, dataset: str, symbol: str) -> List[int]:
+        """Days with data, as days since the epoch.
+
+        Anything that is not a day partition, such as staging directories
+        left by an interrupted rewrite, is ignored.
+        """
+        path = self._symbol_dir(dataset, symbol)
+        if not os.path.isdir(path):
+            return []
+        days = []
+        for name in os.listdir(path):
+            try:
+                date = datetime.strptime(name, '%Y-%m-%d')
+            except ValueError:
+                continue
+            days.append(int(date.replace(tzinfo=timezone.utc).timestamp()) // 86_400)
+        return sorted(days)
+
+    @staticmethod
+    def _length(path: str, schema) -> int:
+        """Rows fully written to every column of a partition"""
+        lengths = []
+        for name, dtype in schema:
+            file = os.path.join(path, f"{name}.bin")
+            size = os.path.getsize(file) if os.path.exists(file) else 0
+            lengths.append(size // np.dtype(dtype).itemsize)
+        return min(lengths)
+
+    def _open(self, path: str, schema) -> Dict[str, np.ndarray]:
+        """Memory-map a partition, reusing the maps until it grows"""
+        length = self._length(path, schema)
+        cached = self._maps.get(path)
+        if cached and cached[0] == length:
+            return cached[1]
+
+        columns = {}
+        for name, dtype in schema:
+            if length:
+                columns[name] = np.memmap(
+                    os.path.join(path, f"{name}.bin"), dtype=dtype,
+                    mode='r', shape=(length,)
+                )
+            else:
+                columns[name] = np.empty(0, dtype=dtype)
+        self._maps[path] = (length, columns)
+        return columns
+
+    # Writing
+
+    def _append(self, dataset: str, symbol: str, schema, columns: Dict[str, np.ndarray], strict: bool) -> int:
+        """Append rows newer than what each day already holds.
+
+        Without strict, rows at the last stored timestamp are kept unless
+        an identical row is already stored there, so a redelivered batch
+        does not duplicate its boundary rows.
+        """
+        if not len(columns['timestamp']):
+            return 0
+        order = np.argsort(columns['timestamp'], kind='stable')
+        columns = {name: np.asarray(columns[name])[order] for name, _ in schema}
+        days = columns['timestamp'] // MS_PER_DAY
+
+        written = 0
+        for day in np.unique(days):
+            in_day = days == day
+            path = self._partition(dataset, symbol, int(day))
+            os.makedirs(path, exist_ok=True)
+            length = self._repair(path, schema)
+
+            if length:
+                stored = self._open(path, schema)
+                last = stored['timestamp'][-1]
+                ts = columns['timestamp']
+                in_day &= (ts > last) if strict else (ts >= last)
+                if not strict:
+                    boundary = np.nonzero(in_day & (ts == last))[0]
+                    in_day[self._already_stored(stored, columns, boundary, schema)] = False
+
+            if not in_day.any():
+                continue
+            for name, dtype in schema:
+                with open(os.path.join(path, f"{name}.bin"), 'ab') as f:
+                    f.write(columns[name][in_day].astype(dtype).tobytes())
+            written += int(in_day.sum())
+        return written
+
+    @staticmethod
+    def _already_stored(stored, columns, rows: np.ndarray, schema) -> List[int]:
+        """Rows that repeat a stored row at the last stored timestamp"""
+        if not len(rows):
+            return []
+        first = int(np.searchsorted(stored['timestamp'], stored['timestamp'][-1]))
+        counts: Dict[tuple, int] = {}
+        for i in range(first, len(stored['timestamp'])):
+            key = tuple(stored[name][i].item() for name, _ in schema)
+            counts[key] = counts.get(key, 0) + 1
+
+        repeated = []
+        for i in rows:
+            key = tuple(np.asarray(columns[name][i]).astype(dtype).item() for name, dtype in schema)
+            if counts.get(key):
+                counts[key] -= 1
+                repeated.append(int(i))
+        return repeated
+
+    def _repair(self, path: str, schema) -> int:
+        """Cut columns back to their common length after an interrupted append"""
+        length = self._length(path, schema)
+        for name, dtype in schema:
+            file = os.path.join(path, f"{name}.bin")
+            size = length * np.dtype(dtype).itemsize
+            if os.path.exists(file) and os.path.getsize(file) != size:
+                os.truncate(file, size)
+        return length
+
+    def _merge(self, dataset: str, symbol: str, schema, columns: Dict[str, np.ndarray], unique: bool) -> int:
+        """Merge rows into their days, rewriting each touched day"""
+        if not len(columns['timestamp']):
+            return 0
+        days = np.asarray(columns['timestamp']) // MS_PER_DAY
+
+        written = 0
+        for day in np.unique(days):
+            in_day = days == day
+            path = self._partition(dataset, symbol, int(day))
+            existing = (
+                self._open(path, schema) if os.path.isdir(path)
+                else {name: np.empty(0, dtype) for name, dtype in schema}
+            )
+            # New rows first so they win when de-duplicating timestamps
+            merged = {
+                name: np.concatenate((
+                    np.asarray(columns[name])[in_day].astype(dtype), existing[name]
+                ))
+                for name, dtype in schema
+            }
+            if unique:
+                _, keep = np.unique(merged['timestamp'], return_index=True)
+            else:
+                keep = np.argsort(merged['timestamp'], kind='stable')
+            written += len(keep) - len(existing['timestamp'])
+            self._write_partition(path, schema, {k: v[keep] for k, v in merged.items()})
+        return written
+
+    def _write_partition(self, path: str, schema, columns: Dict[str, np.ndarray]):
+        """Replace a partition so readers never see a half-written day"""
+        parent, day = os.path.split(path)
+        staging = os.path.join(parent, f".{day}.{os.getpid()}.{time.monotonic_ns()}")
+        os.makedirs(staging)
+        for name, dtype in schema:
+            columns[name].astype(dtype).tofile(os.path.join(staging, f"{name}.bin"))
+
+        self._maps.pop(path, None)
+        if os.path.isdir(path):
+            retired = f"{staging}.old"
+            os.replace(path, retired)
+            os.replace(staging, path)
+            shutil.rmtree(retired)
+        else:
+            os.replace(staging, path)
+
+    # Reading
+
+    def _read(self, dataset: str, symbol: str, schema, start, end) -> Dict[str, np.ndarray]:
+        """Rows with start <= timestamp < end.
+
+        A range inside one day is returned as read-only memmap views;
+        ranges spanning days are concatenated.
+        """
+        start, end = to_ms(start), to_ms(end)
+        pieces = []
+        for day in self._days(dataset, symbol):
+            if day < start // MS_PER_DAY or day > (end - 1) // MS_PER_DAY:
+                continue
+            columns = self._open(self._partition(dataset, symbol, day), schema)
+            ts = columns['timestamp']
+            lo, hi = np.searchsorted(ts, start), np.searchsorted(ts, end)
+            if hi > lo:
+                pieces.append({name: values[lo:hi] for name, values in columns.items()})
+
+        if not pieces:
+            return {name: np.empty(0, dtype) for name, dtype in schema}
+        if len(pieces) == 1:
+            return pieces[0]
+        return {
+            name: np.concatenate([piece[name] for piece in pieces])
+            for name, _ in schema
+        }
+
+    def _coverage(self, dataset: str, symbol: str, schema) -> Optional[Tuple[int, int]]:
+        days = self._days(dataset, symbol)
+        if not days:
+            return None
+        first = self._open(self._partition(dataset, symbol, days[0]), schema)['timestamp']
+        last = self._open(self._partition(dataset, symbol, days[-1]), schema)['timestamp']
+        if not len(first) or not len(last):
+            return None
+        return int(first[0]), int(last[-1])
+
+    # Candles
+
+    @staticmethod
+    def _candle_columns(ohlcv: Sequence) -> Dict[str, np.ndarray]:
+        rows = np.asarray(ohlcv, dtype=float).reshape(-1, 6)
+        return {
+            'timestamp': rows[:, 0].astype(np.int64),
+            'open': rows[:, 1],
+            'high': rows[:, 2],
+            'low': rows[:, 3],
+            'close': rows[:, 4],
+            'volume': rows[:, 5]
+        }
+
+    def append_candles(self, symbol: str, timeframe: str, ohlcv: Sequence) -> int:
+        """Append closed candles from a live feed; older or repeated ones are skipped"""
+        return self._append(
+            f"candles/{timeframe}", symbol, CANDLE_SCHEMA,
+            self._candle_columns(ohlcv), strict=True
+        )
+
+    def write_candles(self, symbol: str, timeframe: str, ohlcv: Sequence) -> int:
+        """Bulk-load candles anywhere in time, replacing any with the same timestamp"""
+        return self._merge(
+            f"candles/{timeframe}", symbol, CANDLE_SCHEMA,
+            self._candle_columns(ohlcv), unique=True
+        )
+
+    def read_candles(self, symbol: str, timeframe: str, start, end) -> Dict[str, np.ndarray]:
+        """Candle columns for start <= timestamp < end"""
+        return self._read(f"candles/{timeframe}", symbol, CANDLE_SCHEMA, start, end)
+
+    def get_ohlcv(self, symbol: str, timeframe: str, start, end) -> np.ndarray:
+        """Candles as [ts_ms, o, h, l, c, v] rows, like Exchange.get_ohlcv"""
+        columns = self.read_candles(symbol, timeframe, start, end)
+        return np.column_stack([columns[name] for name, _ in CANDLE_SCHEMA])
+
+    def candle_coverage(self, symbol: str, timeframe: str) -> Optional[Tuple[int, int]]:
+        """First and last stored candle timestamps"""
+        return self._coverage(f"candles/{timeframe}", symbol, CANDLE_SCHEMA)
+
+    async def backfill_candles(
+        self,
+        exchange,
+        symbol: str,
+        timeframe: str,
+        since,
+        until=None,
+        batch: int = 1000
+    ) -> int:
+        """Page candles in from the exchange; the still-open candle is skipped"""
+        step = timeframe_ms(timeframe)
+        since = to_ms(since)
+        closed_before = int(time.time() * 1000) // step * step
+        until = min(to_ms(until), closed_before) if until is not None else closed_before
+
+        written = 0
+        while since < until:
+            ohlcv = await exchange.get_ohlcv(symbol, timeframe, limit=batch, since=since)
+            candles = [c for c in ohlcv if since <= c[0] < until]
+            if not candles:
+                break
+            written += self.write_candles(symbol, timeframe, candles)
+            since = int(candles[-1][0]) + step
+
+        self.logger.info(f"Backfilled {written} {timeframe} candles for {symbol}")
+        return written
+
+    # Trades
+
+    def append_trades(self, symbol: str, trades: List[Dict]) -> int:
+        """Append trades from a live feed (ccxt trade dicts)"""
+        return self._append("trades", symbol, TRADE_SCHEMA, {
+            'timestamp': np.array([t['timestamp'] for t in trades], dtype=np.int64),
+            'price': np.array([float(t['price']) for t in trades]),
+            'amount': np.array([float(t['amount']) for t in trades]),
+            'side': np.array([1 if t.get('side') == 'buy' else -1 for t in trades], dtype=np.int8)
+        }, strict=False)
+
+    def read_trades(self, symbol: str, start, end) -> Dict[str, np.ndarray]:
+        """Trade columns for start <= timestamp < end"""
+        return self._read("trades", symbol, TRADE_SCHEMA, start, end)
+
+    def trade_coverage(self, symbol: str) -> Optional[Tuple[int, int]]:
+        return self._coverage("trades", symbol, TRADE_SCHEMA)
@@ -0,0 +1,373 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+import logging
+import math
+import numpy as np
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .history import timeframe_ms
+
+@dataclass
+class Bar:
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+
+
+def smooth(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """Vectorized y[i] = (1 - alpha) * y[i-1] + alpha * x[i], y[-1] = initial.
+
+    Within a block the recursion has a closed form using a cumulative
+    sum; blocks are sized so the decay factors stay well inside float
+    range and chained through their last value.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.empty_like(values)
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+
+    block = max(1, min(4096, int(13.8 / -math.log(decay))))  # decay**-block <= 1e6
+    powers = decay ** np.arange(block + 1)
+    previous = initial
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        m = len(chunk)
+        scaled = np.cumsum(chunk / powers[:m])
+        out[start:start + m] = powers[1:m + 1] * previous + alpha * powers[:m] * scaled
+        previous = out[start + m - 1]
+    return out
+
+
+def _wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing seeded with the simple mean of the first period values"""
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    seed = values[:period].mean()
+    out[period - 1] = seed
+    out[period:] = smooth(values[period:], 1.0 / period, seed)
+    return out
+
+
+class Indicator(ABC):
+    """Streaming indicator; update() is O(1) per bar.
+
+    batch() computes the same values over whole column arrays (as
+    produced by BacktestEngine.to_columns), NaN where update() would
+    still return None.
+    """
+    def __init__(self):
+        self.value = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    @abstractmethod
+    def update(self, bar: Bar):
+        pass
+
+    @abstractmethod
+    def batch(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        pass
+
+class EMA(Indicator):
+    """Exponential moving average of closes, seeded with the first close"""
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+
+    def update(self, bar: Bar) -> float:
+        if self.value is None:
+            self.value = bar.close
+        else:
+            self.value += self.alpha * (bar.close - self.value)
+        return self.value
+
+    def batch(self, columns):
+        close = np.asarray(columns['close'], dtype=float)
+        if not len(close):
+            return close
+        return smooth(close, self.alpha, close[0])
+
+class ATR(Indicator):
+    """Average true range with Wilder smoothing"""
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.warmup: List[float] = []
+
+    def update(self, bar: Bar) -> Optional[float]:
+        if self.prev_close is None:
+            true_range = bar.high - bar.low
+        else:
+            true_range = max(
+                bar.high - bar.low,
+                abs(bar.high - self.prev_close),
+                abs(bar.low - self.prev_close)
+            )
+        self.prev_close = bar.close
+
+        if self.value is None:
+            self.warmup.append(true_range)
+            if len(self.warmup) == self.period:
+                self.value = sum(self.warmup) / self.period
+                self.warmup = []
+        else:
+            self.value += (true_range - self.value) / self.period
+        return self.value
+
+    def batch(self, columns):
+        high = np.asarray(columns['high'], dtype=float)
+        low = np.asarray(columns['low'], dtype=float)
+        close = np.asarray(columns['close'], dtype=float)
+        true_range = high - low
+        if len(close) > 1:
+            prev_close = close[:-1]
+            true_range[1:] = np.maximum.reduce([
+                true_range[1:],
+                np.abs(high[1:] - prev_close),
+                np.abs(low[1:] - prev_close)
+            ])
+        return _wilder(true_range, self.period)
+
+class RSI(Indicator):
+    """Relative strength index with Wilder smoothing"""
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+        self.warmup: List[Tuple[float, float]] = []
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def update(self, bar: Bar) -> Optional[float]:
+        if self.prev_close is None:
+            self.prev_close = bar.close
+            return None
+        change = bar.close - self.prev_close
+        self.prev_close = bar.close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+
+        if self.avg_gain is None:
+            self.warmup.append((gain, loss))
+            if len(self.warmup) < self.period:
+                return None
+            self.avg_gain = sum(g for g, _ in self.warmup) / self.period
+            self.avg_loss = sum(l for _, l in self.warmup) / self.period
+            self.warmup = []
+        else:
+            self.avg_gain += (gain - self.avg_gain) / self.period
+            self.avg_loss += (loss - self.avg_loss) / self.period
+
+        self.value = self._rsi(self.avg_gain, self.avg_loss)
+        return self.value
+
+    def batch(self, columns):
+        close = np.asarray(columns['close'], dtype=float)
+        out = np.full(len(close), np.nan)
+        change = np.diff(close)
+        avg_gain = _wilder(np.maximum(change, 0.0), self.period)
+        avg_loss = _wilder(np.maximum(-change, 0.0), self.period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(
+                avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            )
+        out[1:] = np.where(np.isnan(avg_gain), np.nan, rsi)
+        return out
+
+class _Rolling(Indicator):
+    """Fixed window of recent bars with running sums"""
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self.window: Deque[Tuple[float, ...]] = deque()
+        self.sums: Optional[List[float]] = None
+
+    def _push(self, *values: float):
+        if self.sums is None:
+            self.sums = [0.0] * len(values)
+        self.window.append(values)
+        for i, v in enumerate(values):
+            self.sums[i] += v
+        if len(self.window) > self.period:
+            for i, v in enumerate(self.window.popleft()):
+                self.sums[i] -= v
+        return len(self.window) == self.period
+
+    def _rolling_sum(self, values: np.ndarray) -> np.ndarray:
+        """Sum over each trailing window, NaN until the window is full"""
+        out = np.full(len(values), np.nan)
+        if len(values) >= self.period:
+            total = np.concatenate(([0.0], np.cumsum(values)))
+            out[self.period - 1:] = total[self.period:] - total[:-self.period]
+        return out
+
+class BollingerBands(_Rolling):
+    """Middle, upper and lower bands over a window of closes"""
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        super().__init__(period)
+        self.num_std = num_std
+        self.shift: Optional[float] = None
+
+    def _bands(self, mean_shifted: float, mean_square: float) -> Tuple[float, float, float]:
+        std = math.sqrt(max(mean_square - mean_shifted ** 2, 0.0))
+        middle = self.shift + mean_shifted
+        return middle, middle + self.num_std * std, middle - self.num_std * std
+
+    def update(self, bar: Bar) -> Optional[Tuple[float, float, float]]:
+        # Sums are kept around the first close to limit cancellation
+        if self.shift is None:
+            self.shift = bar.close
+        x = bar.close - self.shift
+        if self._push(x, x * x):
+            self.value = self._bands(
+                self.sums[0] / self.period, self.sums[1] / self.period
+            )
+        return self.value
+
+    def batch(self, columns):
+        close = np.asarray(columns['close'], dtype=float)
+        out = np.full((len(close), 3), np.nan)
+        if not len(close):
+            return out
+        shift = close[0]
+        x = close - shift
+        mean = self._rolling_sum(x) / self.period
+        mean_square = self._rolling_sum(x * x) / self.period
+        std = np.sqrt(np.maximum(mean_square - mean ** 2, 0.0))
+        middle = shift + mean
+        out[:, 0] = middle
+        out[:, 1] = middle + self.num_std * std
+        out[:, 2] = middle - self.num_std * std
+        return out
+
+class RollingVWAP(_Rolling):
+    """Volume-weighted typical price over a window of bars"""
+    def update(self, bar: Bar) -> Optional[float]:
+        typical = (bar.high + bar.low + bar.close) / 3
+        if self._push(typical * bar.volume, bar.volume):
+            self.value = self.sums[0] / self.sums[1] if self.sums[1] > 0 else None
+        return self.value
+
+    def batch(self, columns):
+        typical = (
+            np.asarray(columns['high'], dtype=float) +
+            np.asarray(columns['low'], dtype=float) +
+            np.asarray(columns['close'], dtype=float)
+        ) / 3
+        volume = np.asarray(columns['volume'], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap = self._rolling_sum(typical * volume) / self._rolling_sum(volume)
+        return np.where(np.isfinite(vwap), vwap, np.nan)
+
+INDICATORS = {
+    'ema': EMA,
+    'atr': ATR,
+    'rsi': RSI,
+    'bollinger': BollingerBands,
+    'vwap': RollingVWAP
+}
+
+class IndicatorSet:
+    """Indicators of one symbol and timeframe, updated together once per bar"""
+    def __init__(self, history: int = 1000):
+        self.indicators: Dict[Tuple, Indicator] = {}
+        self.bars: Deque[Bar] = deque(maxlen=history)
+
+    def get(self, name: str, **params) -> Indicator:
+        key = (name, tuple(sorted(params.items())))
+        indicator = self.indicators.get(key)
+        if indicator is None:
+            indicator = self.indicators[key] = INDICATORS[name](**params)
+            # Catch a late subscriber up on the bars already seen
+            for bar in self.bars:
+                indicator.update(bar)
+        return indicator
+
+    def update(self, bar: Bar):
+        self.bars.append(bar)
+        for indicator in self.indicators.values():
+            indicator.update(bar)
+
+class _BarBuilder:
+    """Aggregates ticks into bars of a fixed timeframe"""
+    def __init__(self, timeframe: str):
+        self.step = timeframe_ms(timeframe)
+        self.bar: Optional[Bar] = None
+
+    def on_tick(self, timestamp: int, price: float, amount: float) -> Optional[Bar]:
+        start = timestamp // self.step * self.step
+        bar = self.bar
+        if bar is not None and bar.timestamp == start:
+            bar.high = max(bar.high, price)
+            bar.low = min(bar.low, price)
+            bar.close = price
+            bar.volume += amount
+            return None
+        self.bar = Bar(start, price, price, price, price, amount)
+        return bar
+
+class IndicatorRegistry:
+    """Shares indicator state between strategies on a symbol and timeframe.
+
+    Two strategies asking for an EMA(20) of BTC/USDT 1m get the same
+    object, so it is updated once per bar however many strategies read
+    it. Bars come from on_bar() directly or are built from on_tick().
+    """
+    def __init__(self, history: int = 1000):
+        self.logger = logging.getLogger(__name__)
+        self.history = history
+        self.sets: Dict[Tuple[str, str], IndicatorSet] = {}
+        self.builders: Dict[str, Dict[str, _BarBuilder]] = {}
+
+    def _set(self, symbol: str, timeframe: str) -> IndicatorSet:
+        key = (symbol, timeframe)
+        if key not in self.sets:
+            self.sets[key] = IndicatorSet(self.history)
+            self.builders.setdefault(symbol, {})[timeframe] = _BarBuilder(timeframe)
+        return self.sets[key]
+
+    def get(self, symbol: str, timeframe: str, name: str, **params) -> Indicator:
+        """Shared indicator for a symbol and timeframe"""
+        return self._set(symbol, timeframe).get(name, **params)
+
+    def on_bar(self, symbol: str, timeframe: str, bar: Bar):
+        self._set(symbol, timeframe).update(bar)
+
+    def on_tick(
+        self,
+        symbol: str,
+        price: float,
+        amount: float = 0.0,
+        timestamp: Optional[int] = None
+    ):
+        """Feed a trade or ticker; indicators update when a bar closes"""
+        builders = self.builders.get(symbol)
+        if not builders or price is None:
+            return
+        if timestamp is None:
+            timestamp = int(np.datetime64('now', 'ms').astype(np.int64))
+        for timeframe, builder in builders.items():
+            closed = builder.on_tick(timestamp, float(price), float(amount))
+            if closed:
+                self.sets[(symbol, timeframe)].update(closed)
+
+    def warm_up(self, symbol: str, timeframe: str, ohlcv: List[List]):
+        """Prime a symbol and timeframe from historical candles"""
+        for row in ohlcv:
+            self.on_bar(symbol, timeframe, Bar(int(row[0]), *[float(v) for v in row[1:6]]))
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+TOPICS = ('ticker', 'book')
+
+class MarketDataFeed:
+    """Polls tickers and order books for the symbols something watches.
+
+    Components register interest per topic ('ticker' or 'book') and
+    symbol. Each symbol is fetched once per poll however many watchers
+    it has: tickers in one request, books in one request on venues that
+    support fetchOrderBooks. The results go through TradingSystem.on_ticker
+    and on_orderbook like any streamed update. Polling starts with the
+    first watch and ends once nothing is watched.
+    """
+    def __init__(self, trading_system, poll_interval: float = 1.0, book_depth: int = 20):
+        self.trading_system = trading_system
+        self.logger = logging.getLogger(__name__)
+        self.poll_interval = poll_interval
+        self.book_depth = book_depth
+        self.interest: Dict[str, Dict[str, int]] = {topic: {} for topic in TOPICS}
+        self._task: Optional[asyncio.Task] = None
+
+    def watch(self, topic: str, symbol: str):
+        """Register interest in a symbol's tickers or books"""
+        if topic not in self.interest:
+            raise ValueError(f"Unknown market data topic: {topic}")
+        watched = self.interest[topic]
+        watched[symbol] = watched.get(symbol, 0) + 1
+        self._ensure_running()
+
+    def unwatch(self, topic: str, symbol: str):
+        """Drop one registration; the symbol is polled until the last is gone"""
+        watched = self.interest.get(topic, {})
+        if symbol not in watched:
+            return
+        watched[symbol] -= 1
+        if watched[symbol] <= 0:
+            del watched[symbol]
+
+    def watched(self, topic: str) -> List[str]:
+        return list(self.interest.get(topic, ()))
+
+    def _ensure_running(self):
+        if self._task and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop yet; the next watch inside one starts polling
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while any(self.interest.values()):
+            try:
+                await self.poll()
+            except Exception as e:
+                self.logger.error(f"Error polling market data: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll(self):
+        """Fetch every watched ticker and book once"""
+        exchange = self.trading_system.exchange
+        symbols = self.watched('ticker')
+        if symbols:
+            tickers = await exchange.update_prices(symbols)
+            for symbol, ticker in tickers.items():
+                self.trading_system.on_ticker(symbol, ticker)
+
+        symbols = self.watched('book')
+        if symbols:
+            books = await exchange.get_orderbooks(symbols, self.book_depth)
+            for symbol, book in books.items():
+                if book.get('bids') is not None and book.get('asks') is not None:
+                    self.trading_system.on_orderbook(symbol, book)
+
+    async def stop(self):
+        for topic in self.interest:
+            self.interest[topic].clear()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -23,6 +23,7 @@ class Portfolio:
         self.total_pnl = Decimal('0')
         self.max_drawdown = Decimal('0')
         self.peak_value = initial_balance
+        self.version = 0  # bumped on every change, for cached snapshots
 
     def update_position(
         self,
@@ -33,6 +34,7 @@ class Portfolio:
     ) -> Position:
         """Update or create a position"""
         try:
+            self.version += 1
             if symbol in self.positions:
                 current_pos = self.positions[symbol]
                 new_amount = current_pos.amount + amount
@@ -97,6 +99,8 @@ class Portfolio:
             for symbol, position in self.positions.items():
                 if symbol in prices:
                     current_price = prices[symbol]
+                    if current_price != position.current_price:
+                        self.version += 1
                     position.current_price = current_price
                     position.unrealized_pnl = (
                         current_price - position.entry_price
@@ -149,6 +153,7 @@ class Portfolio:
     def record_trade(self, trade: Dict) -> None:
         """Record a trade in history"""
         try:
+            self.version += 1
             self.trades_history.append({
                 **trade,
                 'portfolio_value': self.get_total_value(),
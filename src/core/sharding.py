@@ -0,0 +1,410 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+import asyncio
+import hashlib
+import logging
+import multiprocessing as mp
+import queue
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from .exchange import ExchangeConfig
+
+
+@dataclass
+class ShardState:
+    shard_id: int
+    capital: Decimal = Decimal('0')
+    symbols: List[str] = field(default_factory=list)
+    active_orders: Dict[str, Dict] = field(default_factory=dict)
+    portfolio: Dict = field(default_factory=dict)
+    positions: Dict[str, Dict] = field(default_factory=dict)
+    risk: Optional[Dict] = None
+    restarts: int = 0
+    generation: int = 0  # bumped on every rebalance; older reports are stale
+    last_report: Optional[datetime] = None
+
+
+def _shard_weight(symbol: str, shard_id: int) -> int:
+    """Rendezvous hash weight of a symbol on a shard"""
+    digest = hashlib.blake2b(
+        f"{shard_id}:{symbol}".encode('utf-8'), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def assign_symbols(symbols: List[str], num_shards: int) -> Dict[int, List[str]]:
+    """Assign symbols to shards with rendezvous hashing.
+
+    Adding or removing a symbol only touches the shard that owns it, so
+    a rebalance never moves symbols between unaffected workers.
+    """
+    assignment: Dict[int, List[str]] = {i: [] for i in range(num_shards)}
+    for symbol in sorted(set(symbols)):
+        shard_id = max(
+            range(num_shards), key=lambda i: _shard_weight(symbol, i)
+        )
+        assignment[shard_id].append(symbol)
+    return assignment
+
+
+async def _run_shard(
+    shard_id: int,
+    exchange_config: ExchangeConfig,
+    capital: Decimal,
+    symbols: List[str],
+    active_orders: Dict[str, Dict],
+    command_queue,
+    result_queue,
+    report_interval: float,
+    generation: int = 0
+):
+    """Event loop of a single shard worker"""
+    # Imported here so the coordinator process never builds a TradingSystem
+    from .trading import TradingSystem
+
+    logger = logging.getLogger(__name__)
+    trading_system = TradingSystem(exchange_config, capital)
+    if not await trading_system.initialize():
+        raise RuntimeError(f"Shard {shard_id} failed to initialize")
+
+    # Re-adopt orders placed by a previous incarnation of this shard
+    trading_system.active_orders.update(active_orders)
+    await trading_system.start_trading(symbols)
+
+    try:
+        while True:
+            try:
+                command = command_queue.get_nowait()
+            except queue.Empty:
+                command = None
+
+            if command is not None:
+                if command['type'] == 'stop':
+                    break
+                if command['type'] == 'set_symbols':
+                    new_symbols = set(command['symbols'])
+                    removed = set(command['removed'])
+                    for order_id, order in list(
+                        trading_system.active_orders.items()
+                    ):
+                        if order['symbol'] in removed:
+                            await trading_system.cancel_order(
+                                order_id, order['symbol']
+                            )
+                        elif order['symbol'] not in new_symbols:
+                            # Handed to another shard along with its symbol
+                            del trading_system.active_orders[order_id]
+                    trading_system.active_orders.update(command['orders'])
+                    trading_system.symbols = sorted(new_symbols)
+                    generation = command['generation']
+                    logger.info(
+                        f"Shard {shard_id} now trading {trading_system.symbols}"
+                    )
+                continue
+
+            risk = trading_system.risk_manager.get_latest_metrics()
+            result_queue.put({
+                'shard_id': shard_id,
+                'generation': generation,
+                'active_orders': dict(trading_system.active_orders),
+                'portfolio': trading_system.portfolio.get_metrics(),
+                'positions': trading_system.portfolio.get_position_summary(),
+                'risk': risk.__dict__ if risk else None,
+                'timestamp': datetime.now()
+            })
+            await asyncio.sleep(report_interval)
+    finally:
+        await trading_system.stop_trading()
+        await trading_system.shutdown()
+
+
+def _shard_worker_main(
+    shard_id: int,
+    exchange_config: ExchangeConfig,
+    capital: Decimal,
+    symbols: List[str],
+    active_orders: Dict[str, Dict],
+    command_queue,
+    result_queue,
+    report_interval: float,
+    generation: int = 0
+):
+    """Process entry point for a shard worker"""
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_shard(
+        shard_id, exchange_config, capital, symbols, active_orders,
+        command_queue, result_queue, report_interval, generation
+    ))
+
+
+def allocate_capital(
+    initial_balance: Decimal,
+    num_shards: int,
+    allocation: Optional[Dict[int, Decimal]] = None
+) -> Dict[int, Decimal]:
+    """Capital per shard: the explicit allocation, or an even split.
+
+    Each shard's TradingSystem sizes risk limits from its own capital,
+    so the shares must add up to initial_balance rather than repeat it.
+    """
+    if allocation is None:
+        share = initial_balance / num_shards
+        return {i: share for i in range(num_shards)}
+
+    unknown = set(allocation) - set(range(num_shards))
+    if unknown:
+        raise ValueError(f"Capital allocated to unknown shards: {sorted(unknown)}")
+    capital = {i: Decimal(str(allocation.get(i, 0))) for i in range(num_shards)}
+    if sum(capital.values(), Decimal('0')) != initial_balance:
+        raise ValueError(
+            f"Shard capital sums to {sum(capital.values())}, not {initial_balance}"
+        )
+    return capital
+
+
+class ShardSupervisor:
+    """Runs a TradingSystem per shard of symbols in separate processes.
+
+    initial_balance is the total capital; it is split evenly across the
+    shards unless capital_allocation gives each shard's share.
+    """
+
+    def __init__(
+        self,
+        exchange_config: ExchangeConfig,
+        num_shards: Optional[int] = None,
+        initial_balance: Decimal = Decimal('0'),
+        report_interval: float = 1.0,
+        max_restarts: int = 5,
+        capital_allocation: Optional[Dict[int, Decimal]] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.exchange_config = exchange_config
+        self.num_shards = num_shards or mp.cpu_count()
+        self.initial_balance = initial_balance
+        self.report_interval = report_interval
+        self.max_restarts = max_restarts
+        self.context = mp.get_context('spawn')
+        self.result_queue = self.context.Queue()
+        capital = allocate_capital(
+            initial_balance, self.num_shards, capital_allocation
+        )
+        self.shards: Dict[int, ShardState] = {
+            i: ShardState(shard_id=i, capital=capital[i])
+            for i in range(self.num_shards)
+        }
+        self.processes: Dict[int, mp.Process] = {}
+        self.command_queues: Dict = {}
+        self.symbols: List[str] = []
+        self.running: bool = False
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    def _spawn(self, shard_id: int):
+        """Start (or restart) the worker process for a shard"""
+        shard = self.shards[shard_id]
+        command_queue = self.context.Queue()
+        process = self.context.Process(
+            target=_shard_worker_main,
+            args=(
+                shard_id,
+                self.exchange_config,
+                shard.capital,
+                shard.symbols,
+                shard.active_orders,
+                command_queue,
+                self.result_queue,
+                self.report_interval,
+                shard.generation
+            ),
+            name=f"trading-shard-{shard_id}",
+            daemon=True
+        )
+        process.start()
+        self.processes[shard_id] = process
+        self.command_queues[shard_id] = command_queue
+        self.logger.info(
+            f"Started shard {shard_id} (pid {process.pid}) "
+            f"with symbols {shard.symbols}"
+        )
+
+    async def start(self, symbols: List[str]):
+        """Split symbols across shards and start all workers"""
+        if self.running:
+            self.logger.warning("Supervisor already started")
+            return
+
+        self.symbols = sorted(set(symbols))
+        for shard_id, shard_symbols in assign_symbols(
+            self.symbols, self.num_shards
+        ).items():
+            self.shards[shard_id].symbols = shard_symbols
+
+        for shard_id, shard in self.shards.items():
+            if shard.symbols:
+                self._spawn(shard_id)
+
+        self.running = True
+        self._monitor_task = asyncio.create_task(self._monitor_loop())
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop all shard workers"""
+        self.running = False
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+        for command_queue in self.command_queues.values():
+            command_queue.put({'type': 'stop'})
+
+        loop = asyncio.get_running_loop()
+        for shard_id, process in self.processes.items():
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                self.logger.warning(f"Terminating unresponsive shard {shard_id}")
+                process.terminate()
+
+        self.processes.clear()
+        self.command_queues.clear()
+        self.logger.info("All shards stopped")
+
+    async def add_symbols(self, symbols: List[str]):
+        """Add symbols and rebalance the affected shards"""
+        await self._rebalance(sorted(set(self.symbols) | set(symbols)))
+
+    async def remove_symbols(self, symbols: List[str]):
+        """Remove symbols and rebalance the affected shards"""
+        await self._rebalance(sorted(set(self.symbols) - set(symbols)))
+
+    async def _rebalance(self, symbols: List[str]):
+        """Push new symbol assignments to the shards whose set changed"""
+        removed = sorted(set(self.symbols) - set(symbols))
+        self.symbols = symbols
+        all_orders = {
+            order_id: order
+            for shard in self.shards.values()
+            for order_id, order in shard.active_orders.items()
+        }
+
+        for shard_id, shard_symbols in assign_symbols(
+            symbols, self.num_shards
+        ).items():
+            shard = self.shards[shard_id]
+            if shard_symbols == shard.symbols:
+                continue
+
+            symbol_set = set(shard_symbols)
+            shard.symbols = shard_symbols
+            shard.generation += 1
+            shard.active_orders = {
+                order_id: order for order_id, order in all_orders.items()
+                if order['symbol'] in symbol_set
+            }
+
+            if not self.running:
+                continue
+            if shard_id in self.processes:
+                self.command_queues[shard_id].put({
+                    'type': 'set_symbols',
+                    'symbols': shard_symbols,
+                    'orders': shard.active_orders,
+                    'removed': removed,
+                    'generation': shard.generation
+                })
+            elif shard_symbols:
+                self._spawn(shard_id)
+
+    async def _monitor_loop(self):
+        """Collect shard reports and restart crashed workers"""
+        while self.running:
+            try:
+                self._drain_reports()
+                for shard_id, process in list(self.processes.items()):
+                    if process.is_alive():
+                        continue
+
+                    shard = self.shards[shard_id]
+                    self.logger.error(
+                        f"Shard {shard_id} exited with code {process.exitcode}"
+                    )
+                    if shard.restarts >= self.max_restarts:
+                        self.logger.error(
+                            f"Shard {shard_id} exceeded {self.max_restarts} "
+                            f"restarts, symbols {shard.symbols} left idle"
+                        )
+                        del self.processes[shard_id]
+                        continue
+
+                    shard.restarts += 1
+                    self._spawn(shard_id)
+
+            except Exception as e:
+                self.logger.error(f"Error in shard monitor: {e}")
+
+            await asyncio.sleep(self.report_interval)
+
+    def _drain_reports(self):
+        """Apply all pending shard reports"""
+        while True:
+            try:
+                report = self.result_queue.get_nowait()
+            except queue.Empty:
+                return
+
+            shard = self.shards[report['shard_id']]
+            if report['generation'] < shard.generation:
+                # Sent before the shard applied a rebalance; its orders are stale
+                continue
+            shard.active_orders = report['active_orders']
+            shard.portfolio = report['portfolio']
+            shard.positions = report['positions']
+            shard.risk = report['risk']
+            shard.last_report = report['timestamp']
+
+    def get_portfolio_metrics(self) -> Dict:
+        """Get portfolio metrics aggregated over all shards.
+
+        Shards that have not reported (idle, or not started yet) still
+        hold their allocated capital as cash.
+        """
+        reports = [s.portfolio for s in self.shards.values() if s.portfolio]
+        idle = sum(
+            (s.capital for s in self.shards.values() if not s.portfolio),
+            Decimal('0')
+        )
+        return {
+            'total_value': sum((r['total_value'] for r in reports), idle),
+            'balance': sum((r['balance'] for r in reports), idle),
+            'total_pnl': sum((r['total_pnl'] for r in reports), Decimal('0')),
+            'max_drawdown': max(
+                (r['max_drawdown'] for r in reports), default=Decimal('0')
+            ),
+            'open_positions': sum(r['open_positions'] for r in reports),
+            'total_trades': sum(r['total_trades'] for r in reports),
+            'shards': len(reports)
+        }
+
+    def get_position_summary(self) -> Dict[str, Dict]:
+        """Get positions from all shards"""
+        return {
+            symbol: position
+            for shard in self.shards.values()
+            for symbol, position in shard.positions.items()
+        }
+
+    def get_risk_metrics(self) -> Dict[int, Optional[Dict]]:
+        """Get the latest risk metrics reported by each shard"""
+        return {
+            shard_id: shard.risk for shard_id, shard in self.shards.items()
+        }
+
+    def get_active_orders(self) -> Dict[str, Dict]:
+        """Get the last known open orders across all shards"""
+        return {
+            order_id: order
+            for shard in self.shards.values()
+            for order_id, order in shard.active_orders.items()
+        }
@@ -0,0 +1,225 @@
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing as mp
+import os
+import random
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence
+
+from .backtest import BacktestEngine
+
+# Per-worker view of the shared price series, set by _attach_bars
+_worker_bars: Optional[Dict[str, np.ndarray]] = None
+_worker_memory: Optional[shared_memory.SharedMemory] = None
+
+# Metrics where a lower value is better; every other metric ranks highest first
+ASCENDING_METRICS = frozenset({'max_drawdown', 'volatility', 'fees'})
+
+
+def _attach_bars(name: str, shape: tuple):
+    """Pool initializer: map the parent's OHLCV block without copying it"""
+    global _worker_bars, _worker_memory
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    bars = np.ndarray(shape, dtype=np.float64, buffer=_worker_memory.buf)
+    _worker_bars = BacktestEngine.to_columns(bars)
+
+
+def _evaluate(strategy_class, base_config: Dict, params: Dict, engine_kwargs: Dict) -> Dict:
+    """Backtest one parameter set inside a pool worker"""
+    row = {'params': params}
+    try:
+        engine = BacktestEngine(
+            strategy_class, {**base_config, **params}, **engine_kwargs
+        )
+        result = asyncio.run(engine.run(_worker_bars))
+        row.update({
+            'pnl': float(result.pnl),
+            'total_return': float(result.total_return),
+            'max_drawdown': float(result.max_drawdown),
+            'sharpe_ratio': float(result.risk_metrics.sharpe_ratio),
+            'volatility': float(result.risk_metrics.volatility),
+            'trades': len(result.trades),
+            'fees': float(result.fees)
+        })
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def params_key(params: Dict) -> str:
+    """Stable identity of a parameter set, used to resume a sweep"""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class ParameterSweep:
+    """Evaluates strategy configurations over history on a process pool.
+
+    The OHLCV array is placed in shared memory once and every worker maps
+    it. Each finished row is appended to results_path as a JSON line, so
+    re-running an interrupted sweep only evaluates the missing configs.
+    Rows are ranked by rank_by, lowest first for ASCENDING_METRICS unless
+    ascending says otherwise.
+    """
+    def __init__(
+        self,
+        strategy_class,
+        base_config: Dict,
+        ohlcv: Sequence,
+        results_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        rank_by: str = 'total_return',
+        ascending: Optional[bool] = None,
+        initial_capital: Decimal = Decimal('10000'),
+        fee_rate: Decimal = Decimal('0.001'),
+        slippage: Decimal = Decimal('0.0005')
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.strategy_class = strategy_class
+        self.base_config = base_config
+        self.bars = np.ascontiguousarray(ohlcv, dtype=np.float64)
+        self.results_path = results_path
+        self.workers = workers or os.cpu_count()
+        self.rank_by = rank_by
+        self.ascending = (
+            rank_by in ASCENDING_METRICS if ascending is None else ascending
+        )
+        self.engine_kwargs = {
+            'initial_capital': initial_capital,
+            'fee_rate': fee_rate,
+            'slippage': slippage
+        }
+        self.results: Dict[str, Dict] = {}
+        self.evaluated = 0
+
+    @staticmethod
+    def grid(space: Dict[str, Sequence]) -> List[Dict]:
+        """Every combination of the candidate values"""
+        names = list(space)
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*(space[name] for name in names))
+        ]
+
+    @staticmethod
+    def random(space: Dict, samples: int, seed: Optional[int] = None) -> List[Dict]:
+        """Random draws; lists are sampled from, (low, high) tuples are ranges"""
+        rng = random.Random(seed)
+
+        def draw(candidates):
+            if isinstance(candidates, tuple):
+                low, high = candidates
+                if isinstance(low, int) and isinstance(high, int):
+                    return rng.randint(low, high)
+                return rng.uniform(float(low), float(high))
+            return rng.choice(list(candidates))
+
+        return [
+            {name: draw(candidates) for name, candidates in space.items()}
+            for _ in range(samples)
+        ]
+
+    def _load_results(self):
+        """Read rows completed by an earlier, possibly interrupted, run"""
+        if not self.results_path or not os.path.exists(self.results_path):
+            return
+        complete = 0
+        with open(self.results_path, 'rb+') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partially written last line
+                complete += len(line)
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.results[params_key(row['params'])] = row
+            # Drop the partial line so the next append starts on a fresh one
+            f.truncate(complete)
+
+    def _save_result(self, row: Dict):
+        if self.results_path:
+            with open(self.results_path, 'a') as f:
+                f.write(json.dumps(row, default=str) + '\n')
+
+    async def run(self, configs: List[Dict]) -> List[Dict]:
+        """Evaluate every config not already in the results and rank them all"""
+        self._load_results()
+        keys = [params_key(params) for params in configs]
+        pending = {
+            key: params for key, params in zip(keys, configs)
+            if key not in self.results
+        }
+        self.logger.info(
+            f"Sweep: {len(configs)} configs, {len(configs) - len(pending)} "
+            f"already done, {len(pending)} to run on {self.workers} workers"
+        )
+
+        if pending:
+            await self._run_pool(pending)
+        return self.ranked([self.results[key] for key in dict.fromkeys(keys)])
+
+    async def _run_pool(self, pending: Dict[str, Dict]):
+        memory = shared_memory.SharedMemory(create=True, size=self.bars.nbytes)
+        try:
+            np.ndarray(self.bars.shape, dtype=np.float64, buffer=memory.buf)[:] = self.bars
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(pending)),
+                mp_context=mp.get_context('spawn'),
+                initializer=_attach_bars,
+                initargs=(memory.name, self.bars.shape)
+            ) as pool:
+                futures = [
+                    loop.run_in_executor(
+                        pool, _evaluate, self.strategy_class,
+                        self.base_config, params, self.engine_kwargs
+                    )
+                    for params in pending.values()
+                ]
+                for future in asyncio.as_completed(futures):
+                    row = await future
+                    if 'error' in row:
+                        self.logger.warning(f"Config {row['params']} failed: {row['error']}")
+                    self.results[params_key(row['params'])] = row
+                    self._save_result(row)
+                    self.evaluated += 1
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def ranked(self, rows: List[Dict]) -> List[Dict]:
+        """Sort rows best first; failed configs go last"""
+        direction = 1 if self.ascending else -1
+        ordered = sorted(
+            rows,
+            key=lambda row: (
+                'error' in row or self.rank_by not in row,
+                direction * row.get(self.rank_by, 0)
+            )
+        )
+        return [{'rank': i + 1, **row} for i, row in enumerate(ordered)]
+
+    @staticmethod
+    def format_table(rows: List[Dict], columns: Sequence[str] = (
+        'rank', 'total_return', 'max_drawdown', 'sharpe_ratio', 'trades'
+    )) -> str:
+        """Render ranked rows as a plain-text table"""
+        param_names = list(rows[0]['params']) if rows else []
+        header = list(columns) + param_names
+        lines = [header]
+        for row in rows:
+            values = [row.get(column, '-') for column in columns]
+            values += [row['params'][name] for name in param_names]
+            lines.append([
+                f"{v:.4f}" if isinstance(v, float) else str(v) for v in values
+            ])
+        widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+        return '\n'.join(
+            '  '.join(cell.rjust(width) for cell, width in zip(line, widths))
+            for line in lines
+        )
@@ -0,0 +1,201 @@
+import numpy as np
+import logging
+from typing import Dict, List, Optional, Sequence, Union
+from datetime import datetime, timedelta
+
+GROUP_KEYS = ('symbol', 'algorithm', 'bucket')
+
+class TransactionCostAnalyzer:
+    """Vectorized transaction cost analysis over the trade journal.
+
+    Works on Portfolio.trades_history records (or the same fields as
+    column arrays). Costs are in basis points, signed so that a positive
+    number is a cost for both buys and sells, and averaged by notional.
+    """
+    def __init__(self, bucket: timedelta = timedelta(hours=1)):
+        self.logger = logging.getLogger(__name__)
+        self.bucket_seconds = bucket.total_seconds()
+
+    @staticmethod
+    def to_columns(trades: List[Dict]) -> Dict[str, np.ndarray]:
+        """Convert journal records into column arrays"""
+        def floats(key: str) -> np.ndarray:
+            return np.fromiter(
+                (np.nan if t.get(key) is None else float(t[key]) for t in trades),
+                dtype=float, count=len(trades)
+            )
+
+        def times(key: str, fallback: str) -> np.ndarray:
+            return np.fromiter(
+                ((t.get(key) or t[fallback]).timestamp() for t in trades),
+                dtype=float, count=len(trades)
+            )
+
+        return {
+            'symbol': np.array([t['symbol'] for t in trades], dtype=object),
+            'algorithm': np.array(
+                [t.get('algorithm') or 'direct' for t in trades], dtype=object
+            ),
+            'side': np.array([t['side'].lower() for t in trades], dtype=object),
+            'type': np.array([str(t.get('type', '')).lower() for t in trades], dtype=object),
+            'time_in_force': np.array(
+                [str(t.get('time_in_force') or '').upper() for t in trades], dtype=object
+            ),
+            'price': floats('price'),
+            'amount': floats('amount'),
+            'decision_price': floats('decision_price'),
+            'arrival_mid': floats('arrival_mid'),
+            'arrival_spread': floats('arrival_spread'),
+            'order_time': times('order_time', 'timestamp'),
+            'fill_time': times('timestamp', 'timestamp')
+        }
+
+    @staticmethod
+    def _crossing(columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Fills that took liquidity: market orders and IOC/FOK limits"""
+        crossing = columns['type'] == 'market'
+        if 'time_in_force' in columns:
+            crossing |= np.isin(columns['time_in_force'], ('IOC', 'FOK'))
+        return crossing
+
+    @staticmethod
+    def _factorize(values: np.ndarray):
+        """Map values to dense integer codes"""
+        if values.dtype != object:
+            return np.unique(values, return_inverse=True)
+        mapping: Dict = {}
+        codes = np.fromiter(
+            (mapping.setdefault(v, len(mapping)) for v in values),
+            dtype=np.int64, count=len(values)
+        )
+        return np.array(list(mapping), dtype=object), codes
+
+    def interval_vwap(
+        self,
+        columns: Dict[str, np.ndarray],
+        market_bars: Dict[str, Sequence]
+    ) -> np.ndarray:
+        """Market VWAP from order placement to fill for every trade.
+
+        market_bars maps symbol to OHLCV rows ([ts_ms, o, h, l, c, v]).
+        The window always includes the bar containing the fill.
+        """
+        vwap = np.full(len(columns['price']), np.nan)
+        for symbol, bars in market_bars.items():
+            rows = np.nonzero(columns['symbol'] == symbol)[0]
+            bars = np.asarray(bars, dtype=float)
+            if not len(rows) or not len(bars):
+                continue
+
+            timestamps = bars[:, 0] / 1000
+            typical = (bars[:, 2] + bars[:, 3] + bars[:, 4]) / 3
+            cum_pv = np.concatenate(([0.0], np.cumsum(typical * bars[:, 5])))
+            cum_v = np.concatenate(([0.0], np.cumsum(bars[:, 5])))
+
+            start = np.searchsorted(timestamps, columns['order_time'][rows], 'right') - 1
+            end = np.searchsorted(timestamps, columns['fill_time'][rows], 'right')
+            start = np.clip(start, 0, len(bars) - 1)
+            end = np.maximum(end, start + 1)
+
+            volume = cum_v[end] - cum_v[start]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                vwap[rows] = np.where(
+                    volume > 0, (cum_pv[end] - cum_pv[start]) / volume, np.nan
+                )
+        return vwap
+
+    def analyze(
+        self,
+        trades: Union[List[Dict], Dict[str, np.ndarray]],
+        market_bars: Optional[Dict[str, Sequence]] = None,
+        group_by: Sequence[str] = GROUP_KEYS
+    ) -> List[Dict]:
+        """Slippage vs. arrival, decision and interval VWAP, and spread paid"""
+        columns = trades if isinstance(trades, dict) else self.to_columns(trades)
+        if not len(columns['price']):
+            return []
+
+        price = columns['price']
+        notional = price * columns['amount']
+        sign = np.where(columns['side'] == 'buy', 1.0, -1.0)
+
+        def slippage_bps(benchmark: np.ndarray) -> np.ndarray:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return sign * (price - benchmark) / benchmark * 1e4
+
+        metrics = {
+            'arrival_slippage_bps': slippage_bps(columns['arrival_mid']),
+            'decision_slippage_bps': slippage_bps(columns['decision_price']),
+            'vwap_slippage_bps': slippage_bps(
+                self.interval_vwap(columns, market_bars)
+                if market_bars else np.full(len(price), np.nan)
+            ),
+            # Crossing orders pay half the arrival spread; resting orders earn it
+            'spread_paid_bps': np.where(
+                self._crossing(columns), 1.0, -1.0
+            ) * columns['arrival_spread'] / 2 / columns['arrival_mid'] * 1e4
+        }
+        cost = sign * (price - columns['arrival_mid']) * columns['amount']
+
+        # Encode every grouping column as integers and group on a single
+        # mixed-radix int64 key; sorting object arrays is far slower
+        key_columns = {
+            'symbol': columns['symbol'],
+            'algorithm': columns['algorithm'],
+            'bucket': np.floor(columns['fill_time'] / self.bucket_seconds)
+        }
+        uniques = []
+        combined = np.zeros(len(price), dtype=np.int64)
+        for key in group_by:
+            values, inverse = self._factorize(key_columns[key])
+            uniques.append(values)
+            combined = combined * len(values) + inverse
+        group_keys, group_index = np.unique(combined, return_inverse=True)
+        group_index = group_index.ravel()
+        num_groups = len(group_keys)
+
+        # Decode each group key back into its per-column codes
+        groups = np.zeros((num_groups, len(group_by)), dtype=np.int64)
+        remainder = group_keys.copy()
+        for position in range(len(group_by) - 1, -1, -1):
+            groups[:, position] = remainder % len(uniques[position])
+            remainder //= len(uniques[position])
+
+        def group_sum(values: np.ndarray) -> np.ndarray:
+            return np.bincount(group_index, weights=values, minlength=num_groups)
+
+        fills = np.bincount(group_index, minlength=num_groups)
+        quantity = group_sum(columns['amount'])
+        total_notional = group_sum(notional)
+        total_cost = group_sum(np.nan_to_num(cost))
+
+        weighted = {}
+        for name, values in metrics.items():
+            valid = ~np.isnan(values)
+            weight = group_sum(np.where(valid, notional, 0.0))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                weighted[name] = group_sum(
+                    np.where(valid, values * notional, 0.0)
+                ) / weight
+
+        report = []
+        for g, group in enumerate(groups):
+            row = {}
+            for key, values, code in zip(group_by, uniques, group):
+                value = values[code]
+                if key == 'bucket':
+                    value = datetime.fromtimestamp(value * self.bucket_seconds)
+                row[key] = value
+            row.update({
+                'fills': int(fills[g]),
+                'quantity': float(quantity[g]),
+                'notional': float(total_notional[g]),
+                'cost': float(total_cost[g]),
+                **{
+                    name: None if np.isnan(values[g]) else float(values[g])
+                    for name, values in weighted.items()
+                }
+            })
+            report.append(row)
+
+        return report
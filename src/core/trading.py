@@ -1,18 +1,27 @@
 from decimal import Decimal
 import logging
 import asyncio
-from typing import Dict, List, Optional
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 
 from .exchange import Exchange, ExchangeConfig
-from .portfolio import Portfolio
+from .capture import CaptureWriter
+from .history import HistoricalStore, timeframe_ms
+from .indicators import IndicatorRegistry
+from .market_data import MarketDataFeed
+from .portfolio import Portfolio, Position
 from .risk import RiskManager
 
 # Import advanced features
 from .advanced_features.market_maker import MarketMaker
+from .advanced_features.quoting_manager import QuotingManager
 from .advanced_features.arbitrage import Arbitrage
+from .advanced_features.triangular_arbitrage import TriangularArbitrage
 from .advanced_features.smart_order_router import SmartOrderRouter
 from .advanced_features.risk_engine import AdvancedRiskEngine
+from .advanced_features.strategy_runtime import StrategyRuntime
+from .advanced_features.iceberg import TERMINAL_STATUSES
 
 class TradingSystem:
     """Main trading system that coordinates all components"""
@@ -21,11 +30,15 @@ class TradingSystem:
         self,
         exchange_config: ExchangeConfig,
         initial_balance: Decimal = Decimal('0'),
-        exchange_configs: List[Dict] = None
+        exchange_configs: List[Dict] = None,
+        history_path: Optional[str] = None
     ):
         self.logger = logging.getLogger(__name__)
         self.exchange = Exchange(exchange_config)
         self.portfolio = Portfolio(initial_balance)
+        self.history = HistoricalStore(history_path) if history_path else None
+        self.capture: Optional[CaptureWriter] = None
+        self.indicators = IndicatorRegistry()
         self.risk_manager = RiskManager(
             max_position_size=Decimal('0.2'),  # 20% of portfolio
             max_drawdown=Decimal('0.1')        # 10% max drawdown
@@ -33,18 +46,33 @@ class TradingSystem:
         
         # Initialize advanced features
         self.market_maker = MarketMaker(self)
+        self.quoting_manager = QuotingManager(self)
         
         # If multiple exchange configs provided, initialize arbitrage
         if exchange_configs:
             self.arbitrage = Arbitrage(exchange_configs)
         else:
             self.arbitrage = None
+
+        # Cycle detection over all markets of the primary exchange
+        self.triangular_arbitrage = TriangularArbitrage(self.exchange)
             
         self.smart_router = SmartOrderRouter(self)
         self.risk_engine = AdvancedRiskEngine()
+        self.strategy_runtime = StrategyRuntime(self)
+
+        # Polls tickers and books for watched symbols into on_ticker/on_orderbook
+        self.market_data = MarketDataFeed(self)
+
+        # Callbacks taking (topic, symbol, data) for every state change
+        self.listeners: List[Callable[[str, str, Dict], None]] = []
         
         # Trading state
         self.active_orders: Dict[str, Dict] = {}
+        self.order_context: Dict[str, Dict] = {}
+        # Venue of each active order sent somewhere other than self.exchange
+        self.order_exchanges: Dict[str, Exchange] = {}
+        self.arrival_max_age: float = 2.0  # seconds a cached book is used for
         self.running: bool = False
         self.symbols: List[str] = []
     
@@ -53,24 +81,42 @@ class TradingSystem:
         try:
             self.logger.info("Initializing trading system...")
             await self.exchange.initialize()
+            self.triangular_arbitrage.build()
             self.logger.info("Trading system initialized")
             return True
         except Exception as e:
             self.logger.error(f"Failed to initialize trading system: {e}")
             return False
-    
+
+    def warm_up_risk(self, returns: List[Decimal]):
+        """Seed risk metrics from stored daily portfolio returns on startup"""
+        if not returns:
+            return
+        try:
+            metrics = self.risk_manager.calculate_metrics(returns)
+            self._publish('risk', None, asdict(metrics))
+        except Exception as e:
+            self.logger.error(f"Error warming up risk metrics: {e}")
+
     async def shutdown(self):
         """Shutdown the trading system"""
         try:
             self.logger.info("Shutting down trading system...")
+
+            # Stop strategies and parent orders before pulling resting orders
+            await self.strategy_runtime.stop()
+            await self.smart_router.scheduler.stop()
+            await self.market_data.stop()
             
             # Cancel all active orders
             for order_id, order in self.active_orders.items():
                 try:
-                    await self.exchange.cancel_order(order_id, order['symbol'])
+                    await self._venue(order_id).cancel_order(order_id, order['symbol'])
                 except Exception as e:
                     self.logger.error(f"Error cancelling order {order_id}: {e}")
             
+            self.stop_capture()
+
             # Close exchange connection
             await self.exchange.close()
             
@@ -85,76 +131,220 @@ class TradingSystem:
         order_type: str,
         amount: Decimal,
         price: Optional[Decimal] = None,
-        params: Dict = {}
+        params: Dict = {},
+        context: Optional[Dict] = None,
+        exchange: Optional[Exchange] = None
     ) -> Optional[Dict]:
-        """Place an order through the exchange"""
+        """Place an order through the exchange.
+
+        context carries decision-time details for transaction cost
+        analysis (algorithm, parent_id, decision_price); the arrival
+        mid and spread are captured here and stored with each fill.
+        exchange sends the order to another venue instead of the
+        primary exchange.
+        """
         try:
-            # Check risk limits
-            portfolio_value = self.portfolio.get_total_value()
-            position_value = amount * (
-                price or await self._get_current_price(symbol)
-            )
-            
-            # Calculate position size as percentage of portfolio
-            position_size = position_value / portfolio_value
-            current_drawdown = self.portfolio.max_drawdown
-            
-            if not self.risk_manager.check_risk_limits(
-                symbol, position_size, current_drawdown
-            ):
-                self.logger.warning(
-                    f"Order rejected: Risk limits exceeded for {symbol}"
-                )
+            if not await self._check_order_risk(symbol, amount, price):
                 return None
-            
+            arrival = self._capture_arrival(symbol, context, exchange)
+            arrival['time_in_force'] = params.get('timeInForce')
+
             # Place order through the exchange
-            order = await self.exchange.create_order(
+            order = await (exchange or self.exchange).create_order(
                 symbol, order_type, side, amount, price, params
             )
-            
-            # Save to active orders if not market order
-            if order_type != 'market':
-                self.active_orders[order['id']] = order
-            
-            # Update portfolio for market orders (assume instant execution)
-            if order_type == 'market':
-                exec_price = price or await self._get_current_price(symbol)
-                order_amount = amount
-                if side == 'sell':
-                    order_amount = -order_amount
-                
-                self.portfolio.update_position(
-                    symbol,
-                    order_amount,
-                    exec_price,
-                    datetime.now()
-                )
-                
-                # Record the trade
-                self.portfolio.record_trade({
-                    'symbol': symbol,
-                    'side': side,
-                    'price': exec_price,
-                    'amount': amount,
-                    'type': order_type
-                })
-                
+            await self._record_placed(
+                order, symbol, side, order_type, amount, price, arrival, exchange
+            )
             return order
             
         except Exception as e:
             self.logger.error(f"Error placing order: {e}")
             return None
+
+    async def place_orders(
+        self,
+        orders: List[Dict],
+        exchange: Optional[Exchange] = None
+    ) -> List[Optional[Dict]]:
+        """Place several orders as one exchange batch.
+
+        Each entry holds symbol, side, type, amount and optional price,
+        params and context. Every order is risk checked on its own;
+        rejected or failed orders come back as None. exchange sends the
+        batch to another venue instead of the primary exchange.
+        """
+        results: List[Optional[Dict]] = [None] * len(orders)
+        try:
+            approved = []
+            for index, order in enumerate(orders):
+                if await self._check_order_risk(
+                    order['symbol'], order['amount'], order.get('price')
+                ):
+                    approved.append(index)
+            if not approved:
+                return results
+            arrivals = {
+                index: self._capture_arrival(
+                    orders[index]['symbol'], orders[index].get('context'), exchange
+                )
+                for index in approved
+            }
+            for index, arrival in arrivals.items():
+                arrival['time_in_force'] = (orders[index].get('params') or {}).get('timeInForce')
+
+            created = await (exchange or self.exchange).create_orders(
+                [orders[index] for index in approved]
+            )
+            for index, placed in zip(approved, created):
+                if not placed:
+                    continue
+                order = orders[index]
+                await self._record_placed(
+                    placed, order['symbol'], order['side'], order['type'],
+                    order['amount'], order.get('price'), arrivals[index], exchange
+                )
+                results[index] = placed
+        except Exception as e:
+            self.logger.error(f"Error placing order batch: {e}")
+        return results
+
+    async def _check_order_risk(
+        self,
+        symbol: str,
+        amount: Decimal,
+        price: Optional[Decimal]
+    ) -> bool:
+        """Check an order against the risk limits"""
+        portfolio_value = self.portfolio.get_total_value()
+        position_value = amount * (
+            price or await self._get_current_price(symbol)
+        )
+        
+        # Calculate position size as percentage of portfolio
+        position_size = position_value / portfolio_value
+        current_drawdown = self.portfolio.max_drawdown
+        
+        if not self.risk_manager.check_risk_limits(
+            symbol, position_size, current_drawdown
+        ):
+            self.logger.warning(
+                f"Order rejected: Risk limits exceeded for {symbol}"
+            )
+            return False
+        return True
+
+    async def _record_placed(
+        self,
+        order: Dict,
+        symbol: str,
+        side: str,
+        order_type: str,
+        amount: Decimal,
+        price: Optional[Decimal],
+        arrival: Dict,
+        exchange: Optional[Exchange] = None
+    ):
+        """Track a newly placed order, booking market orders immediately.
+
+        Orders that come back already done (immediate-or-cancel limits)
+        are booked for what they filled instead of being tracked.
+        """
+        self._publish('orders', symbol, order)
+        terminal = order.get('status') in TERMINAL_STATUSES
+        if order_type != 'market' and not terminal:
+            self.active_orders[order['id']] = order
+            self.order_context[order['id']] = arrival
+            if exchange is not None and exchange is not self.exchange:
+                self.order_exchanges[order['id']] = exchange
+            return
+
+        if order_type != 'market':
+            amount = Decimal(str(order.get('filled') or 0))
+            if amount <= 0:
+                return
+
+        # Update portfolio for market orders (assume instant execution)
+        if order.get('average'):
+            exec_price = Decimal(str(order['average']))
+        else:
+            exec_price = price or await self._get_current_price(symbol)
+        self.book_fill(order, symbol, side, amount, exec_price, order_type, arrival)
     
     async def cancel_order(self, order_id: str, symbol: str) -> bool:
-        """Cancel an existing order"""
+        """Cancel an existing order on the venue it was placed on"""
         try:
-            result = await self.exchange.cancel_order(order_id, symbol)
-            if order_id in self.active_orders:
-                del self.active_orders[order_id]
+            await self._venue(order_id).cancel_order(order_id, symbol)
+            self._forget_cancelled(order_id, symbol)
             return True
         except Exception as e:
             self.logger.error(f"Error cancelling order: {e}")
             return False
+
+    async def cancel_orders(
+        self,
+        order_ids: List[str],
+        symbol: str,
+        exchange: Optional[Exchange] = None
+    ) -> bool:
+        """Cancel several orders on one symbol and venue as a batch"""
+        if not order_ids:
+            return True
+        exchange = exchange or self._venue(order_ids[0])
+        if not await exchange.cancel_orders(order_ids, symbol):
+            return False
+        for order_id in order_ids:
+            self._forget_cancelled(order_id, symbol)
+        return True
+
+    def _venue(self, order_id: str) -> Exchange:
+        return self.order_exchanges.get(order_id, self.exchange)
+
+    def _forget_cancelled(self, order_id: str, symbol: str):
+        self.active_orders.pop(order_id, None)
+        self.order_context.pop(order_id, None)
+        self.order_exchanges.pop(order_id, None)
+        self._publish('orders', symbol, {
+            'id': order_id, 'symbol': symbol, 'status': 'canceled'
+        })
+    
+    def book_fill(
+        self,
+        order: Dict,
+        symbol: str,
+        side: str,
+        amount: Decimal,
+        price: Decimal,
+        order_type: str,
+        context: Dict
+    ) -> Position:
+        """Book a fill of a tracked order into the portfolio.
+
+        Records the trade with its arrival context, captures and publishes
+        the fill and position, and lets the quoting engines see it.
+        """
+        position = self.portfolio.update_position(
+            symbol, amount if side == 'buy' else -amount, price, datetime.now()
+        )
+        self.portfolio.record_trade({
+            'symbol': symbol,
+            'side': side,
+            'price': price,
+            'amount': amount,
+            'type': order_type,
+            **context
+        })
+
+        if self.capture:
+            self.capture.record_fill(order['id'], symbol, side, price, amount)
+
+        self._publish_fill(order, symbol, side, price, amount, position.realized_pnl)
+        self._publish_position(symbol)
+
+        # Let the quoting engines track fills and inventory
+        self.market_maker.on_fill(order['id'])
+        self.quoting_manager.on_fill(order['id'], side, amount)
+        return position
     
     async def start_trading(self, symbols: List[str]):
         """Start automated trading on the specified symbols"""
@@ -204,7 +394,10 @@ class TradingSystem:
         """Update market data for all tracked symbols"""
         try:
             # Get latest prices
-            await self.exchange.update_prices(self.symbols)
+            tickers = await self.exchange.update_prices(self.symbols)
+            if self.capture:
+                for symbol, ticker in tickers.items():
+                    self.capture.record_ticker(symbol, ticker)
             
             # Update portfolio with new prices
             prices = {
@@ -212,6 +405,9 @@ class TradingSystem:
                 for symbol in self.symbols
             }
             self.portfolio.update_prices(prices)
+            for symbol in self.symbols:
+                if symbol in self.portfolio.positions:
+                    self._publish_position(symbol)
             
         except Exception as e:
             self.logger.error(f"Error updating market data: {e}")
@@ -222,35 +418,25 @@ class TradingSystem:
             for order_id, order in list(self.active_orders.items()):
                 try:
                     # Get updated order status
-                    updated_order = await self.exchange.exchange.fetch_order(
+                    updated_order = await self._venue(order_id).exchange.fetch_order(
                         order_id, order['symbol']
                     )
                     
                     # If order is filled, update portfolio
                     if updated_order['status'] == 'closed':
                         symbol = order['symbol']
-                        amount = Decimal(str(updated_order['filled']))
-                        price = Decimal(str(updated_order['price']))
-                        
-                        if updated_order['side'] == 'sell':
-                            amount = -amount
-                            
-                        # Update portfolio
-                        self.portfolio.update_position(
-                            symbol, amount, price, datetime.now()
+                        self._publish('orders', symbol, updated_order)
+                        self.book_fill(
+                            updated_order, symbol, updated_order['side'],
+                            Decimal(str(updated_order['filled'])),
+                            Decimal(str(updated_order['price'])),
+                            updated_order['type'],
+                            self.order_context.pop(order_id, {})
                         )
-                        
-                        # Record the trade
-                        self.portfolio.record_trade({
-                            'symbol': symbol,
-                            'side': updated_order['side'],
-                            'price': price,
-                            'amount': abs(amount),
-                            'type': updated_order['type']
-                        })
-                        
+
                         # Remove from active orders
                         del self.active_orders[order_id]
+                        self.order_exchanges.pop(order_id, None)
                         
                 except Exception as e:
                     self.logger.error(
@@ -268,11 +454,11 @@ class TradingSystem:
             market_returns = []
             
             for symbol in self.symbols:
-                ohlcv = await self.exchange.get_ohlcv(
+                ohlcv = await self.get_ohlcv(
                     symbol, timeframe='1d', limit=30
                 )
                 
-                if ohlcv:
+                if len(ohlcv):
                     # Calculate daily returns
                     closes = [Decimal(str(candle[4])) for candle in ohlcv]
                     symbol_returns = [
@@ -289,18 +475,23 @@ class TradingSystem:
             for symbol, position in self.portfolio.positions.items():
                 if symbol in returns:
                     # Update risk metrics
-                    self.risk_manager.calculate_metrics(
+                    metrics = self.risk_manager.calculate_metrics(
                         returns[symbol], market_returns
                     )
                     
                     # Calculate safe position size
                     volatility = self.risk_manager.get_latest_metrics().volatility
-                    self.risk_manager.calculate_position_size(
+                    safe_size = self.risk_manager.calculate_position_size(
                         symbol,
                         position.current_price,
                         volatility,
                         self.portfolio.get_total_value()
                     )
+                    self._publish('risk', symbol, {
+                        **asdict(metrics),
+                        'position_size': safe_size,
+                        'portfolio_drawdown': self.portfolio.max_drawdown
+                    })
             
             # Use advanced risk engine for portfolio-level risk
             portfolio_returns = {}
@@ -318,6 +509,204 @@ class TradingSystem:
         except Exception as e:
             self.logger.error(f"Error updating portfolio metrics: {e}")
     
+    def _capture_arrival(
+        self,
+        symbol: str,
+        context: Optional[Dict] = None,
+        exchange: Optional[Exchange] = None
+    ) -> Dict:
+        """Capture the arrival mid and spread for transaction cost analysis.
+
+        Only the streamed book and last price are used, never a request,
+        so this adds nothing to the order path. Without a book fresher
+        than arrival_max_age the mid is the last price and the spread is
+        unknown.
+        """
+        arrival = {
+            'algorithm': 'direct',
+            'parent_id': None,
+            'decision_price': None,
+            **(context or {}),
+            'arrival_mid': None,
+            'arrival_spread': None,
+            'order_time': datetime.now()
+        }
+        exchange = exchange or self.exchange
+        book = exchange.orderbook_cache.get(symbol)
+        fresh = (
+            book and book.get('bids') and book.get('asks')
+            and datetime.now().timestamp() - book['timestamp'] <= self.arrival_max_age
+        )
+        if fresh:
+            best_bid = Decimal(str(book['bids'][0][0]))
+            best_ask = Decimal(str(book['asks'][0][0]))
+            arrival['arrival_mid'] = (best_bid + best_ask) / 2
+            arrival['arrival_spread'] = best_ask - best_bid
+        else:
+            arrival['arrival_mid'] = exchange.last_prices.get(symbol)
+
+        if arrival['decision_price'] is None:
+            arrival['decision_price'] = arrival['arrival_mid']
+        return arrival
+
+    def on_ticker(self, symbol: str, ticker: Dict) -> List[Dict]:
+        """Feed handler for streamed tickers"""
+        if self.capture:
+            self.capture.record_ticker(symbol, ticker)
+        self.exchange.tickers[symbol] = (ticker, datetime.now().timestamp())
+        if ticker.get('last') is not None:
+            self.exchange.last_prices[symbol] = Decimal(str(ticker['last']))
+        self.indicators.on_tick(
+            symbol, ticker.get('last'), timestamp=ticker.get('timestamp')
+        )
+        self.strategy_runtime.on_market_data(symbol, ticker)
+        self._publish('ticker', symbol, ticker)
+        return self.triangular_arbitrage.update_ticker(
+            symbol, ticker.get('bid'), ticker.get('ask')
+        )
+
+    def on_orderbook(self, symbol: str, orderbook: Dict):
+        """Feed handler for streamed order books"""
+        if self.capture:
+            self.capture.record_book(symbol, orderbook)
+        self.exchange.orderbook_cache[symbol] = {
+            'bids': orderbook['bids'],
+            'asks': orderbook['asks'],
+            'timestamp': datetime.now().timestamp()
+        }
+        self.market_maker.on_market_data(symbol, orderbook)
+        self.quoting_manager.on_market_data(symbol, orderbook)
+        self._publish('book', symbol, orderbook)
+
+    def on_fill(self, symbol: str, fill: Dict):
+        """Feed handler for fills reported outside the order poll.
+
+        The fill completes its order and is booked like a polled one.
+        """
+        order_id = fill['order_id']
+        order = self.active_orders.pop(order_id, None) or {}
+        self.order_exchanges.pop(order_id, None)
+        self.book_fill(
+            {'id': order_id}, symbol, fill['side'],
+            Decimal(str(fill['amount'])), Decimal(str(fill['price'])),
+            order.get('type', 'limit'), self.order_context.pop(order_id, {})
+        )
+
+    async def get_ticker(self, symbol: str, max_age: float = 1.0) -> Dict:
+        """Latest ticker, from the live feed when it is under max_age seconds old"""
+        cached = self.exchange.tickers.get(symbol)
+        if cached and datetime.now().timestamp() - cached[1] <= max_age:
+            return {**cached[0], 'symbol': symbol}
+        return await self.exchange.get_ticker(symbol)
+
+    async def get_orderbook(self, symbol: str, limit: int = 20, max_age: float = 1.0) -> Dict:
+        """Top of the book, from the live book when it is fresh and deep enough"""
+        book = self.exchange.orderbook_cache.get(symbol)
+        if (
+            book and datetime.now().timestamp() - book['timestamp'] <= max_age
+            and len(book['bids']) >= limit and len(book['asks']) >= limit
+        ):
+            return {
+                'symbol': symbol,
+                'bids': book['bids'][:limit],
+                'asks': book['asks'][:limit],
+                'timestamp': book['timestamp']
+            }
+        return await self.exchange.get_orderbook(symbol, limit)
+
+    def add_listener(self, callback: Callable[[str, str, Dict], None]):
+        """Call back with (topic, symbol, data) on ticker, book, orders, fills, portfolio and risk updates"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, str, Dict], None]):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _publish(self, topic: str, symbol: str, data: Dict):
+        for callback in self.listeners:
+            try:
+                callback(topic, symbol, data)
+            except Exception as e:
+                self.logger.error(f"Error publishing {topic} update: {e}")
+
+    def _publish_fill(
+        self,
+        order: Dict,
+        symbol: str,
+        side: str,
+        price: Decimal,
+        amount: Decimal,
+        realized_pnl: Decimal = Decimal('0')
+    ):
+        if not self.listeners:
+            return
+        fee = order.get('fee') or {}
+        self._publish('fills', symbol, {
+            'order_id': order['id'],
+            'symbol': symbol,
+            'side': side,
+            'price': price,
+            'amount': amount,
+            'fee': Decimal(str(fee.get('cost') or 0)),
+            'realized_pnl': realized_pnl,
+            'timestamp': datetime.utcnow()
+        })
+
+    def _publish_position(self, symbol: str):
+        if not self.listeners:
+            return
+        position = self.portfolio.get_position_summary().get(symbol) or {
+            'amount': Decimal('0'), 'value': Decimal('0')
+        }
+        self._publish('portfolio', symbol, {
+            **position,
+            'balance': self.portfolio.balance,
+            'total_value': self.portfolio.get_total_value()
+        })
+
+    def start_capture(self, path: str):
+        """Record tickers, book updates and fills to a capture file"""
+        self.stop_capture()
+        self.capture = CaptureWriter(path)
+
+    def stop_capture(self):
+        if self.capture:
+            self.capture.close()
+            self.capture = None
+
+    async def get_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = '1m',
+        limit: int = 100,
+        since: Optional[int] = None
+    ):
+        """Closed candles from the local history store, or the exchange.
+
+        Candles fetched from the exchange are appended to the store, so
+        repeated warm-ups and profile rebuilds stop hitting the network.
+        """
+        if not self.history:
+            return await self.exchange.get_ohlcv(symbol, timeframe, limit, since)
+
+        step = timeframe_ms(timeframe)
+        closed_before = int(datetime.now().timestamp() * 1000) // step * step
+        start = since if since is not None else closed_before - limit * step
+        end = min(start + limit * step, closed_before)
+
+        stored = self.history.get_ohlcv(symbol, timeframe, start, end)
+        if len(stored) and len(stored) >= (end - start) // step:
+            return stored
+
+        ohlcv = await self.exchange.get_ohlcv(symbol, timeframe, limit, since)
+        closed = [candle for candle in ohlcv if candle[0] < closed_before]
+        if closed:
+            try:
+                self.history.append_candles(symbol, timeframe, closed)
+            except Exception as e:
+                self.logger.error(f"Error storing {symbol} candles: {e}")
+        return ohlcv
+
     async def _get_current_price(self, symbol: str) -> Decimal:
         """Get current price for a symbol"""
         try:
@@ -341,17 +730,61 @@ class TradingSystem:
             self.logger.warning("Arbitrage not initialized")
             return []
             
-        opportunities = []
-        for symbol in symbols:
-            symbol_opps = await self.arbitrage.find_arbitrage_opportunities(symbol)
-            opportunities.extend(symbol_opps)
-            
-        return opportunities
+        return await self.arbitrage.scan_opportunities(symbols)
+
+    async def start_arbitrage(self, symbols: List[str], amount: Decimal):
+        """Continuously scan symbols and execute arbitrage opportunities"""
+        if not self.arbitrage:
+            self.logger.warning("Arbitrage not initialized")
+            return None
+
+        return asyncio.create_task(
+            self.arbitrage.run_continuous(symbols, amount)
+        )
         
     async def start_market_making(self, symbol: str, base_quantity: Decimal):
         """Start market making for a symbol"""
         await self.market_maker.start_market_making(symbol, base_quantity)
         
+    async def start_quoting(
+        self,
+        symbols: List[str],
+        base_quantity: Decimal,
+        max_inventory: Optional[Decimal] = None
+    ):
+        """Quote many symbols from a single task fed by the order book stream"""
+        for symbol in symbols:
+            self.quoting_manager.start_symbol(symbol, base_quantity, max_inventory)
+            self.market_data.watch('book', symbol)
+
+        if not self.quoting_manager.running:
+            asyncio.create_task(self.quoting_manager.run())
+
+    async def stop_quoting(self, symbol: str):
+        """Stop quoting a single symbol"""
+        state = self.quoting_manager.symbols.get(symbol)
+        if state and state.active:
+            self.market_data.unwatch('book', symbol)
+        self.quoting_manager.stop_symbol(symbol)
+
+    async def start_strategy(self, strategy_id, strategy=None):
+        """Start a strategy on the shared strategy runtime.
+
+        A strategy object is registered under strategy_id the first time
+        it is passed; later calls can restart it by id alone.
+        """
+        if strategy is not None:
+            self.strategy_runtime.add(strategy_id, strategy)
+        await self.strategy_runtime.start_strategy(strategy_id)
+
+    async def stop_strategy(self, strategy_id):
+        """Stop a running strategy"""
+        await self.strategy_runtime.stop_strategy(strategy_id)
+
+    def get_strategy_stats(self) -> List[Dict]:
+        """CPU time, latency and order counts per strategy"""
+        return self.strategy_runtime.get_stats()
+
     async def execute_smart_order(
         self,
         symbol: str,
@@ -359,8 +792,8 @@ class TradingSystem:
         total_quantity: Decimal,
         algorithm: str = 'twap',
         params: Dict = {}
-    ):
-        """Execute an order using smart order routing"""
-        await self.smart_router.execute_smart_order(
+    ) -> str:
+        """Submit an order for smart order routing and return its parent id"""
+        return await self.smart_router.execute_smart_order(
             symbol, side, total_quantity, algorithm, params
         )